@@ -0,0 +1,143 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# ABOUT
+# Parallel device acquisition for the open-source roast logging software Artisan.
+
+# LICENSE
+# This program or module is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 2 of the License, or
+# version 3 of the License, or (at your option) any later versison. It is
+# provided for educational purposes and is distributed in the hope that
+# it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See
+# the GNU General Public License for more details.
+
+import sys
+import threading
+
+if sys.version < '3':
+    import Queue as queue # @UnresolvedImport @UnusedImport
+    from time import time as clock
+else:
+    import queue # @Reimport
+    from time import perf_counter as clock # @Reimport
+
+
+# a worker thread that owns one physical port and executes the jobs posted for that port one after the other
+class PortWorker(threading.Thread):
+    def __init__(self,key):
+        super(PortWorker,self).__init__(name="PortWorker-{0}".format(key))
+        self.daemon = True
+        self.key = key
+        self.jobs = queue.Queue()
+        self.lock = threading.Lock()
+        self.pending = 0 # number of jobs posted and not yet finished
+
+    # True while jobs posted are not yet finished
+    @property
+    def busy(self):
+        return self.pending > 0
+
+    def post(self,job):
+        with self.lock:
+            self.pending += 1
+        self.jobs.put(job)
+
+    # to be called by each job once it is done, before it signals its results, such that a job posted in reaction
+    # to those results does not find the worker still busy
+    def finished(self):
+        with self.lock:
+            self.pending -= 1
+
+    def stop(self):
+        self.jobs.put(None)
+
+    def run(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                break
+            try:
+                job()
+            except Exception:
+                pass
+
+
+# the results of one sampling round; late results delivered after the round was closed are dropped
+class AcquisitionRound(object):
+    def __init__(self,jobs):
+        self.cond = threading.Condition()
+        self.pending = jobs
+        self.closed = False
+        self.results = {}
+
+    def deliver(self,slot,result):
+        with self.cond:
+            if not self.closed:
+                self.results[slot] = result
+
+    def done(self):
+        with self.cond:
+            self.pending -= 1
+            self.cond.notify_all()
+
+    # waits until all jobs are done or the deadline (absolute clock() time) is reached and returns the results collected so far
+    def close(self,deadline):
+        with self.cond:
+            while self.pending > 0:
+                remaining = deadline - clock()
+                if remaining <= 0:
+                    break
+                self.cond.wait(remaining)
+            self.closed = True
+            return dict(self.results)
+
+
+# groups is a list of (key,[(slot,fn),..]) tuples. All fn of one group are called in order on the worker owning
+# the port <key> while the groups are processed concurrently. A reading fn() that is not delivered within the
+# deadline is missing from the result of sample(). If a worker is still busy with a job of a previous round,
+# its port is skipped for this round not to access the same port concurrently.
+class AcquisitionPool(object):
+    def __init__(self):
+        self.workers = {}
+
+    def sample(self,groups,timeout):
+        deadline = clock() + timeout
+        active = [(key,jobs) for (key,jobs) in groups if not (key in self.workers and self.workers[key].busy)]
+        acquisition_round = AcquisitionRound(len(active))
+        self.prune([key for (key,_) in groups])
+        for (key,jobs) in active:
+            w = self.worker(key)
+            w.post(self.job(acquisition_round,jobs,w))
+        return acquisition_round.close(deadline)
+
+    @staticmethod
+    def job(acquisition_round,jobs,worker):
+        def run():
+            try:
+                for (slot,fn) in jobs:
+                    if acquisition_round.closed:
+                        break
+                    acquisition_round.deliver(slot,fn())
+            finally:
+                worker.finished()
+                acquisition_round.done()
+        return run
+
+    def worker(self,key):
+        if key not in self.workers:
+            w = PortWorker(key)
+            self.workers[key] = w
+            w.start()
+        return self.workers[key]
+
+    # stops the workers of ports that are not in use any longer
+    def prune(self,keys):
+        for key in list(self.workers.keys()):
+            if key not in keys:
+                self.workers.pop(key).stop()
+
+    def stop(self):
+        self.prune([])
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 
 import time
+from collections import deque
 from struct import unpack
 from multiprocessing import Pipe
 import threading
@@ -33,6 +34,7 @@ class AillioR1:
     AILLIO_STATE_ROASTING = 0x06
     AILLIO_STATE_COOLING = 0x08
     AILLIO_STATE_SHUTDOWN = 0x09
+    AILLIO_HISTORY = 600 # number of frames kept in the history (1min at 10 frames per second)
 
     def __init__(self, debug=True):
         self.AILLIO_DEBUG = debug
@@ -51,6 +53,12 @@ class AillioR1:
         self.worker_thread = None
         self.worker_thread_run = True
         self.roast_number = -1
+        # buffered acquisition
+        self.history = deque(maxlen=self.AILLIO_HISTORY) # (time, bt, dt, exitt, fan, heater, drum) of the valid frames received
+        self.frame_time = None # the time the last frame was received
+        self.frames = 0 # number of frames received
+        self.invalid_frames = 0 # number of frames received not holding valid readings
+        self.dropped_frames = 0 # number of frames that could not be read from the device
 
     def __del__(self):
         self.__close()
@@ -171,6 +179,25 @@ class AillioR1:
         self.__getstate()
         return self.r1state
 
+    # returns the readings of the latest frame received as dict
+    def get_readings(self):
+        self.__getstate()
+        return {"bt": self.bt, "dt": self.dt, "heater": self.heater, "fan": self.fan, "drum": self.drum,
+                "voltage": self.voltage, "bt_ror": self.bt_ror, "exitt": self.exitt, "state": self.r1state,
+                "state_str": self.state_str, "roast_number": self.roast_number}
+
+    # returns the (time, bt, dt, exitt, fan, heater, drum) tuples of the valid frames received since the given time
+    def get_history(self, since=0):
+        self.__getstate()
+        return [h for h in self.history if h[0] > since]
+
+    # returns the number of frames received, of those not holding valid readings and of those that could not be read,
+    # and the age in seconds of the latest frame
+    def get_frame_stats(self):
+        self.__getstate()
+        return {"frames": self.frames, "invalid": self.invalid_frames, "dropped": self.dropped_frames,
+                "latency": (time.time() - self.frame_time if self.frame_time is not None else -1)}
+
     def set_heater(self, value):
         self.__dbg('set_heater ' + str(value))
         value = int(value)
@@ -242,15 +269,23 @@ class AillioR1:
                 cmd = p.recv()
                 self.__sendcmd(cmd)
             if len(state1) + len(state2) == 128:
-                p.send(state1 + state2)
+                p.send((time.time(), state1 + state2))
+            else:
+                self.dropped_frames += 1
             time.sleep(0.1)
 
+    # decodes all frames received since the last call; the history keeps the readings of all of them while the
+    # state reflects the latest one
     def __getstate(self):
         self.__dbg('getstate')
         self.__open()
-        if not self.parent_pipe.poll():
-            return
-        state = self.parent_pipe.recv()
+        while self.parent_pipe.poll():
+            frame_time, state = self.parent_pipe.recv()
+            self.__decodestate(frame_time, state)
+
+    def __decodestate(self, frame_time, state):
+        self.frames += 1
+        self.frame_time = frame_time
         valid = state[41]
         # Heuristic to find out if the data is valid
         # It looks like we get a different message every 15 seconds
@@ -282,6 +317,9 @@ class AillioR1:
             self.__dbg('heater: ' + str(self.heater))
             self.__dbg('drum speed: ' + str(self.drum))
             self.__dbg('time: ' + str(self.minutes) + ':' + str(self.seconds))
+            self.history.append((frame_time, self.bt, self.dt, self.exitt, self.fan, self.heater, self.drum))
+        else:
+            self.invalid_frames += 1
 
         state = state[64:]
         self.coil_fan2 = round(unpack('i', state[32:36])[0], 1)
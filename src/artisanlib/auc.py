@@ -0,0 +1,119 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# ABOUT
+# Area under the curve (AUC) computation for the open-source roast logging software Artisan.
+
+# LICENSE
+# This program or module is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 2 of the License, or
+# version 3 of the License, or (at your option) any later versison. It is
+# provided for educational purposes and is distributed in the hope that
+# it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See
+# the GNU General Public License for more details.
+
+import numpy
+
+# readings above this limit (in C) are taken as 0
+AUClimit = 500
+
+# returns the given temperatures in the given mode as numpy array of C values clamped to [0,AUClimit]
+# values above AUClimit, below 0 and missing readings (None) are taken as 0
+def temperaturesC(temp,mode):
+    a = numpy.array(temp,dtype=numpy.float64)
+    if mode == "F":
+        # like fromFtoC(), -1 is not converted
+        valid = (a != -1)
+        a[valid] = (a[valid] - 32.0)*(5.0/9.0)
+    a[a > AUClimit] = 0
+    return numpy.fmax(a,0) # NaN (None) values become 0
+
+# returns the areas (in C*seconds) between the readings i-1 and i for all i of [lo,hi)
+#  base: the base temperature in C
+#  tx: numpy array of time points
+#  t: numpy array of clamped C temperatures (see temperaturesC())
+#  t2: if given, the area between t and t2 is calculated instead, assuming t>t2, and the base is ignored
+def segmentAreas(base,tx,t,lo,hi,t2=None):
+    dt = tx[lo:hi] - tx[lo-1:hi-1]
+    ta = (t[lo:hi] + t[lo-1:hi-1]) / 2.0
+    if t2 is None:
+        return numpy.fmax(0,ta - base) * dt
+    else:
+        ea = (t2[lo:hi] + t2[lo-1:hi-1]) / 2.0
+        return numpy.fmax(0,ta - ea) * dt
+
+# returns the area (in C*seconds) above base and below temp from reading start to end over the converted arrays tx and t
+# (and between temp and temp2 where temp2 readings are available if t2 is given)
+def areaC(base,tx,t,start,end,t2=None):
+    lo = max(1,start)
+    hi = min(end,len(tx),len(t))
+    if hi <= lo:
+        return 0
+    if t2 is None or len(t2) < 2:
+        return float(segmentAreas(base,tx,t,lo,hi).sum())
+    else:
+        # between temp and temp2 as long as temp2 readings are available, above base beyond
+        hd = max(lo,min(hi,len(t2)))
+        return float(segmentAreas(base,tx,t,lo,hd,t2).sum() + segmentAreas(base,tx,t,hd,hi).sum())
+
+# returns the area (in C*seconds) above base (in C) and below temp (in mode) between the readings start and end
+# if temp2 is given, the area between temp and temp2 is calculated, assuming temp>temp2, and the base is ignored
+# equals the sum of ApplicationWindow.calcAUC(base,timex,temp,i,temp2) over i in range(start,end)
+def AUC(base,timex,temp,mode,start,end,temp2=None):
+    lo = max(1,start)
+    hi = min(end,len(timex),len(temp))
+    if hi <= lo:
+        return 0
+    # only the readings lo-1,..,hi-1 are converted
+    tx = numpy.array(timex[lo-1:hi],dtype=numpy.float64)
+    t = temperaturesC(temp[lo-1:hi],mode)
+    if temp2 is None:
+        t2 = None
+    elif len(temp2) < 2:
+        t2 = numpy.zeros(0)
+    else:
+        t2 = temperaturesC(temp2[lo-1:hi],mode)
+    return areaC(base,tx,t,1,hi-lo+1,t2)
+
+# returns the AUC(ET-BT), AUC(ET) and AUC(BT) (in C*seconds) between the readings start and end, converting the profile only once
+#  ETbase, BTbase: the base temperatures in C
+def AUCs(ETbase,BTbase,timex,temp1,temp2,mode,start,end):
+    tx = numpy.array(timex,dtype=numpy.float64)
+    t1 = temperaturesC(temp1,mode)
+    t2 = temperaturesC(temp2,mode)
+    delta = areaC(BTbase,tx,t1,start,end,t2)
+    ET = areaC(ETbase,tx,t1,start,end)
+    BT = areaC(BTbase,tx,t2,start,end)
+    return delta, ET, BT
+
+
+# Running AUC of a growing profile during recording.
+# On each update() only the readings added since the previous call are converted and integrated. The first
+# call after a reset or after a change of the start index, the base temperature or the length of the profile
+# to a smaller one accounts only for the last segment.
+class AUCAccumulator(object):
+    __slots__ = ["start","base","index"]
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.start = None # the AUC start index of the current accumulation
+        self.base = None # the base temperature of the current accumulation
+        self.index = None # the index of the last reading accounted for
+
+    # returns the area (in C*seconds) above base (in C) and below temp added since the last call
+    def update(self,start,base,timex,temp,mode):
+        n = min(len(timex),len(temp))
+        if n < 2:
+            self.reset()
+            return 0
+        if self.index is None or start != self.start or base != self.base or self.index >= n:
+            self.start = start
+            self.base = base
+            self.index = n - 2
+        res = AUC(base,timex,temp,mode,self.index + 1,n)
+        self.index = n - 1
+        return res
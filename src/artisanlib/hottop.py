@@ -1,6 +1,6 @@
 #!/usr/bin/env python
 from multiprocessing import Process, Lock
-from multiprocessing.sharedctypes import Value
+from multiprocessing.sharedctypes import Value, RawArray
 from ctypes import c_bool, c_double
 import serial
 
@@ -28,6 +28,10 @@ xSOLENOID = None # False: closed; True: open
 xDRUM_MOTOR = None
 xCOOLING_MOTOR = None
 xCHAFF_TRAY = None
+# frame ring buffer: each valid frame received is written into the ring by the worker process and read by getHottop()
+xFRAMES = None # the ring of ring_frames frames of frame_size doubles each
+xFRAME_COUNT = None # the number of frames written into the ring since start
+xFRAME_ERRORS = None # the number of frames received incomplete or with a wrong checksum since start
 # set values
 xSET_HEATER = None
 xSET_FAN = None
@@ -36,6 +40,25 @@ xSET_SOLENOID = None # False: closed; True: open
 xSET_DRUM_MOTOR = None
 xSET_COOLING_MOTOR = None
 
+# frame layout
+FRAME_TIME = 0 # the time.time() the frame was received
+FRAME_BT = 1
+FRAME_ET = 2
+FRAME_HEATER = 3
+FRAME_FAN = 4
+FRAME_MAIN_FAN = 5
+FRAME_SOLENOID = 6
+FRAME_DRUM_MOTOR = 7
+FRAME_COOLING_MOTOR = 8
+FRAME_CHAFF_TRAY = 9
+frame_size = 10
+ring_frames = 128 # at an interval of 0.6s the ring holds the frames of the last 76sec
+
+# reader state of getHottop()
+lastFrame = 0 # the number of frames read from the ring
+lastValues = (-1, -1, 0, 0) # the last values returned by getHottop()
+frameStats = {"frames":0,"lost":0,"errors":0,"latency":0.} # see getHottopFrameStats()
+
 if sys.version < '3':
     def hex2int(h1,h2=""):
         return int(binascii.hexlify(h1+h2),16)
@@ -107,7 +130,8 @@ def gettemperatures(p,retry=True):
 
 def doWork(interval, comport, baudrate, bytesize, parity, stopbits, timeout,
         aBT, aET, aHEATER, aFAN, aMAIN_FAN, aSOLENOID, aDRUM_MOTOR, aCOOLING_MOTOR, aCHAFF_TRAY,
-        aSET_HEATER, aSET_FAN, aSET_MAIN_FAN, aSET_SOLENOID, aSET_DRUM_MOTOR, aSET_COOLING_MOTOR, aCONTROL):
+        aSET_HEATER, aSET_FAN, aSET_MAIN_FAN, aSET_SOLENOID, aSET_DRUM_MOTOR, aSET_COOLING_MOTOR, aCONTROL,
+        aFRAMES, aFRAME_COUNT, aFRAME_ERRORS):
     SP = serial.Serial()
     # configure serial port
     if serial.VERSION.split(".")[0].strip() == "2":
@@ -127,18 +151,14 @@ def doWork(interval, comport, baudrate, bytesize, parity, stopbits, timeout,
     while True:
         # logging part
         BT, ET, HEATER, FAN, MAIN_FAN, SOLENOID, DRUM_MOTOR, COOLING_MOTOR, CHAFF_TRAY = gettemperatures(SP)
-        if BT != -1:
-            if aBT.value == -1:
-                aBT.value = float(BT)
-            else:
-                # we compute a running average to compensate for the low precisions
-                aBT.value = (aBT.value + float(BT)) / 2.0
+        if BT == -1:
+            aFRAME_ERRORS.value += 1
+        else:
+            writeFrame(aFRAMES,aFRAME_COUNT,(time.time(),BT,ET,HEATER,FAN,MAIN_FAN,SOLENOID,DRUM_MOTOR,COOLING_MOTOR,CHAFF_TRAY))
+            # the readings of the frames are averaged on reading the ring, here we keep the latest for the control part
+            aBT.value = float(BT)
         if ET != -1:
-            if aET.value == -1:
-                aET.value = ET
-            else:
-                # we compute a running average to compensate for the low precisions
-                aET.value = (aET.value + float(ET)) / 2.0
+            aET.value = float(ET)
         if HEATER != -1:
             aHEATER.value = HEATER
         if FAN != -1:
@@ -152,7 +172,7 @@ def doWork(interval, comport, baudrate, bytesize, parity, stopbits, timeout,
         if COOLING_MOTOR != -1:
             aCOOLING_MOTOR.value = COOLING_MOTOR
         if CHAFF_TRAY != -1:
-            aCHAFF_TRAY.value = xCHAFF_TRAY
+            aCHAFF_TRAY.value = CHAFF_TRAY
 
         # control part
         if aCONTROL.value:
@@ -171,6 +191,33 @@ def doWork(interval, comport, baudrate, bytesize, parity, stopbits, timeout,
         time.sleep(interval)
       
 
+# Frame ring buffer
+
+# writes the given frame into the next slot of the ring and publishes it by incrementing the frame count
+def writeFrame(frames,frame_count,frame):
+    n = frame_count.value
+    pos = (n % ring_frames) * frame_size
+    frames[pos:pos+frame_size] = [float(v) for v in frame]
+    frame_count.value = n + 1
+
+# returns the list of frames written into the ring since the frame with number start, the number of frames written
+# and the number of frames lost as they were overwritten before being read
+def readFrames(frames,frame_count,start):
+    n = frame_count.value
+    # the slot of frame n might be written while we read, thus we only read up to ring_frames-1 frames
+    first = max(start,n - (ring_frames - 1))
+    res = []
+    for i in range(first,n):
+        pos = (i % ring_frames) * frame_size
+        res.append(frames[pos:pos+frame_size])
+    # frames overwritten during the read are dropped
+    m = frame_count.value
+    valid = max(first,m - (ring_frames - 1))
+    if valid > first:
+        res = res[valid - first:]
+    return res, n, max(0,valid - start)
+
+
 # Control processing 
 
 def sendControl(p,aHEATER, aFAN, aMAIN_FAN, aSOLENOID, aDRUM_MOTOR, aCOOLING_MOTOR,
@@ -241,12 +288,31 @@ def releaseHottopControl():
 # heater : int(0-100)
 # main_fan : 0-100 (will be converted from the internal int(0-10))
 # solenoid : bool
+# BT/ET are the averages of the readings of all frames received since the previous call; if no frame was received
+# since, the previous values are returned
 def getHottop():
-    if xBT != None and xET != None and xHEATER != None and xMAIN_FAN != None:
-        return xBT.value, xET.value, xHEATER.value, xMAIN_FAN.value * 10
+    global lastFrame, lastValues
+    if xFRAMES != None and xFRAME_COUNT != None:
+        frames, lastFrame, lost = readFrames(xFRAMES,xFRAME_COUNT,lastFrame)
+        now = time.time()
+        frameStats["lost"] += lost
+        frameStats["errors"] = xFRAME_ERRORS.value
+        if frames:
+            frameStats["frames"] += len(frames)
+            frameStats["latency"] = now - frames[-1][FRAME_TIME]
+            BT = sum(f[FRAME_BT] for f in frames) / len(frames)
+            ET = sum(f[FRAME_ET] for f in frames) / len(frames)
+            lastValues = (BT, ET, int(frames[-1][FRAME_HEATER]), int(frames[-1][FRAME_MAIN_FAN]) * 10)
+        return lastValues
     else:
         return -1, -1, 0, 0
 
+# returns a dict with the number of frames received ("frames"), the number of frames lost as they were overwritten in the ring
+# before being read ("lost"), the number of frames received incomplete or with wrong checksum ("errors") and the latency
+# in seconds between the reception of the last frame and its reading ("latency")
+def getHottopFrameStats():
+    return dict(frameStats)
+
 
 # heater : int(0-100)
 # fan, main_fan : int(0-100) (will be converted to the internal int(0-10))
@@ -271,6 +337,7 @@ def setHottop(heater=None,fan=None,main_fan=None,solenoid=None,drum_motor=None,c
 # interval has to be smaller than 1 (= 1sec)
 def startHottop(interval=1,comport="COM4",baudrate=115200,bytesize=8,parity='N',stopbits=1,timeout=0.5):
     global process, xCONTROL, xBT, xET, xHEATER, xFAN, xMAIN_FAN, xSOLENOID, xDRUM_MOTOR, xCOOLING_MOTOR, xCHAFF_TRAY, \
+        xFRAMES, xFRAME_COUNT, xFRAME_ERRORS, lastFrame, lastValues, frameStats, \
         xSET_HEATER, xSET_FAN, xSET_MAIN_FAN, xSET_SOLENOID, xSET_DRUM_MOTOR, xSET_COOLING_MOTOR
     try:
         if process:
@@ -289,6 +356,13 @@ def startHottop(interval=1,comport="COM4",baudrate=115200,bytesize=8,parity='N',
             xDRUM_MOTOR = Value(c_bool, False, lock=lock)
             xCOOLING_MOTOR = Value(c_bool, False, lock=lock)
             xCHAFF_TRAY = Value(c_bool, False, lock=lock)
+            # the frame ring buffer
+            xFRAMES = RawArray(c_double, ring_frames * frame_size)
+            xFRAME_COUNT = Value('L', 0, lock=lock)
+            xFRAME_ERRORS = Value('L', 0, lock=lock)
+            lastFrame = 0
+            lastValues = (-1, -1, 0, 0)
+            frameStats = {"frames":0,"lost":0,"errors":0,"latency":0.}
             # set variables to write to the Hottop
             xSET_HEATER = Value('i', -1, lock=lock)
             xSET_FAN = Value('i', -1, lock=lock)
@@ -300,7 +374,8 @@ def startHottop(interval=1,comport="COM4",baudrate=115200,bytesize=8,parity='N',
             
             process = Process(target=doWork, args=(interval,comport,baudrate,bytesize,parity,stopbits,timeout,
                 xBT, xET, xHEATER, xFAN, xMAIN_FAN, xSOLENOID, xDRUM_MOTOR, xCOOLING_MOTOR, xCHAFF_TRAY, \
-                xSET_HEATER, xSET_FAN, xSET_MAIN_FAN, xSET_SOLENOID, xSET_DRUM_MOTOR, xSET_COOLING_MOTOR, xCONTROL))
+                xSET_HEATER, xSET_FAN, xSET_MAIN_FAN, xSET_SOLENOID, xSET_DRUM_MOTOR, xSET_COOLING_MOTOR, xCONTROL,
+                xFRAMES, xFRAME_COUNT, xFRAME_ERRORS))
             process.start()
             return True
     except Exception:
@@ -89,7 +89,7 @@ from PyQt5.QtGui import (QImageReader, QWindow,  # @Reimport
 from PyQt5.QtPrintSupport import (QPrinter,QPrintDialog)  # @Reimport
 from PyQt5.QtCore import (QLibraryInfo, QTranslator, QLocale, QFileInfo, PYQT_VERSION_STR, pyqtSignal,  # @Reimport
                           QT_VERSION_STR,QTime, QTimer, QFile, QIODevice, QTextStream, QSettings,   # @Reimport
-                          QRegExp, QDate, QUrl, QDir, QVariant, Qt, QPoint, QEvent, QDateTime, QThread, QSemaphore)  # @Reimport
+                          QRegExp, QDate, QUrl, QDir, QVariant, Qt, QPoint, QEvent, QDateTime, QThread, QSemaphore, QStandardPaths)  # @Reimport
 
 import matplotlib as mpl
 from matplotlib import cm
@@ -162,6 +162,20 @@ from artisanlib.suppress_errors import suppress_stdout_stderr
 from artisanlib.s7port import s7port
 from artisanlib.compat import decs2string, arange, stringp, uchr, o, u, d, encodeLocal, hex2int, s2a, cmd2str, str2cmd
 from artisanlib.modbusport import modbusport
+from artisanlib.acquisition import AcquisitionPool
+from artisanlib.mathexpression import compile_expression, math_functions, shift_index
+from artisanlib.ror import DecayAverage
+from artisanlib.profilestore import ProfileColumn, TimeIndex, columnView
+from artisanlib.similarity import curveSimilarities
+from artisanlib.auc import AUCs, AUCAccumulator
+from artisanlib.profileformat import isBinaryProfile, readProfile, writeBinaryProfile, convertProfile
+from artisanlib.profilemetadata import ProfileMetadataCache
+from artisanlib.reports import reportEntries, profileProductionData, profileRankingData, cuppingSum, AUCstartidx
+from artisanlib.sampling import ChannelAccumulator, ChannelNoise, aggregate as aggregateReadings
+from artisanlib.serialmux import multiplexer as serialMultiplexer
+from artisanlib.scene import RetainedLayer, FrameBudget, LevelOfDetail, clearAxes, snapshot
+from artisanlib.render import renderProfiles
+from artisanlib.units import convertTemps, convertRoRs, convertExtraTemps, convertProfileFiles, profileFiles
 
 
 artisan_slider_style = """
@@ -729,6 +743,13 @@ class tgraphcanvas(FigureCanvas):
         # oversampling flag
         self.oversampling = True
         self.oversampling_min_delay = 1000 # in contrast to what the user dialog says (3000) we enable oversampling already with 1s
+        self.oversampling_reads = 2 # the number of readings taken per sampling interval
+        self.oversampling_aggregation = 0 # the combination of those readings: 0: mean, 1: median, 3: trimmed mean
+        self.oversampling_extra = False # if set, also the extra devices are oversampled
+        
+        # parallel sampling flag: if set the main device and all extra devices are read concurrently, one worker per physical port
+        self.parallel_sampling = False
+        self.parallel_sampling_deadline = 0 # in miliseconds; readings not received within this deadline are recorded as -1 (0: use the sampling interval)
         
         # extra event sampling interval in miliseconds. If 0, then extra sampling commands are sent "in sync" with the standard sampling commands
         self.extra_event_sampling_delay = 0 # sync, 0.5s, 1.0s, 1.5s,.., 5s => 0, 500, 1000, 1500, ..
@@ -770,6 +791,7 @@ class tgraphcanvas(FigureCanvas):
         self.AUCLCDmode = 0 # one of 0: abs value, 1: delta to target/background, 2: AUC since FCs
         self.AUCvalue = 0 # the running AUC value calculated during recording
         self.AUCsinceFCs = 0 # the running AUC since FCs calculated during recording
+        self.AUCaccumulator = AUCAccumulator() # integrates the readings added since the last AUC update
         self.AUCguideTime = 0 # the expected time in seconds the AUC target is reached (calculated by the AUC guide mechanism)
         self.AUCshowFlag = False
 
@@ -789,6 +811,9 @@ class tgraphcanvas(FigureCanvas):
         self.phidget1048_changeTriggersValues = [x / 10.0 for x in range(0, 11, 1)]
         self.phidget1048_changeTriggersStrings = list(map(lambda x:str(x) + "C",self.phidget1048_changeTriggersValues))
         self.phidget1048_dataRate = 256 # in ms; (Phidgets default 8ms, 16ms if wireless is active on v21 API, 256ms on v22 API)
+        
+        # the aggregation of the readings of async channels received within one sampling interval: 0: mean, 1: median, 2: last
+        self.phidgetAsyncAggregation = 0
 
         self.phidget1045_async = False
         self.phidget1045_changeTrigger = 0.2
@@ -998,6 +1023,16 @@ class tgraphcanvas(FigureCanvas):
 
         self.ax = self.fig.add_subplot(111,facecolor=self.palette["background"])
         self.delta_ax = self.ax.twinx()
+        
+        # the artists of the background profile are kept by redraw() as long as the background and its presentation do not change
+        self.background_layer = RetainedLayer()
+        # the rcParams the kept axes were created with, see redraw()
+        self.axes_style = None
+        
+        # long static curves are decimated to the points visible per pixel, recomputed on zoom, pan and resize
+        self.lod = LevelOfDetail()
+        self.connectLOD(self.ax)
+        self.connectLOD(self.delta_ax)
 
         #legend location
         self.legendloc = 7
@@ -1015,6 +1050,7 @@ class tgraphcanvas(FigureCanvas):
         self.fig.canvas.mpl_connect('button_press_event', self.onclick)
         self.fig.canvas.mpl_connect('pick_event', self.onpick)
         self.fig.canvas.mpl_connect('draw_event', self._draw_event)
+        self.fig.canvas.mpl_connect('resize_event', self.updateLOD)
 
         # set the parent widget
         self.setParent(parent)
@@ -1077,14 +1113,17 @@ class tgraphcanvas(FigureCanvas):
         self.divots_flag = False
 
         #list to store the time of each reading. Most IMPORTANT variable.
-        self.timex = []
+        #recorded series are array-backed (see ProfileColumn) to be handed to matplotlib and numpy without conversion,
+        #series of loaded profiles may be plain lists
+        self.timex = ProfileColumn()
 
         #lists to store temps and rates of change. Second most IMPORTANT variables. All need same dimension.
         #self.temp1 = ET ; self.temp2 = BT; self.delta1 = deltaMET; self.delta2 = deltaBT
-        self.temp1,self.temp2,self.delta1, self.delta2 = [],[],[],[]
+        self.temp1,self.temp2,self.delta1, self.delta2 = ProfileColumn(),ProfileColumn(),ProfileColumn(),ProfileColumn()
         self.stemp1,self.stemp2 = [],[] # smoothed versions of temp1/temp2 used in redraw()
         self.tstemp1,self.tstemp2 = [],[] # (temporarily) smoothed version of temp1/temp2 used in sample() to compute the RoR
-        self.ctimex1, self.ctimex2, self.ctemp1,self.ctemp2 = [], [],[],[] # (potential shorter) variants of timex/temp1/temp2 with -1 dropout values removed
+        # (potential shorter) variants of timex/temp1/temp2 with -1 dropout values removed, stored array-backed to be handed to matplotlib without conversion
+        self.ctimex1, self.ctimex2, self.ctemp1,self.ctemp2 = ProfileColumn(),ProfileColumn(),ProfileColumn(),ProfileColumn()
         self.unfiltereddelta1, self.unfiltereddelta2 = [],[] # used in sample()   
 
         #indexes for CHARGE[0],DRYe[1],FCs[2],FCe[3],SCs[4],SCe[5],DROP[6] and COOLe[7]
@@ -1113,6 +1152,9 @@ class tgraphcanvas(FigureCanvas):
         self.roastbatchprefixB = u("")
         self.roastbatchposB = 1
         self.temp1B,self.temp2B,self.temp1BX,self.temp2BX,self.timeB = [],[],[],[],[]
+        # cached numpy copies of timex and timeB for time2index() and backgroundtime2index()
+        self.timexIndex = TimeIndex()
+        self.timeBIndex = TimeIndex()
         self.stemp1B,self.stemp2B,self.stemp1BX,self.stemp2BX = [],[],[],[] # smoothed versions of the background curves
         self.extraname1B,self.extraname2B = [],[]
         self.extratimexB = []
@@ -1504,6 +1546,9 @@ class tgraphcanvas(FigureCanvas):
         self.autosavepath = ""
         
         self.autosavepdf = False # if true save PDF along alog files
+        
+        self.binaryprofiles = False # if true profiles are saved in the binary format (see artisanlib.profileformat)
+        self.binaryprofilescompression = True # if true the time series of binary profiles are compressed
 
         #used to place correct height of text to avoid placing text over text (annotations)
         self.ystep_down = 0
@@ -1751,6 +1796,8 @@ class tgraphcanvas(FigureCanvas):
         self.ax_background = None
         self.delayTimeout = 10
         self.block_update = False
+        self.blit_animated = False # True if the artists of blitArtists() are animated and thus not part of ax_background
+        self.frame_budget = FrameBudget() # statistics on the time taken by the chart updates while sampling
         
         # flag to toggle between Temp and RoR scale of xy-display
         self.fmt_data_RoR = False
@@ -1833,6 +1880,9 @@ class tgraphcanvas(FigureCanvas):
             self.resetlinecountcaches() # ensure that the line counts are up to date
             self.resetlines() # get rid of HUD, projection, cross lines and AUC line
             self.resetdeltalines() # just in case
+            if self.flagon:
+                # while sampling, the per-sample artists are excluded from the background and blitted on top of it
+                self.setAnimated(True)
             
             # ask the canvas to kindly draw it self some time in the future
             # when Qt thinks it is convenient
@@ -1848,10 +1898,90 @@ class tgraphcanvas(FigureCanvas):
             except:
                 pass
             
-            self.ax_background = self.fig.canvas.copy_from_bbox(aw.qmc.ax.get_figure().bbox)
+            if self.ax_background is None: # not yet cached by _draw_event()
+                self.ax_background = self.fig.canvas.copy_from_bbox(aw.qmc.ax.get_figure().bbox)
             
         self.block_update = False
 
+    # connects the decimation of long curves to changes of the x-limits of the given axes
+    def connectLOD(self,ax):
+        ax.callbacks.connect('xlim_changed',self.updateLOD)
+
+    def updateLOD(self,*_):
+        try:
+            self.lod.update(self.ax)
+        except Exception as e:
+            _, _, exc_tb = sys.exc_info()
+            aw.qmc.adderror((QApplication.translate("Error Message","Exception:",None) + " updateLOD() {0}").format(str(e)),exc_tb.tb_lineno)
+
+    # returns the artists updated on each sample, drawn on top of ax_background on each update of the canvas
+    def blitArtists(self):
+        artists = []
+        # delta lines
+        if self.DeltaETflag and self.l_delta1 is not None:
+            artists.append(self.l_delta1)
+        if self.DeltaBTflag and self.l_delta2 is not None:
+            artists.append(self.l_delta2)
+        # extra curves
+        xtra_dev_lines1 = 0
+        xtra_dev_lines2 = 0
+        for i in range(min(len(aw.extraCurveVisibility1),len(aw.extraCurveVisibility1),len(self.extratimex),len(self.extratemp1),len(self.extradevicecolor1),len(self.extraname1),len(self.extratemp2),len(self.extradevicecolor2),len(self.extraname2))):
+            if aw.extraCurveVisibility1[i] and len(self.extratemp1lines) > xtra_dev_lines1:
+                artists.append(self.extratemp1lines[xtra_dev_lines1])
+                xtra_dev_lines1 = xtra_dev_lines1 + 1
+            if aw.extraCurveVisibility2[i] and len(self.extratemp2lines) > xtra_dev_lines2:
+                artists.append(self.extratemp2lines[xtra_dev_lines2])
+                xtra_dev_lines2 = xtra_dev_lines2 + 1
+        # ET/BT
+        if self.ETcurve and self.l_temp1 is not None:
+            artists.append(self.l_temp1)
+        if self.BTcurve and self.l_temp2 is not None:
+            artists.append(self.l_temp2)
+        if self.device == 18 and self.l_timeline is not None: # not NONE device
+            artists.append(self.l_timeline)
+        if self.BTcurve:
+            artists.extend(self.l_annotations)
+        if self.projectFlag:
+            if self.l_BTprojection is not None and self.BTcurve:
+                artists.append(self.l_BTprojection)
+            if self.l_ETprojection is not None and self.ETcurve:
+                artists.append(self.l_ETprojection)
+        if self.AUCguideFlag and self.AUCguideTime and self.AUCguideTime > 0 and self.l_AUCguide is not None:
+            artists.append(self.l_AUCguide)
+        # mouse cross lines
+        for a in [self.l_horizontalcrossline,self.l_verticalcrossline,self.base_horizontalcrossline,self.base_verticalcrossline]:
+            if a is not None:
+                artists.append(a)
+        return artists
+
+    # marks the artists of blitArtists() as animated (excluded from full draws of the canvas) or not
+    def setAnimated(self,animated):
+        for a in self.blitArtists():
+            a.set_animated(animated)
+        self.blit_animated = animated
+
+    # saves the figure like fig.savefig() including the artists of blitArtists(), which are left out by full draws while animated
+    def savefig(self,fname,**kwargs):
+        animated = self.blit_animated
+        if animated:
+            self.setAnimated(False)
+        try:
+            self.fig.savefig(fname,**kwargs)
+        finally:
+            if animated:
+                self.setAnimated(True)
+
+    # draws the artists of blitArtists() into the canvas buffer
+    def drawAnimated(self):
+        for a in self.blitArtists():
+            self.ax.draw_artist(a)
+
+    # restores the cached background and blits the artists of blitArtists() on top of it
+    def blitAnimated(self):
+        self.fig.canvas.restore_region(self.ax_background)
+        self.drawAnimated()
+        self.fig.canvas.blit(self.fig.bbox)
+
     def getetypes(self):
         if len(self.etypes) == 4:
             self.etypes.append("--")
@@ -1991,9 +2121,17 @@ class tgraphcanvas(FigureCanvas):
 
     # hook up to mpls event handling framework for draw events
     # this is emitted after the canvas has finished a full redraw
-    def _draw_event(self, _):
+    def _draw_event(self, event):
         #self.fig.canvas.flush_events() # THIS prevents the black border on >Qt5.5, but slows down things (especially resizings) on redraw otherwise!!!
-        self.ax_background = None
+        if not isinstance(event.canvas,FigureCanvas):
+            # draws of the canvases used to print the figure to a file (like SVG or PDF) do not touch the on-screen background
+            return
+        if self.blit_animated and not self.designerflag:
+            # the animated artists are not part of the full draw, thus we cache the background now and draw them on top
+            self.ax_background = self.fig.canvas.copy_from_bbox(self.fig.bbox)
+            self.drawAnimated()
+        else:
+            self.ax_background = None
         
 
     def onpick(self,event):
@@ -2378,62 +2516,21 @@ class tgraphcanvas(FigureCanvas):
                     try:
                         if not self.block_update:
                             if self.tempory_sample_trigger_redraw:
+                                # the x-axis got extended; a full draw of the canvas suffices as the artists did not change
                                 self.tempory_sample_trigger_redraw = False
-                                aw.qmc.redraw()
-                            else:
+                                self.ax_background = None
                             #-- start update display
-                                if self.ax_background:
-                                    self.fig.canvas.restore_region(self.ax_background)
-                                    # draw eventtypes
-# this seems not to be needed and hides partially event by value "Combo-type" annotations
-#                                    if self.eventsshowflag and self.eventsGraphflag in [2,3,4]:
-#                                        aw.qmc.ax.draw_artist(self.l_eventtype1dots)
-#                                        aw.qmc.ax.draw_artist(self.l_eventtype2dots)
-#                                        aw.qmc.ax.draw_artist(self.l_eventtype3dots)
-#                                        aw.qmc.ax.draw_artist(self.l_eventtype4dots)
-                                    # draw delta lines
-                                    if self.DeltaETflag and self.l_delta1 is not None:
-                                        aw.qmc.ax.draw_artist(self.l_delta1)
-                                    if self.DeltaBTflag and self.l_delta2 is not None:
-                                        aw.qmc.ax.draw_artist(self.l_delta2)
-                                    # draw extra curves
-                                    xtra_dev_lines1 = 0
-                                    xtra_dev_lines2 = 0
-                                    for i in range(min(len(aw.extraCurveVisibility1),len(aw.extraCurveVisibility1),len(self.extratimex),len(self.extratemp1),len(self.extradevicecolor1),len(self.extraname1),len(self.extratemp2),len(self.extradevicecolor2),len(self.extraname2))):
-                                        if aw.extraCurveVisibility1[i] and len(self.extratemp1lines) > xtra_dev_lines1:
-                                            aw.qmc.ax.draw_artist(self.extratemp1lines[xtra_dev_lines1])
-                                            xtra_dev_lines1 = xtra_dev_lines1 + 1
-                                        if aw.extraCurveVisibility2[i] and len(self.extratemp2lines) > xtra_dev_lines2:
-                                            aw.qmc.ax.draw_artist(self.extratemp2lines[xtra_dev_lines2])
-                                            xtra_dev_lines2 = xtra_dev_lines2 + 1
-                                    # draw ET
-                                    if aw.qmc.ETcurve:
-                                        aw.qmc.ax.draw_artist(self.l_temp1)
-                                    # draw BT
-                                    if aw.qmc.BTcurve:
-                                        aw.qmc.ax.draw_artist(self.l_temp2)
-                                     
-                                    if aw.qmc.device == 18 and aw.qmc.l_timeline is not None: # not NONE device
-                                        aw.qmc.ax.draw_artist(aw.qmc.l_timeline)
-                                        
-                                    if aw.qmc.BTcurve:
-                                        for a in self.l_annotations:
-                                            aw.qmc.ax.draw_artist(a)
-                                    
-                                    if aw.qmc.projectFlag:
-                                        if self.l_BTprojection is not None and aw.qmc.BTcurve:
-                                            aw.qmc.ax.draw_artist(self.l_BTprojection)
-                                        if self.l_ETprojection is not None and aw.qmc.ETcurve:
-                                            aw.qmc.ax.draw_artist(self.l_ETprojection)
-                                            
-                                    if aw.qmc.AUCguideFlag and aw.qmc.AUCguideTime and aw.qmc.AUCguideTime > 0:
-                                        aw.qmc.ax.draw_artist(self.l_AUCguide)
-                                        
-                                    self.fig.canvas.blit(aw.qmc.ax.get_figure().bbox)
-                                        
-                                else:
-                                    # we do not have a background to bitblit, so do a full redraw
-                                    self.updateBackground() # does the canvas draw, but also fills the ax_background cache 
+                            frame_start = libtime.time()
+                            if self.ax_background:
+                                self.blitAnimated()
+                                full_draw = False
+                            else:
+                                # we do not have a background to bitblit, so do a full redraw
+                                self.updateBackground() # does the canvas draw, but also fills the ax_background cache 
+                                full_draw = True
+                            frame_time = libtime.time() - frame_start
+                            if self.frame_budget.add(frame_time,full_draw):
+                                aw.sendmessage(QApplication.translate("Message","Chart update took {0}ms exceeding the frame budget of {1}ms", None).format(int(round(frame_time*1000)),int(round(self.frame_budget.budget*1000))))
                             #-- end update display
                         
                         if aw.qmc.background and (aw.qmc.backgroundReproduce or aw.qmc.backgroundPlaybackEvents) and (aw.qmc.timeindex[0] > -1 or aw.qmc.timeindexB[0] < 0):
@@ -2500,7 +2597,7 @@ class tgraphcanvas(FigureCanvas):
             
             if type(self.timeindex) is list and len(self.timeindex) == 8: # ensure we have a valid self.timeindex array
             
-                if self.timeindex[0] != -1 and type(self.timex) is list and len(self.timex) > self.timeindex[0]:
+                if self.timeindex[0] != -1 and isinstance(self.timex,(list,ProfileColumn)) and len(self.timex) > self.timeindex[0]:
                     ts = tx - self.timex[self.timeindex[0]]
                 else:
                     ts = tx
@@ -3031,339 +3128,131 @@ class tgraphcanvas(FigureCanvas):
 
     # mathexpression = formula; t = a number to evaluate(usually time);
     # equeditnumber option = plotter edit window number; RTsname = option RealTime var name; RTsval = RealTime var val
+    # the expression is compiled only once (see artisanlib.mathexpression) and only the symbols it refers to are computed
     def eval_math_expression(self,mathexpression,t,equeditnumber=None, RTsname=None,RTsval=None,t_offset=0):
-        if len(mathexpression):              
-            mathdictionary = {"min":min,"max":max,"sin":math.sin,"cos":math.cos,"tan":math.tan,"pow":math.pow,"exp":math.exp,"pi":math.pi,"e":math.e,
-                              "abs":abs,"acos":math.acos,"asin":math.asin,"atan":math.atan,"log":math.log,"radians":math.radians,
-                              "sqrt":math.sqrt,"atan2":math.atan,"degrees":math.degrees}
-            #if sampling 
-            if RTsname:
-                if len(self.timex):
-                    index = len(self.timex)-1
-                else:
-                    index = 0
-                #load real time buffers acquired at sample() to the dictionary                  
-                mathdictionary["Y1"] = self.RTtemp1
-                mathdictionary["Y2"] = self.RTtemp2
-                for d in range(len(self.RTextratemp1)):
-                    mathdictionary["Y%i"%(d*2+3)] = self.RTextratemp1[d]
-                    mathdictionary["Y%i"%(d*2+4)] = self.RTextratemp2[d]
-                if str(RTsname) not in mathdictionary:
-                    mathdictionary[str(RTsname)] = float(RTsval)
-                    
-            else:#get index from the time. 
-                if len(self.timex):            
-                    index = self.time2index(t)  # If using the plotter with loaded profile. Background index done bellow at "B"
-                else:
-                    index = 0      #if plotting but nothing loaded.
-            #if background
-            if self.background and "B" in mathexpression:
-                bindex = self.backgroundtime2index(t)         #use background time
-
-            #under work: index for: self.extratimex, self.extratimexB, and mixP#
-                        
-            #timeshift working vars 
-            timeshiftexpressions = []           #holds strings like "Y10040" as explained below
-            timeshiftexpressionsvalues = []     #holds the evaluated values (float) for the above
-                        
+        if len(mathexpression):
             try:
+                compiled = compile_expression(mathexpression)
                 t = float(t)
-                #extract Ys
-                Yval = []                   #stores value number example Y9 = 9
-                mlen = len(mathexpression)
-                for i in range(mlen): 
-                    #Start symbolic assignment
-                    #Y + one digit
-                    if mathexpression[i] == "Y":
-                        #find Y number for ET,BT,Extras (upto 9)
-                        if i+1 < mlen:                          #check for out of range
-                            if mathexpression[i+1].isdigit():                                
-                                seconddigitstr = ""
-                                #check for TIMESHIFT 0-9 (one digit). Example: "Y1[-2]" 
-                                if i+5 < len(mathexpression) and mathexpression[i+2] == "[":
-                                    nint = int(mathexpression[i+1])              #Ynumber int
-                                    Yshiftval = int(mathexpression[i+4])
-                                    sign = mathexpression[i+3]
-
-                                    #timeshift with two digits
-                                    if mathexpression[i+5].isdigit():
-                                        seconddigit = int(mathexpression[i+5])
-                                        seconddigitstr = mathexpression[i+5]
-                                        mathexpression = mathexpression[:i+5]+mathexpression[i+6:]
-                                        Yshiftval = 10*Yshiftval + seconddigit
-                                            
-                                    #ET,BT, and Extras                  
-                                    if sign == "-": #  ie. original [1,2,3,4,5,6]; shift right 2 = [1,1,1,2,3,4]
-                                        evalsign = "0"      # "-" becomes digit "0" for python eval compatibility
-                                        shiftedindex = index - Yshiftval   
-                                        if shiftedindex < 0:
-                                            shiftedindex = 0                                                   
-                                    elif sign == "+": #"+" original [1,2,3,4,5,6]; shift left 2  = [3,4,5,6,6,6]
-                                        evalsign = "1"      #digit 1 = "+"
-                                        shiftedindex = index + Yshiftval
-                                        if shiftedindex >= len(self.timex):
-                                            shiftedindex = len(self.timex)- 1
-                                    if nint == 1: #ET
-                                        val = self.temp1[shiftedindex]
-                                    elif nint == 2: #BT
-                                        val = self.temp2[shiftedindex]
-                                    elif nint > 2: 
-                                        #map the extra device
-                                        b = [0,0,1,1,2,2,3]
-                                        edindex = b[nint-3]
-                                        if nint%2:
-                                            val = self.extratemp1[edindex][shiftedindex]
-                                        else:
-                                            val = self.extratemp2[edindex][shiftedindex]
- 
-                                    #add expression and values found
-                                    evaltimeexpression = "Y" + mathexpression[i+1] + evalsign*2 + mathexpression[i+4] + seconddigitstr + evalsign
-                                    timeshiftexpressions.append(evaltimeexpression)
-                                    timeshiftexpressionsvalues.append(val)
-                                    #convert "Y2[+9]" to Ynumber compatible for python eval() to add to dictionary
-                                    #METHOD USED: replace all non digits chars with sign value.
-                                    #Example1 "Y2[-7]" = "Y20070"   Example2 "Y2[+9]" = "Y21191"
-                                    mathexpression = evaltimeexpression.join((mathexpression[:i],mathexpression[i+6:]))
-                                    
-                                # Y + TWO digits. Y10-Y99 . 4+ extra devices. No timeshift
-                                elif i+2 < mlen and mathexpression[i+2].isdigit():
-                                    Yval.append(mathexpression[i+1]+mathexpression[i+2])
-                                # No timeshift Y1,Y2,Y3,etc.
+                #if sampling 
+                if RTsname:
+                    if len(self.timex):
+                        index = len(self.timex)-1
+                    else:
+                        index = 0
+                else:#get index from the time. 
+                    if len(self.timex):            
+                        index = self.time2index(t)  # If using the plotter with loaded profile. Background index done bellow at "B"
+                    else:
+                        index = 0      #if plotting but nothing loaded.
+                bindex = None
+                mathdictionary = {}
+                for (name,kind,n,shift) in compiled.symbols:
+                    if shift is not None:
+                        # timeshifted symbols
+                        if not (len(self.timex) or len(self.timeB)):
+                            continue
+                        if kind == "B":
+                            if not len(self.timeB):
+                                # no background, set to 0
+                                val = 0
+                            else:
+                                if bindex is None and self.background:
+                                    bindex = self.backgroundtime2index(t)
+                                val = self.math_expression_background_value(n,shift_index(bindex,shift,len(self.timeB)))
+                        else:
+                            shiftedindex = shift_index(index,shift,len(self.timex))
+                            if kind == "Y":
+                                if n == 1: #ET
+                                    val = self.temp1[shiftedindex]
+                                elif n == 2: #BT
+                                    val = self.temp2[shiftedindex]
+                                elif n > 2: 
+                                    #map the extra device
+                                    edindex = [0,0,1,1,2,2,3][n-3]
+                                    if n%2:
+                                        val = self.extratemp1[edindex][shiftedindex]
+                                    else:
+                                        val = self.extratemp2[edindex][shiftedindex]
                                 else:
-                                    Yval.append(mathexpression[i+1])
-                                    
-
-                    #the actual value
-                    elif mathexpression[i] == "x":
-                        if "x" not in mathdictionary:
-                            if RTsval is not None:                       # zero could be a valid value
-                                mathdictionary['x'] = RTsval         # add x to the math dictionary
+                                    raise ValueError(name)
+                            elif kind == "t":
+                                val = self.timex[shiftedindex] - t_offset
+                            else: # "P"
+                                val = self.plotterequationresults[n-1][shiftedindex]
+                        mathdictionary[name] = val
+                    elif kind == "Y":
+                        if RTsname and n == 1:
+                            #load real time buffers acquired at sample() to the dictionary
+                            mathdictionary[name] = self.RTtemp1
+                        elif RTsname and n == 2:
+                            mathdictionary[name] = self.RTtemp2
+                        elif RTsname and n > 2 and (n-3)//2 < len(self.RTextratemp1):
+                            if n%2:
+                                mathdictionary[name] = self.RTextratemp1[(n-3)//2]
                             else:
-                                mathdictionary['x'] = -1
-                                
+                                mathdictionary[name] = self.RTextratemp2[(n-3)//2]
+                        elif RTsname and name == str(RTsname):
+                            mathdictionary[name] = float(RTsval)
+                        elif len(self.timex) > 0:
+                            # in realtime mode we take the last value
+                            mathdictionary[name] = self.math_expression_Y_value(n,(-1 if RTsname else index))
+                    #the actual value
+                    elif kind == "x":
+                        if RTsval is not None:                       # zero could be a valid value
+                            mathdictionary['x'] = RTsval         # add x to the math dictionary
+                        else:
+                            mathdictionary['x'] = -1
                     #the factor to plot C/min delta_ax values on the standard temperature axis
-                    elif mathexpression[i] == "k":
-                        if "k" not in mathdictionary:
-                            try:
-                                mathdictionary['k'] = (aw.qmc.ylimit - aw.qmc.ylimit_min) / float(aw.qmc.zlimit - aw.qmc.zlimit_min)
-                            except Exception:
-                                mathdictionary['k'] = 1
-                                
+                    elif kind == "k":
+                        try:
+                            mathdictionary['k'] = (aw.qmc.ylimit - aw.qmc.ylimit_min) / float(aw.qmc.zlimit - aw.qmc.zlimit_min)
+                        except Exception:
+                            mathdictionary['k'] = 1
                     #the offset to plot C/min delta_ax values on the standard temperature axis 
-                    elif mathexpression[i] == "o":
-                        if "o" not in mathdictionary:
-                            try:
-                                mathdictionary['o'] = aw.qmc.ylimit_min - (aw.qmc.zlimit_min * (aw.qmc.ylimit - aw.qmc.ylimit_min) / float(aw.qmc.zlimit - aw.qmc.zlimit_min))
-                            except Exception:
-                                mathdictionary['o'] = 0
-
-                    #Add to dict Event1-4 external value
-                    elif mathexpression[i] == "E":
-                        if i+1 < mlen:                          #check for out of range
-                            if mathexpression[i+1].isdigit():
-                                nint = int(mathexpression[i+1])-1              #Enumber int                                
-                                #find right most occurrence before index of given event type
-                                if nint in self.specialeventstype and nint < 4: 
-                                    spevtylen = len(self.specialeventstype)-1
-                                    for eee in range(spevtylen):
-                                        iii = spevtylen - eee
-                                        if self.specialeventstype[iii] == nint and index >= self.specialevents[iii]:
-                                            break  #index found
-                                    val = self.eventsInternal2ExternalValue(self.specialeventsvalue[iii])  
-                                else:
-                                    val = 0                                      
-                                if "E" + mathexpression[i+1] not in mathdictionary:    
-                                    mathdictionary["E"+mathexpression[i+1]] = val
-                                    
-                    # time timeshift of absolute time (not relative to CHARGE)                                        
-                    elif mathexpression[i] == "t":
-                        seconddigitstr = ""
-                        if i+4 < len(mathexpression) and mathexpression[i+1] == "[":
-                            Yshiftval = int(mathexpression[i+3])
-                            sign = mathexpression[i+2]
-
-                            if mathexpression[i+4].isdigit():
-                                seconddigit = int(mathexpression[i+4])
-                                seconddigitstr = mathexpression[i+4]
-                                mathexpression = mathexpression[:i+4]+mathexpression[i+5:]
-                                Yshiftval = 10*Yshiftval + seconddigit
-                            
-                            if sign == "-": #  ie. original [1,2,3,4,5,6]; shift right 2 = [1,1,1,2,3,4]
-                                evalsign = "0"      # digit "0" = "-"
-                                shiftedindex = index - Yshiftval   
-                                if shiftedindex < 0:
-                                    shiftedindex = 0
-                                val = self.timex[shiftedindex]
-                            elif sign == "+": #"+" original [1,2,3,4,5,6]; shift left 2  = [3,4,5,6,6,6]
-                                evalsign = "1"      #digit 1 = "+"
-                                shiftedindex = index + Yshiftval
-                                if shiftedindex >= len(self.timex):
-                                    shiftedindex = len(self.timex)- 1
-                                val = self.timex[shiftedindex]
-                            val = val - t_offset
-                            evaltimeexpression = mathexpression[i] + evalsign*2 + mathexpression[i+3] + seconddigitstr + evalsign
-                            timeshiftexpressions.append(evaltimeexpression)
-                            timeshiftexpressionsvalues.append(val)
-                            mathexpression = evaltimeexpression.join((mathexpression[:i],mathexpression[i+5:]))
-                        #no timeshift
+                    elif kind == "o":
+                        try:
+                            mathdictionary['o'] = aw.qmc.ylimit_min - (aw.qmc.zlimit_min * (aw.qmc.ylimit - aw.qmc.ylimit_min) / float(aw.qmc.zlimit - aw.qmc.zlimit_min))
+                        except Exception:
+                            mathdictionary['o'] = 0
+                    #Event1-4 external value
+                    elif kind == "E":
+                        nint = n-1              #Enumber int                                
+                        #find right most occurrence before index of given event type
+                        if nint in self.specialeventstype and nint < 4: 
+                            spevtylen = len(self.specialeventstype)-1
+                            for eee in range(spevtylen):
+                                iii = spevtylen - eee
+                                if self.specialeventstype[iii] == nint and index >= self.specialevents[iii]:
+                                    break  #index found
+                            mathdictionary[name] = self.eventsInternal2ExternalValue(self.specialeventsvalue[iii])  
                         else:
-                            if "t" not in mathdictionary:
-                                mathdictionary['t'] = t - t_offset         #add t to the math dictionary
-                                    
-                    #Add to dict plotter Previous results (cascading) from plotter field windows (1-9)
-                    elif mathexpression[i] == "P":
-                        if i+1 < mlen:                          #check for out of range
-                            if mathexpression[i+1].isdigit():
-                                nint = int(mathexpression[i+1])              #Ynumber int
-                                #check for TIMESHIFT 0-9 (one digit). Example: "Y1[-2]" 
-                                if i+5 < len(mathexpression) and mathexpression[i+2] == "[" and mathexpression[i+5] == "]":
-                                    Yshiftval = int(mathexpression[i+4])
-                                    sign = mathexpression[i+3]
-                                    #ET,BT, and Extrasy
-                                    if sign == "-": #  ie. original [1,2,3,4,5,6]; shift right 2 = [1,1,1,2,3,4]
-                                        evalsign = "0"      # "-" becomes digit "0" for python eval compatibility
-                                        shiftedindex = index - Yshiftval   
-                                        if shiftedindex < 0:
-                                            shiftedindex = 0                                                   
-                                    elif sign == "+": #"+" original [1,2,3,4,5,6]; shift left 2  = [3,4,5,6,6,6]
-                                        evalsign = "1"      #digit 1 = "+"
-                                        shiftedindex = index + Yshiftval
-                                        if shiftedindex >= len(self.timex):
-                                            shiftedindex = len(self.timex)- 1
-                                    val = self.plotterequationresults[nint-1][shiftedindex]
-                                    evaltimeexpression = "P" + mathexpression[i+1] + evalsign*2 + mathexpression[i+4] + evalsign
-                                    timeshiftexpressions.append(evaltimeexpression)
-                                    timeshiftexpressionsvalues.append(val)
-                                    mathexpression = evaltimeexpression.join((mathexpression[:i],mathexpression[i+6:]))
-                                #no shift
-                                else:
-                                    if index < len(self.plotterequationresults[nint-1]):
-                                        val = self.plotterequationresults[nint-1][index]
-                                    else:
-                                        val = -1000                                        
-                                    if "P" + mathexpression[i+1] not in mathdictionary:    
-                                        mathdictionary["P"+mathexpression[i+1]] = val                                
-
+                            mathdictionary[name] = 0                                      
+                    elif kind == "t":
+                        mathdictionary['t'] = t - t_offset
+                    #plotter Previous results (cascading) from plotter field windows (1-9)
+                    elif kind == "P":
+                        if index < len(self.plotterequationresults[n-1]):
+                            mathdictionary[name] = self.plotterequationresults[n-1][index]
+                        else:
+                            mathdictionary[name] = -1000                                        
                     #Background B1 = ETbackground; B2 = BTbackground
-                    elif mathexpression[i] == "B":
-                        if i+1 < mlen:
-                            seconddigitstr = ""
-                            if mathexpression[i+1].isdigit():
-                                nint = int(mathexpression[i+1])              #Bnumber int
-                                #check for TIMESHIFT 0-9 (one digit). Example: "B1[-2]" 
-                                if i+5 < len(mathexpression) and mathexpression[i+2] == "[":
-                                    Yshiftval = int(mathexpression[i+4])
-                                    sign = mathexpression[i+3]
-
-                                    # TWO digits shifting
-                                    if mathexpression[i+5].isdigit():
-                                        seconddigit = int(mathexpression[i+5])
-                                        seconddigitstr = mathexpression[i+5]
-                                        mathexpression = mathexpression[:i+5]+mathexpression[i+6:]
-                                        Yshiftval = 10*Yshiftval + seconddigit
-                                                      
-                                    if sign == "-": #  ie. original [1,2,3,4,5,6]; shift right 2 = [1,1,1,2,3,4]
-                                        evalsign = "0"      # "-" becomes digit "0" for python eval compatibility
-                                        shiftedindex = bindex - Yshiftval   
-                                        if shiftedindex < 0:
-                                            shiftedindex = 0                                                   
-                                    elif sign == "+": #"+" original [1,2,3,4,5,6]; shift left 2  = [3,4,5,6,6,6]
-                                        evalsign = "1"      #digit 1 = "+"
-                                        shiftedindex = bindex + Yshiftval
-                                        if shiftedindex >= len(self.timeB):
-                                            shiftedindex = len(self.timeB)- 1
-                                    if not len(self.timeB):
-                                        # no background, set to 0
-                                        val = 0
-                                    else:
-                                        if nint == 1: #ETbackground
-                                            val = self.temp1B[shiftedindex]
-                                        elif nint == 2: #BTbackground
-                                            val = self.temp2B[shiftedindex]
-                                        #B3, B4, B5, ...
-                                        elif nint > 2:
-                                            idx3 = aw.qmc.xtcurveidx - 1
-                                            n3 = idx3//2
-                                            if aw.qmc.xtcurveidx%2:
-                                                val = self.temp1BX[n3][shiftedindex]
-                                            else:
-                                                val = self.temp2BX[n3][shiftedindex]
-                                            
-                                    evaltimeexpression = "B" + mathexpression[i+1] + evalsign*2 + mathexpression[i+4] + seconddigitstr+ evalsign
-                                    timeshiftexpressions.append(evaltimeexpression)
-                                    timeshiftexpressionsvalues.append(val)
-                                    mathexpression = evaltimeexpression.join((mathexpression[:i],mathexpression[i+6:]))
-                                #no shift
-                                else:
-                                    if not len(self.timeB):
-                                        # no background, set to 0
-                                        mathdictionary["B"+mathexpression[i+1]] = 0
-                                    else:
-                                        if nint == 1:
-                                            val = self.temp1B[bindex]
-                                        elif nint == 2:
-                                            val = self.temp2B[bindex]
-                                        else:
-                                            idx3 = aw.qmc.xtcurveidx - 1
-                                            n3 = idx3//2
-                                            if aw.qmc.xtcurveidx%2:
-                                                val = self.temp1BX[n3][bindex]
-                                            else:
-                                                val = self.temp2BX[n3][bindex]                                      
-                                           
-                                        mathdictionary["B"+mathexpression[i+1]] = val
-
+                    elif kind == "B":
+                        if not len(self.timeB):
+                            # no background, set to 0
+                            mathdictionary[name] = 0
+                        else:
+                            if bindex is None and self.background:
+                                bindex = self.backgroundtime2index(t)
+                            mathdictionary[name] = self.math_expression_background_value(n,bindex)
                     # Feedback from previous result. Stack = [10,9,8,7,6,5,4,3,2,1]
                     # holds the ten previous formula results (same window) in order.
                     # F1 is the last result. F5 is the past 5th result 
-                    elif mathexpression[i] == "F":
-                        if i+1 < mlen:
-                            if mathexpression[i+1].isdigit():
-                                nint = int(mathexpression[i+1])
-                                val = self.plotterstack[-1*nint]
-                                if "F"+mathexpression[i+1] not in mathdictionary:
-                                    mathdictionary["F"+mathexpression[i+1]] = val
-
-                    #############   end of mathexpression loop ##########################
-                    
-                #created Ys values 
-                try:
-                    if len(self.timex)>0:
-                        if RTsname:
-                            Y = [self.temp1[-1], self.temp2[-1]] # in realtime mode we take the last value
-                        else:
-                            Y = [self.temp1[index], self.temp2[index]]
-                        if len(self.extratimex):
-                            if len(self.extratimex[0]):
-                                for i in range(len(self.extradevices)):
-                                    if RTsname:
-                                        Y.append(self.extratemp1[i][-1])
-                                        Y.append(self.extratemp2[i][-1])
-                                    else:
-                                        Y.append(self.extratemp1[i][index])  
-                                        Y.append(self.extratemp2[i][index])
-                                    
-                        #add Ys and their value to math dictionary
-                        for i in range(len(Yval)):
-                            if "Y"+ Yval[i] not in mathdictionary:
-                                mathdictionary["Y"+ Yval[i]] = Y[int(Yval[i])-1]
-                                
-                        #add other timeshifted expressions to the math dictionary: shifted P
-                        for i in range(len(timeshiftexpressions)):
-                            if timeshiftexpressions[i] not in mathdictionary:
-                                mathdictionary[timeshiftexpressions[i]] = timeshiftexpressionsvalues[i]
-                except:
-                    pass
-                       
-
-                #background symbols just in case there was no profile loaded but a background loaded.
-                if len(self.timeB) > 0:
-                    for i in range(len(timeshiftexpressions)):
-                        if timeshiftexpressions[i] not in mathdictionary:   
-                            mathdictionary[timeshiftexpressions[i]] = timeshiftexpressionsvalues[i]                    
+                    elif kind == "F":
+                        mathdictionary[name] = self.plotterstack[-1*n]
                                     
                 try:                            
-                    res = eval(mathexpression,{"__builtins__":None},mathdictionary)
+                    res = eval(compiled.code,math_functions,mathdictionary)
                 except ValueError as e:
                     res = -1
                 except ZeroDivisionError as e:
@@ -3400,6 +3289,36 @@ class tgraphcanvas(FigureCanvas):
 
         return -1
 
+    # returns the value of Y<n> (Y1: ET, Y2: BT, Y3,..: extra device channels) at index
+    def math_expression_Y_value(self,n,index):
+        if n == 1:
+            return self.temp1[index]
+        elif n == 2:
+            return self.temp2[index]
+        elif n > 2 and len(self.extratimex) and len(self.extratimex[0]) and (n-3)//2 < len(self.extradevices):
+            if n%2:
+                return self.extratemp1[(n-3)//2][index]
+            else:
+                return self.extratemp2[(n-3)//2][index]
+        else:
+            raise IndexError("Y{0}".format(n))
+
+    # returns the value of B<n> (B1: ETbackground, B2: BTbackground, B3,..: the selected background extra curve) at bindex
+    def math_expression_background_value(self,n,bindex):
+        if n == 1:
+            return self.temp1B[bindex]
+        elif n == 2:
+            return self.temp2B[bindex]
+        elif n > 2:
+            idx3 = aw.qmc.xtcurveidx - 1
+            n3 = idx3//2
+            if aw.qmc.xtcurveidx%2:
+                return self.temp1BX[n3][bindex]
+            else:
+                return self.temp2BX[n3][bindex]
+        else:
+            raise IndexError("B{0}".format(n))
+
 
     #format X axis labels
     def xaxistosm(self,redraw=True):
@@ -3558,14 +3477,16 @@ class tgraphcanvas(FigureCanvas):
             self.safesaveflag = False  #now flag is cleared (OFF)
             self.rateofchange1 = 0.0
             self.rateofchange2 = 0.0
-            self.temp1, self.temp2, self.delta1, self.delta2, self.timex, self.stemp1, self.stemp2, self.ctimex1, self.ctimex2, self.ctemp1, self.ctemp2 = [],[],[],[],[],[],[],[],[],[],[]
+            self.temp1, self.temp2, self.delta1, self.delta2, self.timex = ProfileColumn(),ProfileColumn(),ProfileColumn(),ProfileColumn(),ProfileColumn()
+            self.stemp1, self.stemp2 = [],[]
+            self.ctimex1, self.ctimex2, self.ctemp1, self.ctemp2 = ProfileColumn(),ProfileColumn(),ProfileColumn(),ProfileColumn()
             self.tstemp1,self.tstemp2 = [],[]
             self.unfiltereddelta1,self.unfiltereddelta2 = [],[]
             self.timeindex = [-1,0,0,0,0,0,0,0]
             #extra devices
             for i in range(min(len(self.extradevices),len(self.extratimex),len(self.extratemp1),len(self.extratemp2),len(self.extrastemp1),len(self.extrastemp2))):
                 self.extratimex[i],self.extratemp1[i],self.extratemp2[i],self.extrastemp1[i],self.extrastemp2[i] = [],[],[],[],[]            #reset all variables that need to be reset (but for the actually measurements that will be treated separately at the end of this function)
-                self.extractimex1[i],self.extractimex2[i],self.extractemp1[i],self.extractemp2[i] = [],[],[],[]
+                self.extractimex1[i],self.extractimex2[i],self.extractemp1[i],self.extractemp2[i] = ProfileColumn(),ProfileColumn(),ProfileColumn(),ProfileColumn()
                 
             self.replayedBackgroundEvents=[]
             self.specialevents=[]
@@ -3687,6 +3608,7 @@ class tgraphcanvas(FigureCanvas):
                 # reset running AUC values
                 self.AUCvalue = 0
                 self.AUCsinceFCs = 0
+                self.AUCaccumulator.reset()
                 self.AUCguideTime = 0
 
                 self.roastdate = QDateTime.currentDateTime()
@@ -3911,7 +3833,7 @@ class tgraphcanvas(FigureCanvas):
         # filter spikes
         if aw.qmc.filterDropOuts and len(a) == len(b) and len(a) > 1:
             try:
-                b = self.medfilt(numpy.array(b),7).tolist()  # k=3 seems not to catch all spikes in all cases
+                b = self.medfilt(numpy.asarray(b),7).tolist()  # k=3 seems not to catch all spikes in all cases
             except:
                 pass
         if win_len != 1: # at the lowest level we turn smoothing completely off
@@ -3919,11 +3841,11 @@ class tgraphcanvas(FigureCanvas):
                 if toIndex==0: # no limit
                     toIndex=len(a)
                 return numpy.concatenate(([None]*(fromIndex),
-                        self.smooth(numpy.array(a)[fromIndex:toIndex],numpy.array(b)[fromIndex:toIndex],window_len,window).tolist(),
+                        self.smooth(numpy.asarray(a)[fromIndex:toIndex],numpy.asarray(b)[fromIndex:toIndex],window_len,window).tolist(),
                         [None]*(len(a)-toIndex)
                          )).tolist()
             else:
-                return self.smooth(numpy.array(a),numpy.array(b),win_len,window).tolist()
+                return self.smooth(numpy.asarray(a),numpy.asarray(b),win_len,window).tolist()
         else:
             return b
                 
@@ -4161,7 +4083,7 @@ class tgraphcanvas(FigureCanvas):
     # if t1 or t2 is not given (None), its RoR signal is not computed and None is returned instead
     def recomputeDeltas(self,timex,CHARGEidx,DROPidx,t1,t2,optimalSmoothing=True):
         try:
-            tx = numpy.array(timex)
+            tx = numpy.asarray(timex)
             if CHARGEidx > -1:
                 roast_start_idx = CHARGEidx
             else:
@@ -4170,7 +4092,7 @@ class tgraphcanvas(FigureCanvas):
                 roast_end_idx = DROPidx
             else:
                 roast_end_idx = len(tx)
-            tx_roast = numpy.array(timex[roast_start_idx:roast_end_idx]) # just the part from CHARGE TO DROP
+            tx_roast = tx[roast_start_idx:roast_end_idx] # just the part from CHARGE TO DROP
             lt = len(tx_roast)
             if t1 is not None:
                 with numpy.errstate(divide='ignore'):
@@ -4319,6 +4241,42 @@ class tgraphcanvas(FigureCanvas):
         poly = Polygon(verts, facecolor=self.palette["aucarea"], edgecolor='0.5', alpha=0.3)
         self.ax.add_patch(poly)
 
+    # the rcParams taken by the axes, their spines and ticks on creation; the axes are rebuilt if any of those change
+    axes_style_rcParams = [
+        "path.sketch","axes.linewidth","xtick.major.size","xtick.major.width","xtick.minor.width",
+        "ytick.major.size","ytick.major.width","ytick.minor.width","xtick.color","ytick.color","font.size","font.family"]
+
+    # the attributes the artists of the background layer are built from
+    background_layer_signature = [
+        "timeB","temp1B","temp2B","stemp1B","stemp2B","extratimexB","stemp1BX","stemp2BX","delta1B","delta2B",
+        "timeindexB","timeindex","backmoveflag","alignEvent","TP_time_B","TP_time_B_loaded",
+        "backgroundEvents","backgroundEtypes","backgroundEvalues","backgroundEStrings","Betypes",
+        "xtcurveidx","backgroundETcurve","backgroundBTcurve","DeltaETBflag","DeltaBTBflag",
+        "ETbackmarkersize","ETbackmarker","ETbacklinewidth","ETbacklinestyle","ETbackdrawstyle",
+        "BTbackmarkersize","BTbackmarker","BTbacklinewidth","BTbacklinestyle","BTbackdrawstyle",
+        "XTbackmarkersize","XTbackmarker","XTbacklinewidth","XTbacklinestyle","XTbackdrawstyle",
+        "ETBdeltamarkersize","ETBdeltamarker","ETBdeltalinewidth","ETBdeltalinestyle","ETBdeltadrawstyle",
+        "BTBdeltamarkersize","BTBdeltamarker","BTBdeltalinewidth","BTBdeltalinestyle","BTBdeltadrawstyle",
+        "backgroundmetcolor","backgroundbtcolor","backgroundxtcolor","backgrounddeltaetcolor","backgrounddeltabtcolor","backgroundalpha",
+        "backgroundeventsflag","backgroundDetails","eventsGraphflag","eventpositionbars","showeventsonbt","showEtypes","extendevents",
+        "EvalueColor","EvalueMarker","EvalueMarkerSize","Evaluelinethickness","markTPflag","watermarksflag",
+        "curvefilter","optimalSmoothing","deltafilter","deltasamples","altsmoothing","filterDropOuts",
+        "RoRlimitFlag","RoRlimit","RoRlimitm","maxRoRlimit","mode","ylimit","ylimit_min","palette","graphstyle","graphfont"]
+    
+    # the attributes set on drawing the background, restored on reusing the background layer
+    background_layer_state = [
+        "l_back1","l_back2","l_back3","l_delta1B","l_delta2B","delta1B","delta2B","l_background_annotations","l_annotations",
+        "E1backgroundtimex","E2backgroundtimex","E3backgroundtimex","E4backgroundtimex",
+        "E1backgroundvalues","E2backgroundvalues","E3backgroundvalues","E4backgroundvalues",
+        "l_backgroundeventtype1dots","l_backgroundeventtype2dots","l_backgroundeventtype3dots","l_backgroundeventtype4dots"]
+    
+    # returns the signature of the state the background layer is built from
+    def backgroundSignature(self,sampling):
+        return tuple(snapshot(getattr(self,a,None)) for a in self.background_layer_signature) + (
+            id(self.ax),id(self.delta_ax),sampling or self.flagon,
+            tuple(self.timex[i] for i in self.timeindex if -1 < i < len(self.timex)),
+            snapshot(aw.mpl_fontproperties.get_family()))
+
     #Redraws data
     # if recomputeAllDeltas, the delta arrays; if smooth the smoothed line arrays are recomputed
     def redraw(self, recomputeAllDeltas=True, smooth=True,sampling=False):
@@ -4347,10 +4305,25 @@ class tgraphcanvas(FigureCanvas):
                 rcParams['ytick.minor.width'] = 1
                 rcParams['xtick.color'] = self.palette["xlabel"]
                 rcParams['ytick.color'] = self.palette["ylabel"]
+                axes_style = tuple(snapshot(rcParams[k]) for k in self.axes_style_rcParams)
     
-                self.fig.clf()   #wipe out figure. keep_observers=False
-    
-                self.ax = self.fig.add_subplot(111,facecolor=self.palette["background"])
+                if self.ax is not None and self.ax in self.fig.axes and axes_style == self.axes_style:
+                    # we keep the axes and the retained background artists, but remove all other artists
+                    clearAxes(self.ax,self.background_layer.artists)
+                    if self.delta_ax is not None and self.delta_ax in self.fig.axes:
+                        clearAxes(self.delta_ax)
+                    self.ax.set_facecolor(self.palette["background"])
+                    self.fig.suptitle("")
+                else:
+                    self.background_layer.remove()
+                    self.fig.clf()   #wipe out figure. keep_observers=False
+                    self.lod.clear()
+                    self.ax = self.fig.add_subplot(111,facecolor=self.palette["background"])
+                    self.connectLOD(self.ax)
+                    self.delta_ax = None
+                    self.axes_style = axes_style
+                # the per-sample artists are recreated below and are not animated until the next updateBackground()
+                self.blit_animated = False
 
                 self.ax.set_ylim(self.ylimit_min, self.ylimit)
                 self.ax.set_autoscale_on(False)
@@ -4469,8 +4442,10 @@ class tgraphcanvas(FigureCanvas):
                 self.ax.fmt_xdata = self.fmt_timedata
     
                 if two_ax_mode:
-                    #create a second set of axes in the same position as self.ax
-                    self.delta_ax = self.ax.twinx()
+                    #create a second set of axes in the same position as self.ax if not kept from the previous redraw
+                    if self.delta_ax is None or self.delta_ax not in self.fig.axes:
+                        self.delta_ax = self.ax.twinx()
+                        self.connectLOD(self.delta_ax)
                     self.delta_ax.tick_params(\
                         axis='y',           # changes apply to the x-axis
                         which='both',       # both major and minor ticks are affected
@@ -4504,6 +4479,8 @@ class tgraphcanvas(FigureCanvas):
                     self.delta_ax.fmt_xdata = self.fmt_timedata
                 #put a right tick on the graph
                 else:
+                    if self.delta_ax is not None and self.delta_ax in self.fig.axes:
+                        self.fig.delaxes(self.delta_ax)
                     self.delta_ax = None
     #                if aw.qmc.graphstyle:
     #                    self.ax.spines['right'].set_color('none')
@@ -4617,7 +4594,13 @@ class tgraphcanvas(FigureCanvas):
                 rcParams['path.sketch'] = (scale, length, randomness)
                 
                 #check BACKGROUND flag
-                if self.background: 
+                if not self.background:
+                    self.background_layer.remove()
+                elif self.background_layer.valid(self.ax,self.backgroundSignature(sampling)):
+                    # the background and its presentation did not change since the last redraw, we keep its artists
+                    self.background_layer.restore(self)
+                else:
+                    self.background_layer.begin(self.ax)
                     self.l_background_annotations = []
                     #check to see if there is both a profile loaded and a background loaded
                     if self.backmoveflag:
@@ -4636,6 +4619,7 @@ class tgraphcanvas(FigureCanvas):
                                                         sketch_params=None,path_effects=[],
                                                         linewidth=self.XTbacklinewidth,linestyle=self.XTbacklinestyle,drawstyle=self.XTbackdrawstyle,color=self.backgroundxtcolor,
                                                         alpha=self.backgroundalpha,label=aw.arabicReshape(QApplication.translate("Label", "BackgroundXT", None)))                                    
+                            self.lod.register(self.l_back3,self.extratimexB[n3],stemp3B)
     
                     #draw background
                     if aw.qmc.backgroundETcurve:
@@ -4646,6 +4630,7 @@ class tgraphcanvas(FigureCanvas):
                                                 sketch_params=None,path_effects=[],
                                                 linewidth=self.ETbacklinewidth,linestyle=self.ETbacklinestyle,drawstyle=self.ETbackdrawstyle,color=self.backgroundmetcolor,
                                                 alpha=self.backgroundalpha,label=aw.arabicReshape(QApplication.translate("Label", "BackgroundET", None)))                        
+                    self.lod.register(self.l_back1,self.timeB,temp_etb)
                     if aw.qmc.backgroundBTcurve:
                         temp_btb = self.stemp2B
                     else:
@@ -4654,6 +4639,7 @@ class tgraphcanvas(FigureCanvas):
                                                 linewidth=self.BTbacklinewidth,linestyle=self.BTbacklinestyle,drawstyle=self.BTbackdrawstyle,color=self.backgroundbtcolor,
                                                 sketch_params=None,path_effects=[],
                                                 alpha=self.backgroundalpha,label=aw.arabicReshape(QApplication.translate("Label", "BackgroundBT", None)))
+                    self.lod.register(self.l_back2,self.timeB,temp_btb)
     
                     #populate background delta ET (self.delta1B) and delta BT (self.delta2B)                    
                     if self.DeltaETBflag or self.DeltaBTBflag:
@@ -4676,10 +4662,12 @@ class tgraphcanvas(FigureCanvas):
                                 self.l_delta1B, = self.ax.plot(self.timeB, self.delta1B,transform=trans,markersize=self.ETBdeltamarkersize,
                                 sketch_params=None,path_effects=[],
                                 marker=self.ETBdeltamarker,linewidth=self.ETBdeltalinewidth,linestyle=self.ETBdeltalinestyle,drawstyle=self.ETBdeltadrawstyle,color=self.backgrounddeltaetcolor,alpha=self.backgroundalpha,label=aw.arabicReshape(QApplication.translate("Label", "BackgroundDeltaET", None)))
+                                self.lod.register(self.l_delta1B,self.timeB,self.delta1B)
                             if self.DeltaBTBflag and len(self.timeB) == len(self.delta2B):
                                 self.l_delta2B, = self.ax.plot(self.timeB, self.delta2B,transform=trans,markersize=self.BTBdeltamarkersize,
                                 sketch_params=None,path_effects=[],
                                 marker=self.BTBdeltamarker,linewidth=self.BTBdeltalinewidth,linestyle=self.BTBdeltalinestyle,drawstyle=self.BTBdeltadrawstyle,color=self.backgrounddeltabtcolor,alpha=self.backgroundalpha,label=aw.arabicReshape(QApplication.translate("Label", "BackgroundDeltaBT", None)))
+                                self.lod.register(self.l_delta2B,self.timeB,self.delta2B)
     
                     #check backgroundevents flag
                     if self.backgroundeventsflag:
@@ -4788,6 +4776,8 @@ class tgraphcanvas(FigureCanvas):
 #                            traceback.print_exc(file=sys.stdout)
                         
                     #END of Background
+                    self.background_layer.end(self.ax,self.backgroundSignature(sampling),
+                        dict((a,getattr(self,a,None)) for a in self.background_layer_state))
                     
                 if aw.qmc.patheffects:
                     rcParams['path.effects'] = [PathEffects.withStroke(linewidth=aw.qmc.patheffects, foreground=self.palette["background"])]
@@ -5115,11 +5105,11 @@ class tgraphcanvas(FigureCanvas):
                         if len(self.timex) == len(self.delta1) and len(self.timex)  == len(self.delta2):
                             trans = self.delta_ax.transData #=self.delta_ax.transScale + (self.delta_ax.transLimits + self.delta_ax.transAxes)
                             if self.DeltaETflag:
-                                self.l_delta1, = self.ax.plot(self.timex, self.delta1,transform=trans,markersize=self.ETdeltamarkersize,marker=self.ETdeltamarker,
+                                self.l_delta1, = self.ax.plot(columnView(self.timex), columnView(self.delta1),transform=trans,markersize=self.ETdeltamarkersize,marker=self.ETdeltamarker,
                                 sketch_params=None,path_effects=[PathEffects.withStroke(linewidth=self.ETdeltalinewidth+aw.qmc.patheffects,foreground=self.palette["background"])],
                                 linewidth=self.ETdeltalinewidth,linestyle=self.ETdeltalinestyle,drawstyle=self.ETdeltadrawstyle,color=self.palette["deltaet"],label=aw.arabicReshape(deltaLabelUTF8 + QApplication.translate("Label", "ET", None)))                    
                             if self.DeltaBTflag:           
-                                self.l_delta2, = self.ax.plot(self.timex, self.delta2,transform=trans,markersize=self.BTdeltamarkersize,marker=self.BTdeltamarker,
+                                self.l_delta2, = self.ax.plot(columnView(self.timex), columnView(self.delta2),transform=trans,markersize=self.BTdeltamarkersize,marker=self.BTdeltamarker,
                                 sketch_params=None,path_effects=[PathEffects.withStroke(linewidth=self.BTdeltalinewidth+aw.qmc.patheffects,foreground=self.palette["background"])],
                                 linewidth=self.BTdeltalinewidth,linestyle=self.BTdeltalinestyle,drawstyle=self.BTdeltadrawstyle,color=self.palette["deltabt"],label=aw.arabicReshape(deltaLabelUTF8 + QApplication.translate("Label", "BT", None)))    
     
@@ -5155,7 +5145,7 @@ class tgraphcanvas(FigureCanvas):
                         sketch_params=None,path_effects=[PathEffects.withStroke(linewidth=self.ETlinewidth+aw.qmc.patheffects,foreground=self.palette["background"])],
                         linewidth=self.ETlinewidth,linestyle=self.ETlinestyle,drawstyle=self.ETdrawstyle,color=self.palette["et"],label=aw.arabicReshape(QApplication.translate("Label", "ET", None)))
                     else:
-                        self.l_temp1, = self.ax.plot(self.timex,self.stemp1,markersize=self.ETmarkersize,marker=self.ETmarker,
+                        self.l_temp1, = self.ax.plot(columnView(self.timex),self.stemp1,markersize=self.ETmarkersize,marker=self.ETmarker,
                         sketch_params=None,path_effects=[PathEffects.withStroke(linewidth=self.ETlinewidth+aw.qmc.patheffects,foreground=self.palette["background"])],
                         linewidth=self.ETlinewidth,linestyle=self.ETlinestyle,drawstyle=self.ETdrawstyle,color=self.palette["et"],label=aw.arabicReshape(QApplication.translate("Label", "ET", None)))
                 if aw.qmc.BTcurve:
@@ -5164,10 +5154,30 @@ class tgraphcanvas(FigureCanvas):
                         sketch_params=None,path_effects=[PathEffects.withStroke(linewidth=self.BTlinewidth+aw.qmc.patheffects,foreground=self.palette["background"])],
                         linewidth=self.BTlinewidth,linestyle=self.BTlinestyle,drawstyle=self.BTdrawstyle,color=self.palette["bt"],label=aw.arabicReshape(QApplication.translate("Label", "BT", None)))
                     else:
-                        self.l_temp2, = self.ax.plot(self.timex,self.stemp2,markersize=self.BTmarkersize,marker=self.BTmarker,
+                        self.l_temp2, = self.ax.plot(columnView(self.timex),self.stemp2,markersize=self.BTmarkersize,marker=self.BTmarker,
                         sketch_params=None,path_effects=[PathEffects.withStroke(linewidth=self.BTlinewidth+aw.qmc.patheffects,foreground=self.palette["background"])],
                         linewidth=self.BTlinewidth,linestyle=self.BTlinestyle,drawstyle=self.BTdrawstyle,color=self.palette["bt"],label=aw.arabicReshape(QApplication.translate("Label", "BT", None)))
     
+                if not self.flagon:
+                    # the curves are updated on each sample while recording, thus we decimate only the static ones
+                    if aw.qmc.ETcurve:
+                        self.lod.register(self.l_temp1,self.timex,self.stemp1)
+                    if aw.qmc.BTcurve:
+                        self.lod.register(self.l_temp2,self.timex,self.stemp2)
+                    if self.DeltaETflag:
+                        self.lod.register(self.l_delta1,self.timex,self.delta1)
+                    if self.DeltaBTflag:
+                        self.lod.register(self.l_delta2,self.timex,self.delta2)
+                    xtra_dev_lines1 = 0
+                    xtra_dev_lines2 = 0
+                    for i in range(min(len(self.extratimex),len(self.extratemp1),len(self.extradevicecolor1),len(self.extraname1),len(self.extratemp2),len(self.extradevicecolor2),len(self.extraname2))):
+                        if aw.extraCurveVisibility1[i] and len(self.extratemp1lines) > xtra_dev_lines1:
+                            self.lod.register(self.extratemp1lines[xtra_dev_lines1],self.extratimex[i],self.extrastemp1[i])
+                            xtra_dev_lines1 = xtra_dev_lines1 + 1
+                        if aw.extraCurveVisibility2[i] and len(self.extratemp2lines) > xtra_dev_lines2:
+                            self.lod.register(self.extratemp2lines[xtra_dev_lines2],self.extratimex[i],self.extrastemp2[i])
+                            xtra_dev_lines2 = xtra_dev_lines2 + 1
+    
                 if aw.qmc.ETcurve:
                     handles.append(self.l_temp1)
                     labels.append(aw.arabicReshape(QApplication.translate("Label", "ET", None)))
@@ -5602,10 +5612,9 @@ class tgraphcanvas(FigureCanvas):
         self.zgrid = self.zgrid_F_default
         if self.mode == "C":
             #change watermarks limits. dryphase1, dryphase2, midphase, and finish phase Y limits
-            for i in range(4):
-                self.phases[i] = int(round(self.fromCtoF(self.phases[i])))
-                self.phases_espresso[i] = int(round(self.fromCtoF(self.phases_espresso[i])))
-                self.phases_filter[i] = int(round(self.fromCtoF(self.phases_filter[i])))
+            self.phases = [int(round(t)) for t in convertTemps(self.phases,"C","F")]
+            self.phases_espresso = [int(round(t)) for t in convertTemps(self.phases_espresso,"C","F")]
+            self.phases_filter = [int(round(t)) for t in convertTemps(self.phases_filter,"C","F")]
             self.ETtarget = int(round(self.fromCtoF(self.ETtarget)))
             self.ET2target = int(round(self.fromCtoF(self.ET2target)))
             self.BTtarget = int(round(self.fromCtoF(self.BTtarget)))
@@ -5640,10 +5649,9 @@ class tgraphcanvas(FigureCanvas):
         self.zgrid = self.zgrid_C_default
         if self.mode == "F":
             #change watermarks limits. dryphase1, dryphase2, midphase, and finish phase Y limits
-            for i in range(4):
-                self.phases[i] = int(round(self.fromFtoC(self.phases[i])))
-                self.phases_espresso[i] = int(round(self.fromFtoC(self.phases_espresso[i])))
-                self.phases_filter[i] = int(round(self.fromFtoC(self.phases_filter[i])))
+            self.phases = [int(round(t)) for t in convertTemps(self.phases,"F","C")]
+            self.phases_espresso = [int(round(t)) for t in convertTemps(self.phases_espresso,"F","C")]
+            self.phases_filter = [int(round(t)) for t in convertTemps(self.phases_filter,"F","C")]
             self.ETtarget = int(round(self.fromFtoC(self.ETtarget)))
             self.ET2target = int(round(self.fromFtoC(self.ET2target)))
             self.BTtarget = int(round(self.fromFtoC(self.BTtarget)))
@@ -5676,6 +5684,17 @@ class tgraphcanvas(FigureCanvas):
         self.celsiusMode()
         self.redraw()                        
 
+    # converts the background profile from the source to the target temperature unit
+    def convertBackgroundTemperatures(self,source,target):
+        self.temp1B = convertTemps(self.temp1B,source,target) #ET B
+        self.temp2B = convertTemps(self.temp2B,source,target) #BT B
+        self.stemp1B = convertTemps(self.stemp1B,source,target)
+        self.stemp2B = convertTemps(self.stemp2B,source,target)
+        self.temp1BX = convertExtraTemps(self.temp1BX,[],source,target)
+        self.temp2BX = convertExtraTemps(self.temp2BX,[],source,target)
+        self.stemp1BX = convertExtraTemps(self.stemp1BX,[],source,target)
+        self.stemp2BX = convertExtraTemps(self.stemp2BX,[],source,target)
+
     #converts a loaded profile to a different temperature scale. t input is the requested mode (F or C).
     def convertTemperature(self,t,silent=False):
         #verify there is a loaded profile
@@ -5696,24 +5715,13 @@ class tgraphcanvas(FigureCanvas):
                         aw.FahrenheitAction.setEnabled(True)
                         aw.ConvertToCelsiusAction.setDisabled(True)
                         aw.ConvertToFahrenheitAction.setEnabled(True)
-                        for i in arange(profilelength):
-                            self.temp1[i] = self.fromCtoF(self.temp1[i])    #ET
-                            self.temp2[i] = self.fromCtoF(self.temp2[i])    #BT
-                            if len(self.delta1):
-                                self.delta1[i] = self.fromCtoF(self.delta1[i])  #Delta ET
-                            if len(self.delta2):
-                                self.delta2[i] = self.fromCtoF(self.delta2[i])  #Delta BT
-                            #extra devices curves
-                            nextra = len(aw.qmc.extratemp1)   
-                            if nextra:
-                                for e in range(nextra):
-                                    try:
-                                        if not (len(aw.qmc.extraNoneTempHint1) > e and aw.qmc.extraNoneTempHint1[e]):
-                                            aw.qmc.extratemp1[e][i] = self.fromCtoF(aw.qmc.extratemp1[e][i])
-                                        if not (len(aw.qmc.extraNoneTempHint2) > e and aw.qmc.extraNoneTempHint2[e]):
-                                            aw.qmc.extratemp2[e][i] = self.fromCtoF(aw.qmc.extratemp2[e][i])
-                                    except Exception:
-                                        pass
+                        self.temp1 = convertTemps(self.temp1,"C","F")    #ET
+                        self.temp2 = convertTemps(self.temp2,"C","F")    #BT
+                        self.delta1 = convertRoRs(self.delta1,"C","F")  #Delta ET
+                        self.delta2 = convertRoRs(self.delta2,"C","F")  #Delta BT
+                        #extra devices curves
+                        self.extratemp1 = convertExtraTemps(self.extratemp1,self.extraNoneTempHint1,"C","F")
+                        self.extratemp2 = convertExtraTemps(self.extratemp2,self.extraNoneTempHint2,"C","F")
 
                         self.ambientTemp = self.fromCtoF(self.ambientTemp)  #ambient temperature
 
@@ -5721,11 +5729,7 @@ class tgraphcanvas(FigureCanvas):
                         self.safesaveflag = True
 
                         #background
-                        for i in arange(len(self.timeB)):
-                            self.temp1B[i] = self.fromCtoF(self.temp1B[i])
-                            self.temp2B[i] = self.fromCtoF(self.temp2B[i])
-                            self.stemp1B[i] = self.fromCtoF(self.stemp1B[i])
-                            self.stemp2B[i] = self.fromCtoF(self.stemp2B[i])
+                        self.convertBackgroundTemperatures("C","F")
 
                         self.fahrenheitMode()
                         if not silent:
@@ -5752,31 +5756,18 @@ class tgraphcanvas(FigureCanvas):
                         aw.ConvertToCelsiusAction.setEnabled(True) 
                         aw.FahrenheitAction.setDisabled(True)
                         aw.CelsiusAction.setEnabled(True)   
-                        for i in arange(profilelength):
-                            self.temp1[i] = self.fromFtoC(self.temp1[i])    #ET
-                            self.temp2[i] = self.fromFtoC(self.temp2[i])    #BT
-                            if self.device != 18:
-                                if len(self.delta1):
-                                    self.delta1[i] = self.fromFtoC(self.delta1[i])  #Delta ET
-                                if len(self.delta2):
-                                    self.delta2[i] = self.fromFtoC(self.delta2[i])  #Delta BT
-                            #extra devices curves
-                            nextra = len(aw.qmc.extratemp1)
-                            if nextra:
-                                for e in range(nextra):
-                                    try:
-                                        aw.qmc.extratemp1[e][i] = self.fromFtoC(aw.qmc.extratemp1[e][i])
-                                        aw.qmc.extratemp2[e][i] = self.fromFtoC(aw.qmc.extratemp2[e][i])
-                                    except Exception:
-                                        pass
+                        self.temp1 = convertTemps(self.temp1,"F","C")    #ET
+                        self.temp2 = convertTemps(self.temp2,"F","C")    #BT
+                        if self.device != 18:
+                            self.delta1 = convertRoRs(self.delta1,"F","C")  #Delta ET
+                            self.delta2 = convertRoRs(self.delta2,"F","C")  #Delta BT
+                        #extra devices curves
+                        self.extratemp1 = convertExtraTemps(self.extratemp1,self.extraNoneTempHint1,"F","C")
+                        self.extratemp2 = convertExtraTemps(self.extratemp2,self.extraNoneTempHint2,"F","C")
 
                         self.ambientTemp = self.fromFtoC(self.ambientTemp)  #ambient temperature
 
-                        for i in arange(len(self.timeB)):
-                            self.temp1B[i] = self.fromFtoC(self.temp1B[i]) #ET B
-                            self.temp2B[i] = self.fromFtoC(self.temp2B[i]) #BT B
-                            self.stemp1B[i] = self.fromFtoC(self.stemp1B[i])
-                            self.stemp2B[i] = self.fromFtoC(self.stemp2B[i])
+                        self.convertBackgroundTemperatures("F","C")
 
                     elif not silent:
                         QMessageBox.information(aw,QApplication.translate("Message", "Convert Profile Temperature",None),
@@ -6061,6 +6052,7 @@ class tgraphcanvas(FigureCanvas):
             aw.qmc.TPalarmtimeindex = None
             
             self.timeclock.start()   #set time to the current computer time
+            self.frame_budget.clear(self.delay/1000.)
             self.flagon = True
             if self.designerflag: return
             aw.sendmessage(QApplication.translate("Message","Scope monitoring...", None))
@@ -6123,6 +6115,10 @@ class tgraphcanvas(FigureCanvas):
             aw.button_7.setEnabled(True)
             aw.button_1.setStyleSheet(aw.pushbuttonstyles["OFF"])
             aw.button_1.setToolTip(QApplication.translate("Tooltip", "Start monitoring", None))
+            frame_mean, frame_max = self.frame_budget.stats()
+            if frame_mean is not None:
+                aw.sendmessage(QApplication.translate("Message","Chart updates: {0} ({1} full draws), mean {2}ms, max {3}ms, {4} exceeding the frame budget of {5}ms", None).format(
+                    self.frame_budget.frames,self.frame_budget.full,int(round(frame_mean*1000)),int(round(frame_max*1000)),self.frame_budget.over,int(round(self.frame_budget.budget*1000))))
             aw.sendmessage(QApplication.translate("Message","Scope stopped", None))
             aw.button_1.setText(QApplication.translate("Button", "ON",None)) # text means click to turn OFF (it is ON)
             # reset time LCD color to the default (might have been changed to red due to long cooling!)
@@ -7829,6 +7825,7 @@ class tgraphcanvas(FigureCanvas):
             elif direction == "left":
                 for i in range(lt):
                     self.timeB[i] -= step                    
+                self.timeBIndex.invalidate()
                 for i in range(len(self.extratimexB)):
                     for j in range(len(self.extratimexB[i])):
                         self.extratimexB[i][j] -= step
@@ -7838,6 +7835,7 @@ class tgraphcanvas(FigureCanvas):
             elif direction == "right":
                 for i in range(lt):
                     self.timeB[i] += step             
+                self.timeBIndex.invalidate()
                 for i in range(len(self.extratimexB)):
                     for j in range(len(self.extratimexB[i])):
                         self.extratimexB[i][j] += step
@@ -8199,12 +8197,20 @@ class tgraphcanvas(FigureCanvas):
     #selects closest time INDEX in self.timex from a given input float seconds
     def time2index(self,seconds):
         #find where given seconds crosses self.timex
-        return self.timearray2index(self.timex,seconds)
+        return self.timexIndex.index(self.timex,seconds)
 
     #selects closest time INDEX in self.timeB from a given input float seconds
     def backgroundtime2index(self,seconds):
         #find where given seconds crosses self.timeB
-        return self.timearray2index(self.timeB,seconds)
+        return self.timeBIndex.index(self.timeB,seconds)
+
+    #selects the closest time INDICES in self.timex for a given array of float seconds
+    def time2indices(self,seconds):
+        return self.timexIndex.indices(self.timex,seconds)
+
+    #selects the closest time INDICES in self.timeB for a given array of float seconds
+    def backgroundtime2indices(self,seconds):
+        return self.timeBIndex.indices(self.timeB,seconds)
 
     #updates list self.timeindex when found an _OLD_ profile without self.timeindex (new version)
     def timeindexupdate(self,times):
@@ -8414,14 +8420,16 @@ class tgraphcanvas(FigureCanvas):
             
             #draw background
             if self.background: 
-                self.ax.plot(self.timeB, self.stemp1B,markersize=self.ETbackmarkersize,marker=self.ETbackmarker,
+                l_back1, = self.ax.plot(self.timeB, self.stemp1B,markersize=self.ETbackmarkersize,marker=self.ETbackmarker,
                                                 sketch_params=None,path_effects=[],
                                                 linewidth=self.ETbacklinewidth,linestyle=self.ETbacklinestyle,drawstyle=self.ETbackdrawstyle,color=self.backgroundmetcolor,
                                                 alpha=self.backgroundalpha,label=aw.arabicReshape(QApplication.translate("Label", "BackgroundET", None)))
-                self.ax.plot(self.timeB, self.stemp2B,markersize=self.BTbackmarkersize,marker=self.BTbackmarker, 
+                l_back2, = self.ax.plot(self.timeB, self.stemp2B,markersize=self.BTbackmarkersize,marker=self.BTbackmarker, 
                                                 linewidth=self.BTbacklinewidth,linestyle=self.BTbacklinestyle,drawstyle=self.BTbackdrawstyle,color=self.backgroundbtcolor,
                                                 sketch_params=None,path_effects=[],
                                                 alpha=self.backgroundalpha,label=aw.arabicReshape(QApplication.translate("Label", "BackgroundBT", None)))
+                self.lod.register(l_back1,self.timeB,self.stemp1B)
+                self.lod.register(l_back2,self.timeB,self.stemp2B)
             
             #create statistics bar
             #calculate the positions for the statistics elements
@@ -8586,6 +8594,7 @@ class tgraphcanvas(FigureCanvas):
             if self.mousepress:                                 #if mouse clicked
                 
                 self.timex[self.indexpoint] = event.xdata
+                self.timexIndex.invalidate()
                 if self.workingline == 1:
                     self.temp1[self.indexpoint] = ydata
                 else:
@@ -8719,6 +8728,7 @@ class tgraphcanvas(FigureCanvas):
         for i in range(len(self.timex)-1):
             if abs(self.timex[i]-self.timex[i+1]) < 20:
                 self.timex[i+1] = self.timex[i] + 20
+                self.timexIndex.invalidate()
             self.disconnect_designer()
             self.connect_designer()
 
@@ -8768,6 +8778,7 @@ class tgraphcanvas(FigureCanvas):
                     self.temp1.insert(0,self.currenty)
 
                 self.timex.insert(0,self.currentx)
+                self.timexIndex.invalidate()
 
                 #update timeindex
                 if self.timeindex[0] != -1:   #we update timeindex[0] different
@@ -8795,6 +8806,7 @@ class tgraphcanvas(FigureCanvas):
                     self.temp1.insert(i,self.currenty)
                 if not (self.temp1[i] == -1 and self.temp2[i] == -1):
                     self.timex.insert(i,self.currentx)
+                    self.timexIndex.invalidate()
 
                     #update timeindex
                     for x in range(len(self.timeindex)):
@@ -8832,6 +8844,7 @@ class tgraphcanvas(FigureCanvas):
                 self.timeindex[whichone] = 0
 
             self.timex.pop(index)
+            self.timexIndex.invalidate()
             self.temp1.pop(index)
             self.temp2.pop(index)
 
@@ -9422,11 +9435,17 @@ class tgraphcanvas(FigureCanvas):
                     self.l_verticalcrossline.set_data([x,x], [self.ylimit_min,self.ylimit])
                 if self.ax_background:
                     self.fig.canvas.restore_region(self.ax_background)
-                    aw.qmc.ax.draw_artist(self.l_horizontalcrossline)
-                    aw.qmc.ax.draw_artist(self.l_verticalcrossline)
-                    if self.base_horizontalcrossline and self.base_verticalcrossline:
-                        aw.qmc.ax.draw_artist(self.base_horizontalcrossline)
-                        aw.qmc.ax.draw_artist(self.base_verticalcrossline)
+                    if self.blit_animated:
+                        # the curves are not part of the background, blitArtists() includes the cross lines
+                        self.l_horizontalcrossline.set_animated(True)
+                        self.l_verticalcrossline.set_animated(True)
+                        self.drawAnimated()
+                    else:
+                        aw.qmc.ax.draw_artist(self.l_horizontalcrossline)
+                        aw.qmc.ax.draw_artist(self.l_verticalcrossline)
+                        if self.base_horizontalcrossline and self.base_verticalcrossline:
+                            aw.qmc.ax.draw_artist(self.base_horizontalcrossline)
+                            aw.qmc.ax.draw_artist(self.base_verticalcrossline)
                     self.fig.canvas.blit(aw.qmc.ax.bbox)
                 else:
                     self.fig.canvas.draw()
@@ -9444,8 +9463,13 @@ class tgraphcanvas(FigureCanvas):
                     self.l_verticalcrossline.set_data([x,x], [self.zlimit_min,self.zlimit])
                 if self.ax_background:
                     self.fig.canvas.restore_region(self.ax_background)
-                    aw.qmc.delta_ax.draw_artist(self.l_horizontalcrossline)
-                    aw.qmc.delta_ax.draw_artist(self.l_verticalcrossline)
+                    if self.blit_animated:
+                        self.l_horizontalcrossline.set_animated(True)
+                        self.l_verticalcrossline.set_animated(True)
+                        self.drawAnimated()
+                    else:
+                        aw.qmc.delta_ax.draw_artist(self.l_horizontalcrossline)
+                        aw.qmc.delta_ax.draw_artist(self.l_verticalcrossline)
                     self.fig.canvas.blit(aw.qmc.delta_ax.bbox)
                 else:
                     self.fig.canvas.draw()
@@ -9601,9 +9625,28 @@ class VMToolbar(NavigationToolbar):
 class SampleThread(QThread):
     updategraphics = pyqtSignal()
     
+    # devices that open their own serial port (self.SP) and thus can be read in parallel to devices on other ports
+    serial_port_devices = [0,1,2,3,4,5,6,7,8,9,10,11,12,13,14,15,16,17,19,20,23,26,30,31,39,56,57,66,67,77]
+    
+    # secondary channels served from the readings cached by their primary device (secondary device -> primary device)
+    secondary_devices = {21:3,24:11,28:19,32:19,44:19,33:29,55:29,48:27,49:27,51:6,54:53,78:77,84:83,85:83,86:83,87:83}
+    
+    # the minimal delay in seconds between two requests to devices that deliver new readings only at a fixed rate
+    # (Hottop: frame interval of the Hottop process, Aillio R1: polling interval of the R1 worker)
+    min_request_delay = {53:0.6,54:0.6,83:0.1,84:0.1,85:0.1,86:0.1,87:0.1}
+    
     def __init__(self,parent = None):
         super(SampleThread,self).__init__(parent)
         self.afterTP = False
+        self.acquisition_pool = None # created on first use by sample_parallel()
+        # streaming decay weighted averages of ctemp1/ctemp2 (for tstemp1/tstemp2) and of unfiltereddelta1/unfiltereddelta2
+        self.temp_decay1 = DecayAverage()
+        self.temp_decay2 = DecayAverage()
+        self.delta_decay1 = DecayAverage()
+        self.delta_decay2 = DecayAverage()
+        # noise statistics of the oversampled channels
+        self.main_noise = [ChannelNoise(),ChannelNoise()] # ET and BT
+        self.extra_noise = [] # per extra device the noise statistics of its two channels, in the order returned by the device
 
     # input filter
     # if temp (the actual reading) is outside of the interval [tmin,tmax] or
@@ -9685,6 +9728,147 @@ class SampleThread(QThread):
             tx = aw.qmc.timeclock.elapsed()/1000.
             return tx,-1.0,-1.0
 
+    # returns the readings of all extra devices or None if extra devices are not consistently configured
+    def sample_extra_devices(self):
+        nxdevices = len(aw.qmc.extradevices)
+        if nxdevices and len(aw.extraser) == nxdevices:
+            return [self.sample_extra_device(i) for i in range(nxdevices)]
+        else:
+            return None
+
+    # returns the readings of all channels of one round of oversampling: the main device reading and the list of
+    # extra device readings (None if extra devices are not oversampled)
+    def sample_round(self,extra):
+        serialMultiplexer.beginRound()
+        if extra and aw.qmc.parallel_sampling:
+            return self.sample_parallel()
+        else:
+            main = self.sample_main_device()
+            if extra:
+                return main,self.sample_extra_devices()
+            else:
+                return main,None
+
+    # returns the combination of the readings of one channel in the oversampling aggregation mode, ignoring reading errors (-1)
+    # and accounts for their noise
+    def combine_readings(self,values,noise):
+        valid = [v for v in values if v != -1]
+        if valid:
+            noise.update(valid)
+            return aggregateReadings(valid,aw.qmc.oversampling_aggregation)
+        else:
+            return -1.0
+
+    # takes further readings from the main device, and from the extra devices if oversampling_extra is set, spread evenly
+    # over the first half of the sampling interval and combines all readings of each channel
+    #  main: the (tx,t1,t2) reading of the main device, extra: the list of extra device readings or None
+    #  start: the time the first round of readings started, duration: the time the first round took (both in seconds)
+    # returns the combined main device reading and the list of combined extra device readings
+    def oversample(self,main,extra,start,duration):
+        extra_devices = aw.qmc.oversampling_extra and extra is not None
+        devices = [aw.qmc.device]
+        if extra_devices:
+            devices += aw.qmc.extradevices
+        reads = max(2,aw.qmc.oversampling_reads)
+        half = aw.qmc.delay/2000.
+        # the time between two rounds respects the time a round takes and the minimal request delay of all devices involved
+        step = max([half / (reads - 1),duration] + [self.min_request_delay.get(d,0) for d in devices])
+        main_readings = [main]
+        extra_readings = [[r] for r in extra] if extra_devices else []
+        for j in range(1,reads):
+            t = start + j * step
+            if t - start > half + 0.001:
+                break
+            if sys.version < '3':
+                now = libtime.time()
+            else:
+                now = libtime.perf_counter()
+            # stop if we fell behind or there is not enough time left in the interval
+            if now - start > half or (2 * half - (now - start)) <= duration:
+                break
+            if t > now:
+                libtime.sleep(t - now)
+            m,x = self.sample_round(extra_devices)
+            main_readings.append(m)
+            if extra_devices and x is not None:
+                for i,r in enumerate(x):
+                    extra_readings[i].append(r)
+        if len(main_readings) < 2:
+            return main,extra
+        tx = sum(r[0] for r in main_readings) / float(len(main_readings))
+        t1 = self.combine_readings([r[1] for r in main_readings],self.main_noise[0])
+        t2 = self.combine_readings([r[2] for r in main_readings],self.main_noise[1])
+        if extra_devices:
+            while len(self.extra_noise) < len(extra_readings):
+                self.extra_noise.append([ChannelNoise(),ChannelNoise()])
+            extra = []
+            for i,readings in enumerate(extra_readings):
+                extra.append((
+                    sum(r[0] for r in readings) / float(len(readings)),
+                    self.combine_readings([r[1] for r in readings],self.extra_noise[i][0]),
+                    self.combine_readings([r[2] for r in readings],self.extra_noise[i][1])))
+        return (tx,t1,t2),extra
+
+    # returns the noise statistics (see ChannelNoise.stats()) of the oversampled ET and BT and of the two channels of each extra device
+    def noise_stats(self):
+        return [n.stats() for n in self.main_noise], [[n.stats() for n in x] for x in self.extra_noise]
+
+    # returns the key of the physical port the given device communicates over. Devices that open their own serial port
+    # are keyed by that port. Secondary channels are keyed as the device filling their cache (primary_keys maps the
+    # devices read before to their key) such that they are read after it. All others (MODBUS, S7, Phidgets,
+    # virtual devices,..) share the port of the preceding device to keep their order
+    def device_port_key(self,device,ser,preceding_key,primary_keys):
+        if device in self.serial_port_devices:
+            return "serial:" + str(ser.comport)
+        elif device in self.secondary_devices and self.secondary_devices[device] in primary_keys:
+            return primary_keys[self.secondary_devices[device]]
+        else:
+            return preceding_key
+
+    # runs the given read on an acquisition worker within the serial multiplexer round of the sampling thread
+    def sample_in_round(self,current_round,read):
+        serialMultiplexer.joinRound(current_round)
+        try:
+            return read()
+        finally:
+            serialMultiplexer.joinRound(None)
+
+    # reads the main device and all extra devices concurrently on one worker per physical port
+    # returns the main device reading and the list of extra device readings (None if extra devices are not consistently configured)
+    # readings that are not received within the sampling round deadline are recorded as -1
+    def sample_parallel(self):
+        if self.acquisition_pool is None:
+            self.acquisition_pool = AcquisitionPool()
+        groups = []
+        current_round = serialMultiplexer.currentRound()
+        main_key = self.device_port_key(aw.qmc.device,aw.ser,"main",{})
+        groups.append((main_key,[(-1,(lambda: self.sample_in_round(current_round,self.sample_main_device)))]))
+        nxdevices = len(aw.qmc.extradevices)
+        extra = nxdevices and len(aw.extraser) == nxdevices
+        if extra:
+            primary_keys = {aw.qmc.device:main_key}
+            key = main_key
+            for i in range(nxdevices):
+                key = self.device_port_key(aw.qmc.extradevices[i],aw.extraser[i],key,primary_keys)
+                primary_keys.setdefault(aw.qmc.extradevices[i],key)
+                job = (i,(lambda i=i: self.sample_in_round(current_round,(lambda: self.sample_extra_device(i)))))
+                g = next((g for g in groups if g[0] == key),None)
+                if g is None:
+                    groups.append((key,[job]))
+                else:
+                    g[1].append(job)
+        if aw.qmc.parallel_sampling_deadline > 0:
+            deadline = min(aw.qmc.parallel_sampling_deadline,aw.qmc.delay)/1000.
+        else:
+            deadline = aw.qmc.delay/1000.
+        results = self.acquisition_pool.sample(groups,deadline)
+        missed = (aw.qmc.timeclock.elapsed()/1000.,-1.0,-1.0)
+        if extra:
+            extra_readings = [results.get(i,missed) for i in range(nxdevices)]
+        else:
+            extra_readings = None
+        return results.get(-1,missed),extra_readings
+
     def compute_delta(self, times, temps, n):
         """Compute a temperature delta using numpy's polyfit with degree 1.
 
@@ -9734,17 +9918,36 @@ class SampleThread(QThread):
                 #if using a meter (thermocouple device)
                 if aw.qmc.device != 18: # not NONE device
                 
+                    # replies to read requests are shared among the devices on the same serial port within one sampling round
+                    serialMultiplexer.beginRound()
                     #### first retrieve readings from the main device
                     if sys.version < '3':
                         timeBeforeETBT = libtime.time() # the time before sending the request to the main device
                     else:
                         timeBeforeETBT = libtime.perf_counter() # the time before sending the request to the main device
                     #read time, ET (t1) and BT (t2) TEMPERATURE                    
-                    tx,t1,t2 = self.sample_main_device()
+                    if aw.qmc.parallel_sampling:
+                        (tx,t1,t2),extra_readings = self.sample_parallel()
+                    else:
+                        tx,t1,t2 = self.sample_main_device()
+                        extra_readings = None
                     if sys.version < '3':
                         timeAfterETBT = libtime.time() # the time the data of the main device was received
                     else:
                         timeAfterETBT = libtime.perf_counter() # the time the data of the main device was received
+                    if aw.qmc.oversampling and aw.qmc.delay >= aw.qmc.oversampling_min_delay:
+                        # read the extra devices first, to keep their readings at the start of the interval or to oversample them in the same rounds
+                        if extra_readings is None:
+                            extra_readings = self.sample_extra_devices()
+                        if aw.qmc.oversampling_extra:
+                            if sys.version < '3':
+                                timeAfterExtra = libtime.time() # the time the data of all extra devices was received
+                            else:
+                                timeAfterExtra = libtime.perf_counter() # the time the data of all extra devices was received
+                            round_duration = timeAfterExtra - timeBeforeETBT
+                        else:
+                            round_duration = timeAfterETBT - timeBeforeETBT
+                        (tx,t1,t2),extra_readings = self.oversample((tx,t1,t2),extra_readings,timeBeforeETBT,round_duration)
                     aw.qmc.RTtemp1 = t1 # store readings for real-time symbolic evaluation
                     aw.qmc.RTtemp2 = t2
                     ##############  if using Extra devices
@@ -9758,7 +9961,10 @@ class SampleThread(QThread):
                             aw.qmc.RTextratemp1,aw.qmc.RTextratemp2,aw.qmc.RTextratx = [],[],[]
                             #2 load RT buffers
                             for i in range(nxdevices):
-                                extratx,extrat2,extrat1 = self.sample_extra_device(i) 
+                                if extra_readings is None:
+                                    extratx,extrat2,extrat1 = self.sample_extra_device(i)
+                                else:
+                                    extratx,extrat2,extrat1 = extra_readings[i]
                                 aw.qmc.RTextratemp1.append(extrat1)
                                 aw.qmc.RTextratemp2.append(extrat2)
                                 aw.qmc.RTextratx.append(extratx)                                
@@ -9788,10 +9994,10 @@ class SampleThread(QThread):
                                         aw.qmc.extractemp2[i].append(float(extrat2))
                                     # update extra lines
                                     if aw.extraCurveVisibility1[i] and len(aw.qmc.extratemp1lines) > xtra_dev_lines1:
-                                        aw.qmc.extratemp1lines[xtra_dev_lines1].set_data(aw.qmc.extractimex1[i], aw.qmc.extractemp1[i])
+                                        aw.qmc.extratemp1lines[xtra_dev_lines1].set_data(aw.qmc.extractimex1[i].view(), aw.qmc.extractemp1[i].view())
                                         xtra_dev_lines1 = xtra_dev_lines1 + 1
                                     if aw.extraCurveVisibility2[i] and len(aw.qmc.extratemp2lines) > xtra_dev_lines2:
-                                        aw.qmc.extratemp2lines[xtra_dev_lines2].set_data(aw.qmc.extractimex2[i], aw.qmc.extractemp2[i])
+                                        aw.qmc.extratemp2lines[xtra_dev_lines2].set_data(aw.qmc.extractimex2[i].view(), aw.qmc.extractemp2[i].view())
                                         xtra_dev_lines2 = xtra_dev_lines2 + 1
                                 else:
                                     # we do not record, so we just replace the old last value
@@ -9827,34 +10033,6 @@ class SampleThread(QThread):
                                 errormessage = "ERROR: extra devices lengths don't match: %s"%string
                                 errormessage += "\nPlease Reset: Extra devices"
                             raise Exception(errormessage)
-                    if sys.version < '3':
-                        timeAfterExtra = libtime.time() # the time the data of all extra devices was received
-                    else:
-                        timeAfterExtra = libtime.perf_counter() # the time the data of all extra devices was received
-                    if aw.qmc.oversampling and aw.qmc.delay >= aw.qmc.oversampling_min_delay:
-                        # let's do the oversampling thing and take a second reading from the main device
-                        sampling_interval = aw.qmc.delay/1000.
-                        etbt_time = timeAfterETBT - timeBeforeETBT
-                        gone = timeAfterExtra - timeBeforeETBT
-                        # only do it if there is enough time to do the ET/BT sampling (which takes etbt_time) 
-                        # and only half of the sampling interval is gone
-                        if (sampling_interval - gone) > etbt_time and gone < (sampling_interval / 2.0):
-                            # place the second ET/BT sampling in the middle of the sampling interval
-                            libtime.sleep((sampling_interval / 2.0) - gone)
-                            tx_2,t1_2,t2_2 = self.sample_main_device()
-                            tx = tx + (tx_2 - tx) / 2.0
-                            if t1 != -1 and t2 != -1 and t1_2 != -1 and t2_2 != -1:
-                                t2 = (t2 + t2_2) / 2.0
-                                t1 = (t1 + t1_2) / 2.0
-                            else: # use new values only to fix reading errors of the initial set of values
-                                if t1 == -1:
-                                    t1 = t1_2
-                                elif t1_2 != -1:
-                                    t1 = (t1 + t1_2) / 2.0
-                                if t2 == -1:
-                                    t2 = t2_2
-                                elif t2_2 != -1:
-                                    t2 = (t2 + t2_2) / 2.0
                     ####### all values retrieved                
 
                     if aw.qmc.ETfunction is not None and len(aw.qmc.ETfunction):
@@ -9918,35 +10096,27 @@ class SampleThread(QThread):
                     # update lines data using the lists with new data (use stempX instead of tempX to supress dropouts
                     if local_flagstart:
                         if aw.qmc.ETcurve:
-                            aw.qmc.l_temp1.set_data(aw.qmc.ctimex1, aw.qmc.ctemp1)
+                            aw.qmc.l_temp1.set_data(aw.qmc.ctimex1.view(), aw.qmc.ctemp1.view())
                         if aw.qmc.BTcurve:
-                            aw.qmc.l_temp2.set_data(aw.qmc.ctimex2, aw.qmc.ctemp2)
+                            aw.qmc.l_temp2.set_data(aw.qmc.ctimex2.view(), aw.qmc.ctemp2.view())
                             
                     #we populate the temporary smoothed ET/BT data arrays (with readings cleansed from -1 dropouts)
                     cf = aw.qmc.curvefilter*2 # we smooth twice as heavy for PID/RoR calcuation as for normal curve smoothing
-                    if self.temp_decay_weights is None or len(self.temp_decay_weights) != cf: # recompute only on changes
-                        self.temp_decay_weights = numpy.arange(1,cf+1)
+                    if self.temp_decay1.window != cf: # reset only on changes
+                        self.temp_decay1.setWindow(cf)
+                        self.temp_decay2.setWindow(cf)
+                    # the decay weighted averages are updated in constant time on each sample
+                    st1 = self.temp_decay1.update(aw.qmc.ctemp1)
+                    st2 = self.temp_decay2.update(aw.qmc.ctemp2)
                     # we don't smooth st'x if last, or butlast temperature value were a drop-out not to confuse the RoR calculation
-                    if -1 in aw.qmc.temp1[-(cf+1):]:                        
-                        cf1 = 1
-                        dw1 = [1]
-                    else:
-                        cf1 = cf
-                        dw1 = self.temp_decay_weights
-                    if -1 in aw.qmc.temp2[-(cf+1):]:
-                        cf2 = 1
-                        dw2 = [1]
-                    else:
-                        cf2 = cf
-                        dw2 = self.temp_decay_weights
-                    if len(aw.qmc.ctemp1) > 0:
-                        st1 = numpy.average(aw.qmc.ctemp1[-min(len(aw.qmc.ctemp1),cf1):],weights=dw1[max(0,cf1-len(aw.qmc.ctemp1)):])
-                    else:
+                    if st1 is None:
                         st1 = -1
-                    if len(aw.qmc.ctemp2) > 0:                    
-                        st2 = numpy.average(aw.qmc.ctemp2[-min(len(aw.qmc.ctemp2),cf2):],weights=dw2[max(0,cf2-len(aw.qmc.ctemp2)):])
-                    else:
+                    elif -1 in aw.qmc.temp1[-(cf+1):]:
+                        st1 = aw.qmc.ctemp1[-1]
+                    if st2 is None:
                         st2 = -1
+                    elif -1 in aw.qmc.temp2[-(cf+1):]:
+                        st2 = aw.qmc.ctemp2[-1]
                     aw.qmc.tstemp1.append(st1)
                     aw.qmc.tstemp2.append(st2)
                     if (aw.qmc.Controlbuttonflag and aw.pidcontrol.pidActive and \
@@ -9997,10 +10167,11 @@ class SampleThread(QThread):
                         if aw.qmc.deltafilter: # and not aw.qmc.altsmoothing:
                             user_filter = int(round(aw.qmc.deltafilter/2.))
                             if user_filter and length_of_qmc_timex > user_filter and (len(aw.qmc.unfiltereddelta1) > user_filter) and (len(aw.qmc.unfiltereddelta2) > user_filter):
-                                if self.decay_weights is None or len(self.decay_weights) != user_filter: # recompute only on changes
-                                    self.decay_weights = numpy.arange(1,user_filter+1)
-                                aw.qmc.rateofchange1 = numpy.average(aw.qmc.unfiltereddelta1[-user_filter:],weights=self.decay_weights)
-                                aw.qmc.rateofchange2 = numpy.average(aw.qmc.unfiltereddelta2[-user_filter:],weights=self.decay_weights)
+                                if self.delta_decay1.window != user_filter: # reset only on changes
+                                    self.delta_decay1.setWindow(user_filter)
+                                    self.delta_decay2.setWindow(user_filter)
+                                aw.qmc.rateofchange1 = self.delta_decay1.update(aw.qmc.unfiltereddelta1)
+                                aw.qmc.rateofchange2 = self.delta_decay2.update(aw.qmc.unfiltereddelta2)
                                 
                         if aw.qmc.timeindex[6]:
                             rateofchange1plot = None
@@ -10052,9 +10223,9 @@ class SampleThread(QThread):
                     
                     if local_flagstart:
                         if aw.qmc.DeltaETflag:
-                            aw.qmc.l_delta1.set_data(aw.qmc.timex, aw.qmc.delta1)
+                            aw.qmc.l_delta1.set_data(columnView(aw.qmc.timex), columnView(aw.qmc.delta1))
                         if aw.qmc.DeltaBTflag:
-                            aw.qmc.l_delta2.set_data(aw.qmc.timex, aw.qmc.delta2)
+                            aw.qmc.l_delta2.set_data(columnView(aw.qmc.timex), columnView(aw.qmc.delta2))
                         #readjust xlimit of plot if needed
                         if  not aw.qmc.fixmaxtime and not aw.qmc.locktimex and aw.qmc.timex[-1] > (aw.qmc.endofx - 45):            # if difference is smaller than 30 seconds
                             aw.qmc.endofx = int(aw.qmc.timex[-1] + 180.)         # increase x limit by 3 minutes
@@ -10234,7 +10405,8 @@ class SampleThread(QThread):
                         aw.qmc.xaxistosm(redraw=False) # don't redraw within the sampling process!!
                     #aw.qmc.resetlines()
                     #add to plot a vertical time line
-                    aw.qmc.l_timeline, = aw.qmc.ax.plot([tx,tx], [aw.qmc.ylimit_min,aw.qmc.ylimit],color = aw.qmc.palette["timeguide"],linestyle = '-', linewidth= 1, alpha = .7,sketch_params=None,path_effects=[])
+                    aw.qmc.l_timeline, = aw.qmc.ax.plot([tx,tx], [aw.qmc.ylimit_min,aw.qmc.ylimit],color = aw.qmc.palette["timeguide"],linestyle = '-', linewidth= 1, alpha = .7,sketch_params=None,path_effects=[],
+                        animated=aw.qmc.blit_animated)
                     # also in the manual case we check for TP
                     if local_flagstart:
                         # check for TP event if already CHARGEed and not yet recognized
@@ -10247,6 +10419,7 @@ class SampleThread(QThread):
             _, _, exc_tb = sys.exc_info()
             aw.qmc.adderror((QApplication.translate("Error Message","Exception:",None) + " sample() {0}").format(str(e)),exc_tb.tb_lineno)
         finally:
+            serialMultiplexer.endRound()
             if aw.qmc.samplingsemaphore.available() < 1:
                 aw.qmc.samplingsemaphore.release(1)
             #update screen in main GUI thread
@@ -10313,6 +10486,9 @@ class SampleThread(QThread):
         finally:
             aw.qmc.flagsampling = False # we signal that we are done with sampling
             aw.qmc.flagsamplingthreadrunning = False
+            if self.acquisition_pool is not None:
+                self.acquisition_pool.stop()
+                self.acquisition_pool = None
             if sys.platform.startswith("darwin"):
                 del pool
 
@@ -10326,8 +10502,6 @@ class Athreadserver(QWidget):
 
     def createSampleThread(self):
         sthread = SampleThread(self)
-        sthread.decay_weights = None
-        sthread.temp_decay_weights = None
         #QApplication.processEvents()
 
         #connect graphics to GUI thread
@@ -10342,13 +10516,14 @@ class Athreadserver(QWidget):
 
 class EventActionThread(QThread):
 
-    def __init__(self, action, command):
+    def __init__(self, action, command, priority=0):
         QThread.__init__(self)
         self.action = action
         self.command = command
+        self.priority = priority
 
     def run(self):    
-        aw.eventaction_internal(self.action,self.command)
+        aw.eventaction_internal(self.action,self.command,self.priority)
 
 
 ########################################################################################
@@ -10396,6 +10571,10 @@ class ApplicationWindow(QMainWindow):
         self.lastLoadedProfile = ""
         self.lastLoadedBackground = ""
         
+        # if True, batch conversions to PNG/SVG/PDF render a simplified chart in worker processes (see artisanlib.render)
+        # instead of loading each profile into the GUI and saving the full chart
+        self.fastImageConversion = False
+        
         # large LCDs
         self.largeLCDs_dialog = None
         self.LargeLCDs = False
@@ -10434,6 +10613,9 @@ class ApplicationWindow(QMainWindow):
 
         #defaults the users profile path to the standard profilepath (incl. month/year subdirectories)
         self.userprofilepath = self.profilepath
+        
+        # cache of the metadata of profiles used by the reports
+        self.profileMetadataCache = ProfileMetadataCache(u(QDir(QStandardPaths.writableLocation(QStandardPaths.CacheLocation)).filePath("profile-metadata.json")))
 
         self.printer = QPrinter(QPrinter.HighResolution)
         self.printer.setCreator("Artisan")
@@ -10716,6 +10898,14 @@ class ApplicationWindow(QMainWindow):
         fileConvertCelsiusAction = QAction(QApplication.translate("Menu", "Celsius...",None),self)
         fileConvertCelsiusAction.triggered.connect(self.fileConvertToCelsius)
         self.convMenu.addAction(fileConvertCelsiusAction)
+
+        folderConvertFahrenheitAction = QAction(QApplication.translate("Menu", "Folder to Fahrenheit...",None),self)
+        folderConvertFahrenheitAction.triggered.connect(self.folderConvertToFahrenheit)
+        self.convMenu.addAction(folderConvertFahrenheitAction)
+
+        folderConvertCelsiusAction = QAction(QApplication.translate("Menu", "Folder to Celsius...",None),self)
+        folderConvertCelsiusAction.triggered.connect(self.folderConvertToCelsius)
+        self.convMenu.addAction(folderConvertCelsiusAction)
         
         self.convMenu.addSeparator()
 
@@ -10726,6 +10916,10 @@ class ApplicationWindow(QMainWindow):
         fileConvertJSONAction = QAction(QApplication.translate("Menu", "Artisan JSON...",None),self)
         fileConvertJSONAction.triggered.connect(self.fileConvertJSON)
         self.convMenu.addAction(fileConvertJSONAction)
+
+        fileConvertBinaryAction = QAction(QApplication.translate("Menu", "Artisan Binary...",None),self)
+        fileConvertBinaryAction.triggered.connect(self.fileConvertBinary)
+        self.convMenu.addAction(fileConvertBinaryAction)
         
         self.convMenu.addSeparator()
 
@@ -10751,6 +10945,12 @@ class ApplicationWindow(QMainWindow):
         fileConvertPDFAction.triggered.connect(self.fileConvertPDF)
         self.convMenu.addAction(fileConvertPDFAction)
         
+        self.fastImageConversionAction = QAction(QApplication.translate("Menu", "Fast Simplified Charts",None),self)
+        self.fastImageConversionAction.triggered.connect(self.toggleFastImageConversion)
+        self.fastImageConversionAction.setCheckable(True)
+        self.fastImageConversionAction.setChecked(self.fastImageConversion)
+        self.convMenu.addAction(self.fastImageConversionAction)
+        
 
         self.fileMenu.addSeparator()
 
@@ -10907,6 +11107,12 @@ class ApplicationWindow(QMainWindow):
         self.oversamplingAction.setChecked(self.qmc.oversampling)
         self.ConfMenu.addAction(self.oversamplingAction)
 
+        self.parallelSamplingAction = QAction(UIconst.CONF_MENU_PARALLELSAMPLING,self)
+        self.parallelSamplingAction.triggered.connect(self.parallelsampling)
+        self.parallelSamplingAction.setCheckable(True)
+        self.parallelSamplingAction.setChecked(self.qmc.parallel_sampling)
+        self.ConfMenu.addAction(self.parallelSamplingAction)
+
         self.ConfMenu.addSeparator()
 
         self.hudAction = QAction(UIconst.CONF_MENU_CURVES,self)
@@ -13122,46 +13328,14 @@ class ApplicationWindow(QMainWindow):
         
     
     # computes the similarity between BT and backgroundBT as well as ET and backgroundET
-    # iterates over all BT/ET values backward from DROP to the specified BT temperature
+    # over all BT/ET values backward from DROP to the specified BT temperature
     # returns None in case no similarity can be computed
     def curveSimilarity(self,BTlimit=None):
         try:
             # if background profile is loaded and both profiles have a DROP even set
             if aw.qmc.background and aw.qmc.timeindex[6] and aw.qmc.timeindexB[6]:
-                # calculate time delta between background and foreground DROP event
-                dropTimeDelta = aw.qmc.timex[aw.qmc.timeindex[6]] - aw.qmc.timeB[aw.qmc.timeindexB[6]]
-                totalQuadraticDeltaET = 0
-                totalQuadraticDeltaBT = 0
-                count = 0
-                for i in range(aw.qmc.timeindex[6],0,-1):
-                    # iterate backward from DROP to BTlimit
-                    if aw.qmc.stemp1 and len(aw.qmc.stemp1) > i:
-                        # take smoothed data if available
-                        et = aw.qmc.stemp1[i]
-                    else:
-                        et = aw.qmc.temp1[i]
-                    if aw.qmc.stemp2 and len(aw.qmc.stemp2) > i:
-                        # take smoothed data if available
-                        bt = aw.qmc.stemp2[i]
-                    else:
-                        bt = aw.qmc.temp2[i]
-                    if BTlimit and bt > BTlimit:
-                        # still above the limit
-                        # retrieve corresponding values from the background (is always smoothed)
-                        # first compute closest index at that time point in the background data
-                        j = aw.qmc.backgroundtime2index((aw.qmc.timex[i] - dropTimeDelta))                                                                        
-                        etb = aw.qmc.temp1B[j]
-                        etb = aw.qmc.backgroundETat(aw.qmc.timex[i] - dropTimeDelta)
-                        #btb = aw.qmc.temp2B[j]
-                        btb = aw.qmc.backgroundBTat(aw.qmc.timex[i] - dropTimeDelta)
-                        det = (et - etb)
-                        totalQuadraticDeltaET += det * det
-                        dbt = (bt - btb)
-                        totalQuadraticDeltaBT += dbt * dbt
-                        count += 1                        
-                    else:
-                        break
-                return math.sqrt(totalQuadraticDeltaET/float(count)), math.sqrt(totalQuadraticDeltaBT/float(count))
+                return curveSimilarities(aw.qmc.timex,aw.qmc.temp1,aw.qmc.temp2,aw.qmc.stemp1,aw.qmc.stemp2,aw.qmc.timeindex[6],
+                    [(aw.qmc.timeB,aw.qmc.temp1B,aw.qmc.temp2B,aw.qmc.timeindexB[6])],BTlimit)[0]
             else:
                 # no DROP event registered
                 return None, None
@@ -13169,6 +13343,36 @@ class ApplicationWindow(QMainWindow):
 #            import traceback
 #            traceback.print_exc(file=sys.stdout)        
             return None, None
+
+    # computes the similarity of the foreground profile to each of the given profiles (as returned by deserialize())
+    # like curveSimilarity() does for the background profile. Profiles recorded in another temperature mode are converted.
+    # returns a list with one (ET similarity,BT similarity) tuple per profile; (None,None) if no similarity can be computed
+    # for a profile (eg. because it has no DROP event). Sorting by the BT similarity ranks the profiles by similarity.
+    def curveSimilarityProfiles(self,profiles,BTlimit=None):
+        backgrounds = []
+        for p in profiles:
+            try:
+                timeB = p["timex"]
+                temp1B = p["temp1"]
+                temp2B = p["temp2"]
+                if "mode" in p and str(p["mode"]) != aw.qmc.mode:
+                    if aw.qmc.mode == "C":
+                        temp1B = [aw.qmc.fromFtoC(t) for t in temp1B]
+                        temp2B = [aw.qmc.fromFtoC(t) for t in temp2B]
+                    else:
+                        temp1B = [aw.qmc.fromCtoF(t) for t in temp1B]
+                        temp2B = [aw.qmc.fromCtoF(t) for t in temp2B]
+                if "timeindex" in p:
+                    dropB = p["timeindex"][6]
+                else:
+                    dropB = 0
+                backgrounds.append((timeB,temp1B,temp2B,dropB))
+            except Exception:
+                backgrounds.append(([],[],[],0))
+        if aw.qmc.timeindex[6]:
+            return curveSimilarities(aw.qmc.timex,aw.qmc.temp1,aw.qmc.temp2,aw.qmc.stemp1,aw.qmc.stemp2,aw.qmc.timeindex[6],backgrounds,BTlimit)
+        else:
+            return [(None,None)]*len(profiles)
             
     def setLCDsDigitCount(self,n):
         self.lcd2.setDigitCount(n)
@@ -13808,7 +14012,7 @@ class ApplicationWindow(QMainWindow):
                 else:
                     cmd = self.eventslidercommands[n]
                     cmd = cmd.format(value)
-                self.eventaction(action,cmd)
+                self.eventaction(action,cmd,1) # MODBUS writes of sliders are delivered after those of other actions
             except Exception as e:
                 _, _, exc_tb = sys.exc_info()
                 aw.qmc.adderror((QApplication.translate("Error Message","Exception:",None) + " fireslideraction() {0}").format(str(e)),exc_tb.tb_lineno)
@@ -13941,10 +14145,11 @@ class ApplicationWindow(QMainWindow):
     #actions: 0 = None; 1= Serial Command; 2= Call program; 3= Multiple Event; 4= Modbus Command; 5=DTA Command; 6=IO Command (Phidgets IO); 
     #         7= Call Program with argument (slider action); 8= HOTTOP Heater; 9= HOTTOP Main Fan; 10= HOTTOP Cooling Fan; 11= p-i-d; 12= Fuji Command;
     #         13= PWM Command; 14= VOUT Command; 15= S7 Command; 16= Aillio R1 Heater; 17= Aillio R1 Fan; 18= Aillio R1 Drum; 19= Aillio R1 Command
-    def eventaction(self,action,cmd):
+    # priority: the priority of MODBUS writes issued by the action (see modbusWriteQueue); writes of lower values are delivered first
+    def eventaction(self,action,cmd,priority=0):
 #        self.eventaction_internal(action,cmd)
         if action:
-            eventActionThread = EventActionThread(action,cmd)                
+            eventActionThread = EventActionThread(action,cmd,priority)                
             eventActionThread.finished.connect(lambda x=eventActionThread : self.eventactionThreadDone(x))
             self.eventaction_running_threads.append(eventActionThread)
             eventActionThread.start()
@@ -13953,7 +14158,7 @@ class ApplicationWindow(QMainWindow):
         if actionthread in self.eventaction_running_threads:
             self.eventaction_running_threads.remove(actionthread)
     
-    def eventaction_internal(self,action,cmd):
+    def eventaction_internal(self,action,cmd,priority=0):
         if action:
             try:
                 if action in [8,9,10]:
@@ -13994,11 +14199,18 @@ class ApplicationWindow(QMainWindow):
                             self.recordextraevent(buttonnumber)
                 elif action == 4: # MODBUS Command
                     if cmd_str:
-                        cmds = filter(None, cmd_str.split(";")) # allows for sequences of commands like in "<cmd>;<cmd>;...;<cmd>"
+                        cmds = list(filter(None, cmd_str.split(";"))) # allows for sequences of commands like in "<cmd>;<cmd>;...;<cmd>"
+                        # sequences of writes are queued for asynchronous delivery, sequences with sleep or read commands are executed synchronously
+                        asynchronous = not any(c.strip().startswith(("sleep","read")) for c in cmds)
+                        if asynchronous:
+                            mb = aw.modbus.queuedWriter(priority)
+                        else:
+                            aw.modbus.writeQueue.flush() # pending writes are delivered first to keep their order
+                            mb = aw.modbus
                         followupCmd = 0 # contains the required sleep time
                         for c in cmds:
                             cs = c.strip().replace("_",str(aw.modbus.lastReadResult)) # the last read value can be accessed via the "_" symbol
-                            if followupCmd:
+                            if followupCmd and not asynchronous:
                                 if followupCmd == 0.08:
                                     aw.modbus.sleepBetween(write=True)
                                 else:
@@ -14009,7 +14221,7 @@ class ApplicationWindow(QMainWindow):
                                     cmds = eval(cs[len('writem'):])
                                     if isinstance(cmds,tuple) and len(cmds) == 3:
                                         # cmd has format "writem(s,r,[v1,..,vn])" or "writem(s,r,v)"
-                                        aw.modbus.writeRegisters(*cmds)
+                                        mb.writeRegisters(*cmds)
                                         followupCmd = 0.08
                                 except Exception:
                                     pass
@@ -14028,18 +14240,18 @@ class ApplicationWindow(QMainWindow):
                                     if isinstance(cmds,tuple):
                                         if len(cmds) == 3 and not isinstance(cmds[0],list):
                                             # cmd has format "writeBCD(s,r,v)"
-                                            aw.modbus.writeBCD(*cmds)
+                                            mb.writeBCD(*cmds)
                                             followupCmd = 0.08
                                         else:
                                         # cmd has format "writeBCD([s,r,v],..,[s,r,v])"
                                             for cmd in cmds:
-                                                if followupCmd:
+                                                if followupCmd and not asynchronous:
                                                     libtime.sleep(followupCmd) # respect the MODBUS timing (a MODBUS command might have preceeded)
-                                                aw.modbus.writeBCD(*cmd)
+                                                mb.writeBCD(*cmd)
                                                 followupCmd = 0.08
                                     else:
                                         # cmd has format "writeBCD([s,r,v])"
-                                        aw.modbus.writeBCD(*cmds)
+                                        mb.writeBCD(*cmds)
                                         followupCmd = 0.08
                                 except Exception:
                                     pass                            
@@ -14049,18 +14261,18 @@ class ApplicationWindow(QMainWindow):
                                     if isinstance(cmds,tuple):
                                         if len(cmds) == 3 and not isinstance(cmds[0],list):
                                             # cmd has format "write(s,r,v)"
-                                            aw.modbus.writeRegister(*cmds)
+                                            mb.writeRegister(*cmds)
                                             followupCmd = 0.08
                                         else:
                                         # cmd has format "write([s,r,v],..,[s,r,v])"
                                             for cmd in cmds:
-                                                if followupCmd:
+                                                if followupCmd and not asynchronous:
                                                     libtime.sleep(followupCmd) # respect the MODBUS timing (a MODBUS command might have preceeded)
-                                                aw.modbus.writeRegister(*cmd)
+                                                mb.writeRegister(*cmd)
                                                 followupCmd = 0.08
                                     else:
                                         # cmd has format "write([s,r,v])"
-                                        aw.modbus.writeRegister(*cmds)
+                                        mb.writeRegister(*cmds)
                                         followupCmd = 0.08
                                 except Exception:
                                     pass
@@ -14070,18 +14282,18 @@ class ApplicationWindow(QMainWindow):
                                     if isinstance(cmds,tuple):
                                         if len(cmds) == 4 and not isinstance(cmds[0],list):
                                             # cmd has format "mwrite(s,r,am,om)"
-                                            aw.modbus.maskWriteRegister(*cmds)
+                                            mb.maskWriteRegister(*cmds)
                                             followupCmd = 0.08
                                         else:
                                         # cmd has format "mwrite([s,r,am,om],..,[s,r,am,om])"
                                             for cmd in cmds:
-                                                if followupCmd:
+                                                if followupCmd and not asynchronous:
                                                     libtime.sleep(followupCmd) # respect the MODBUS timing (a MODBUS command might have preceeded)
-                                                aw.modbus.maskWriteRegister(*cmd)
+                                                mb.maskWriteRegister(*cmd)
                                                 followupCmd = 0.08
                                     else:
                                         # cmd has format "write([s,r,am,om])"
-                                        aw.modbus.maskWriteRegister(*cmds)
+                                        mb.maskWriteRegister(*cmds)
                                         followupCmd = 0.08
                                 except Exception:
                                     pass                                    
@@ -14091,7 +14303,7 @@ class ApplicationWindow(QMainWindow):
                                     if isinstance(cmds,tuple):
                                         if len(cmds) == 3 and not isinstance(cmds[0],list):
                                             # cmd has format "wcoils(s,r,[<b>,..<b>])"
-                                            aw.modbus.writeCoils(*cmds)
+                                            mb.writeCoils(*cmds)
                                             followupCmd = 0.08
                                 except Exception:
                                     pass
@@ -14100,7 +14312,7 @@ class ApplicationWindow(QMainWindow):
                                     cmds = eval(cs[len('wcoil'):])
                                     if isinstance(cmds,tuple) and len(cmds) == 3:
                                         # cmd has format "wcoil(s,r,<b>)"                    
-                                        aw.modbus.writeCoil(*cmds)
+                                        mb.writeCoil(*cmds)
                                         followupCmd = 0.08
                                 except Exception:
                                     pass
@@ -15283,7 +15495,7 @@ class ApplicationWindow(QMainWindow):
                 res = QDir.setCurrent(self.qmc.autosavepath)
                 if res:
                     #write
-                    self.serialize(u(filename),self.getProfile())
+                    self.serializeProfile(u(filename),self.getProfile())
                     #restore dirs
                     QDir.setCurrent(oldDir)
                     self.sendmessage(QApplication.translate("Message","Profile {0} saved in: {1}", None).format(filename,self.qmc.autosavepath))
@@ -15585,7 +15797,7 @@ class ApplicationWindow(QMainWindow):
                 raise IOError(u(f.errorString()))
             stream = QTextStream(f)
             firstChar = stream.read(1)
-            if firstChar == "{":
+            if firstChar == "{" or isBinaryProfile(u(filename)):
                 f.close()
                 res = aw.qmc.reset(redraw=False,soundOn=False)
                 if res:
@@ -15644,7 +15856,7 @@ class ApplicationWindow(QMainWindow):
             stream = QTextStream(f)
             
             firstChar = stream.read(1)
-            if firstChar == "{":
+            if firstChar == "{" or isBinaryProfile(u(filename)):
                 f.close()
                 profile = self.deserialize(filename)
                 tb = profile["timex"]
@@ -15657,25 +15869,18 @@ class ApplicationWindow(QMainWindow):
                     m = str(profile["mode"])
                     #convert modes only if needed comparing the new uploaded mode to the old one.
                     #otherwise it would incorrectly convert the uploaded phases
-                    if m == "F" and self.qmc.mode == "C":
-                        # we have to convert all temperatures from F to C
-                        t1 = [self.qmc.fromFtoC(t) for t in t1]
-                        t2 = [self.qmc.fromFtoC(t) for t in t2]
-                        for e in range(len(t1x)):
-                            t1x[e] = [self.qmc.fromFtoC(t) for t in t1x[e]]
-                            t2x[e] = [self.qmc.fromFtoC(t) for t in t2x[e]]
-                    if m == "C" and self.qmc.mode == "F":
-                        # we have to convert all temperatures from C to F
-                        t1 = [self.qmc.fromCtoF(t) for t in t1]
-                        t2 = [self.qmc.fromCtoF(t) for t in t2]
-                        for e in range(len(t1x)):
-                            t1x[e] = [self.qmc.fromCtoF(t) for t in t1x[e]]
-                            t2x[e] = [self.qmc.fromCtoF(t) for t in t2x[e]]
+                    if m != self.qmc.mode:
+                        # we have to convert all temperatures to the current unit
+                        t1 = convertTemps(t1,m,self.qmc.mode)
+                        t2 = convertTemps(t2,m,self.qmc.mode)
+                        t1x = convertExtraTemps(t1x,[],m,self.qmc.mode)
+                        t2x = convertExtraTemps(t2x,[],m,self.qmc.mode)
                 
                 names1x = [d(x) for x in profile["extraname1"]]
                 names2x = [d(x) for x in profile["extraname2"]]
                 timex = profile["extratimex"]
                 self.qmc.temp1B,self.qmc.temp2B,self.qmc.timeB, self.qmc.temp1BX, self.qmc.temp2BX = t1,t2,tb,t1x,t2x
+                self.qmc.timeBIndex.invalidate()
                 self.qmc.extratimexB = timex
                 b1 = self.qmc.smooth_list(tb,self.qmc.fill_gaps(t1),window_len=self.qmc.curvefilter)
                 b2 = self.qmc.smooth_list(tb,self.qmc.fill_gaps(t2),window_len=self.qmc.curvefilter)
@@ -15902,6 +16107,8 @@ class ApplicationWindow(QMainWindow):
 
     def addSerialPort(self):
         n = len(self.qmc.extradevices) - 1
+        for ser in self.extraser[n:]:
+            ser.releaseport()
         self.extraser = self.extraser[:n]
         self.extraser.append(serialport())
         self.extracomport = self.extracomport[:n]
@@ -15956,13 +16163,13 @@ class ApplicationWindow(QMainWindow):
             self.qmc.extrastemp2 = self.qmc.extrastemp2[:n-1]
             self.qmc.extrastemp2.append([])
             self.qmc.extractimex1 = self.qmc.extractimex1[:n-1]
-            self.qmc.extractimex1.append([])
+            self.qmc.extractimex1.append(ProfileColumn())
             self.qmc.extractimex2 = self.qmc.extractimex2[:n-1]
-            self.qmc.extractimex2.append([])
+            self.qmc.extractimex2.append(ProfileColumn())
             self.qmc.extractemp1 = self.qmc.extractemp1[:n-1]
-            self.qmc.extractemp1.append([])
+            self.qmc.extractemp1.append(ProfileColumn())
             self.qmc.extractemp2 = self.qmc.extractemp2[:n-1]
-            self.qmc.extractemp2.append([])
+            self.qmc.extractemp2.append(ProfileColumn())
 
             #add new style variables
             self.qmc.extralinestyles1 = self.qmc.extralinestyles1[:n-1]
@@ -16276,6 +16483,8 @@ class ApplicationWindow(QMainWindow):
                 aw.extraLCDframe1[i].setVisible(False)
                 aw.extraLCDframe2[i].setVisible(False)
             #delete EXTRA COMM PORTS VARIABLES
+            for ser in aw.extraser:
+                ser.releaseport()
             aw.extraser = []
             aw.extracomport,aw.extrabaudrate,aw.extrabytesize,aw.extraparity,aw.extrastopbits,aw.extratimeout = [],[],[],[],[],[]
             aw.qmc.resetlinecountcaches()
@@ -16656,14 +16865,19 @@ class ApplicationWindow(QMainWindow):
         f.write(repr(obj))
         f.close()
 
-    #Read object from file 
+    #Write profile to file, in the binary format if aw.qmc.binaryprofiles is set
+    def serializeProfile(self,filename,profile):
+        if aw.qmc.binaryprofiles:
+            writeBinaryProfile(u(filename),profile,aw.qmc.binaryprofilescompression)
+        else:
+            self.serialize(filename,profile)
+
+    #Read object from file (in the textual or the binary profile format)
     def deserialize(self,filename):
         try:
             obj = None
             if os.path.exists(u(filename)):
-                f = codecs.open(u(filename), 'rb', encoding='utf-8')
-                obj=ast.literal_eval(f.read())
-                f.close()
+                obj = readProfile(u(filename))
             return obj
         except Exception as ex:
             _, _, exc_tb = sys.exc_info()
@@ -16672,6 +16886,40 @@ class ApplicationWindow(QMainWindow):
 #            import traceback
 #            traceback.print_exc(file=sys.stdout)
 
+    #Read profile metadata from file; the time series are loaded only if accessed (used by the reports)
+    def deserializeMetadata(self,filename):
+        try:
+            return self.profileMetadataCache.profile(u(filename))
+        except Exception as ex:
+            _, _, exc_tb = sys.exc_info()
+            aw.qmc.adderror((QApplication.translate("Error Message","Exception:",None) + " deserializeMetadata() {0}").format(str(ex)),exc_tb.tb_lineno)
+            return {}
+
+    # returns the report entries (see artisanlib.reports.reportEntry()) of the given profile files sorted by roast date
+    # larger reports are computed by worker processes while a progress dialog is shown
+    def reportEntries(self,files,ranking=False,AUCsettings=None):
+        progress = QProgressDialog(QApplication.translate("Message", "Generating report...",None), None, 0, len(files), self)
+        progress.setCancelButton(None)
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setAutoClose(True)
+        progress.show()
+        def update(i):
+            progress.setValue(i)
+            QApplication.processEvents()
+        try:
+            return reportEntries(files,self.deserializeMetadata,ranking,AUCsettings,update,cache=self.profileMetadataCache)
+        finally:
+            progress.cancel()
+            self.saveProfileMetadataCache()
+
+    def saveProfileMetadataCache(self):
+        try:
+            self.profileMetadataCache.prune()
+            self.profileMetadataCache.save()
+        except Exception as ex:
+            _, _, exc_tb = sys.exc_info()
+            aw.qmc.adderror((QApplication.translate("Error Message","Exception:",None) + " saveProfileMetadataCache() {0}").format(str(ex)),exc_tb.tb_lineno)
+
 
     def ensureCorrectExtraDeviceListLenght(self):
         self.qmc.extraname1 = self.qmc.extraname1[:len(self.qmc.extradevices)]
@@ -16734,6 +16982,8 @@ class ApplicationWindow(QMainWindow):
 
                 # adjust extra serial device table
                 # a) remove superfluous extra serial settings
+                for ser in self.extraser[len(self.qmc.extradevices):]:
+                    ser.releaseport()
                 self.extraser = self.extraser[:len(self.qmc.extradevices)]
                 self.extracomport = self.extracomport[:len(self.qmc.extradevices)]
                 self.extrabaudrate = self.extrabaudrate[:len(self.qmc.extradevices)]
@@ -16750,13 +17000,13 @@ class ApplicationWindow(QMainWindow):
                 if "extratemp1" in profile and len(self.qmc.extratimex) > 0:
                     self.qmc.extratemp1 = profile["extratemp1"] + [[-1]*len(self.qmc.extratimex[0])]*(len(self.qmc.extradevices) - len(profile["extratimex"]))
                     self.qmc.extrastemp1 = [[]]*len(self.qmc.extratemp1)
-                    self.qmc.extractemp1 = [[]]*len(self.qmc.extratemp1)
-                    self.qmc.extractimex1 = [[]]*len(self.qmc.extratemp1)
+                    self.qmc.extractemp1 = [ProfileColumn() for _ in range(len(self.qmc.extratemp1))]
+                    self.qmc.extractimex1 = [ProfileColumn() for _ in range(len(self.qmc.extratemp1))]
                 if "extratemp2" in profile and len(self.qmc.extratimex) > 0:
                     self.qmc.extratemp2 = profile["extratemp2"] + [[-1]*len(self.qmc.extratimex[0])]*(len(self.qmc.extradevices) - len(profile["extratimex"]))
                     self.qmc.extrastemp2 = [[]]*len(self.qmc.extratemp2)
-                    self.qmc.extractemp2 = [[]]*len(self.qmc.extratemp2)
-                    self.qmc.extractimex2 = [[]]*len(self.qmc.extratemp2)
+                    self.qmc.extractemp2 = [ProfileColumn() for _ in range(len(self.qmc.extratemp2))]
+                    self.qmc.extractimex2 = [ProfileColumn() for _ in range(len(self.qmc.extratemp2))]
                 # d) set other extra curve attribute lists
                 if "extraname1" in profile:
                     self.qmc.extraname1 = [d(x) for x in profile["extraname1"] + self.qmc.extraname1[len(profile["extraname1"]):]]
@@ -17064,13 +17314,10 @@ class ApplicationWindow(QMainWindow):
                 self.qmc.greens_temp = 0.
                 
             if self.qmc.mode == "C" and m == "F":
-                self.qmc.temp1 = [self.qmc.fromFtoC(t) for t in self.qmc.temp1]
-                self.qmc.temp2 = [self.qmc.fromFtoC(t) for t in self.qmc.temp2]
-                for e in range(len(self.qmc.extratimex)):
-                    if not (len(aw.qmc.extraNoneTempHint1) > e and aw.qmc.extraNoneTempHint1[e]):
-                        self.qmc.extratemp1[e] = [self.qmc.fromFtoC(t) for t in self.qmc.extratemp1[e]]
-                    if not (len(aw.qmc.extraNoneTempHint2) > e and aw.qmc.extraNoneTempHint2[e]):
-                        self.qmc.extratemp2[e] = [self.qmc.fromFtoC(t) for t in self.qmc.extratemp2[e]]
+                self.qmc.temp1 = convertTemps(self.qmc.temp1,"F","C")
+                self.qmc.temp2 = convertTemps(self.qmc.temp2,"F","C")
+                self.qmc.extratemp1 = convertExtraTemps(self.qmc.extratemp1,aw.qmc.extraNoneTempHint1,"F","C")
+                self.qmc.extratemp2 = convertExtraTemps(self.qmc.extratemp2,aw.qmc.extraNoneTempHint2,"F","C")
                 if self.qmc.ambientTemp != 0:
                     self.qmc.ambientTemp = self.qmc.fromFtoC(self.qmc.ambientTemp)
                 if self.qmc.loadalarmsfromprofile and "alarmtemperature" in profile:
@@ -17079,13 +17326,10 @@ class ApplicationWindow(QMainWindow):
                     self.qmc.greens_temp = self.qmc.fromFtoC(self.qmc.greens_temp)
                 self.qmc.safesaveflag = True
             elif self.qmc.mode == "F" and m == "C":
-                self.qmc.temp1 = [self.qmc.fromCtoF(t) for t in self.qmc.temp1]
-                self.qmc.temp2 = [self.qmc.fromCtoF(t) for t in self.qmc.temp2]
-                for e in range(len(self.qmc.extratimex)):
-                    if not (len(aw.qmc.extraNoneTempHint1) > e and aw.qmc.extraNoneTempHint1[e]):
-                        self.qmc.extratemp1[e] = [self.qmc.fromCtoF(t) for t in self.qmc.extratemp1[e]]
-                    if not (len(aw.qmc.extraNoneTempHint2) > e and aw.qmc.extraNoneTempHint2[e]):
-                        self.qmc.extratemp2[e] = [self.qmc.fromCtoF(t) for t in self.qmc.extratemp2[e]]
+                self.qmc.temp1 = convertTemps(self.qmc.temp1,"C","F")
+                self.qmc.temp2 = convertTemps(self.qmc.temp2,"C","F")
+                self.qmc.extratemp1 = convertExtraTemps(self.qmc.extratemp1,aw.qmc.extraNoneTempHint1,"C","F")
+                self.qmc.extratemp2 = convertExtraTemps(self.qmc.extratemp2,aw.qmc.extraNoneTempHint2,"C","F")
                 if self.qmc.ambientTemp != 0:
                     self.qmc.ambientTemp = self.qmc.fromCtoF(self.qmc.ambientTemp)
                 if self.qmc.loadalarmsfromprofile and "alarmtemperature" in profile:
@@ -17601,7 +17845,7 @@ class ApplicationWindow(QMainWindow):
                 #write
                 pf = self.getProfile()
                 if pf:
-                    self.serialize(filename,pf)
+                    self.serializeProfile(filename,pf)
                     self.setCurrentFile(filename)
                     self.sendmessage(QApplication.translate("Message","Profile saved", None))
                     aw.curFile = filename
@@ -17684,11 +17928,9 @@ class ApplicationWindow(QMainWindow):
                         
     def fileConvertRoastLogger(self):
         self.fileConvert(".csv",self.exportRoastLogger)
-        
-    def fileConvertPilot(self):
-        self.fileConvert(".xml",self.exportPilot)
 
-    def fileConvertPNG(self):
+    # converts .alog profiles to the binary profile format, keeping their file names
+    def fileConvertBinary(self):
         files = self.ArtisanOpenFilesDialog(ext="*.alog")
         if files and len(files) > 0:
             outdir = self.ArtisanExistingDirectoryDialog()
@@ -17698,28 +17940,28 @@ class ApplicationWindow(QMainWindow):
             progress.setAutoClose(True)
             progress.show()
             i = 1
-            flag_temp = aw.qmc.roastpropertiesflag
             for f in files:
                 try:
                     progress.setValue(i)
                     QApplication.processEvents()
                     fname = u(QFileInfo(f).fileName())
-                    fconv = u(QDir(outdir).filePath(fname + u(".png")))
+                    fconv = u(QDir(outdir).filePath(fname))
                     if not os.path.exists(fconv):
-                        aw.qmc.reset(redraw=False,soundOn=False)
-                        self.setProfile(f,self.deserialize(f),quiet=True)
-                        self.qmc.redraw()
-                        self.image = aw.qmc.grab()
-                        self.image.save(fconv,"PNG")
+                        convertProfile(u(f),fconv,aw.qmc.binaryprofilescompression)
                     else:
-                        aw.sendmessage(QApplication.translate("Message","Target file {0} exists. {1} not converted.", None).format(fconv,fname + u(".png")))                        
-                except:
-                    pass
+                        aw.sendmessage(QApplication.translate("Message","Target file {0} exists. {1} not converted.", None).format(fconv,fname))
+                except Exception as ex:
+                    _, _, exc_tb = sys.exc_info()
+                    aw.qmc.adderror((QApplication.translate("Error Message", "Exception:",None) + " fileConvertBinary(): {0}").format(str(ex)),exc_tb.tb_lineno)
                 i += 1
-                aw.qmc.reset(soundOn=False)
-            aw.qmc.roastpropertiesflag = flag_temp
             progress.cancel()
             progress = None
+        
+    def fileConvertPilot(self):
+        self.fileConvert(".xml",self.exportPilot)
+
+    def fileConvertPNG(self):
+        self.fileConvertIMG(".png")
             
     def fileConvertSVG(self):
         self.fileConvertIMG(".svg")
@@ -17727,37 +17969,125 @@ class ApplicationWindow(QMainWindow):
     def fileConvertPDF(self):
         self.fileConvertIMG(".pdf")
     
+    # returns the chart settings used by the headless rendering of profiles (see artisanlib.render)
+    def chartRenderSettings(self):
+        labels = [QApplication.translate("Scope Annotation", "CHARGE", None),
+            QApplication.translate("Scope Annotation", "DRY END", None),
+            QApplication.translate("Scope Annotation", "FC START", None),
+            QApplication.translate("Scope Annotation", "FC END", None),
+            QApplication.translate("Scope Annotation", "SC START", None),
+            QApplication.translate("Scope Annotation", "SC END", None),
+            QApplication.translate("Scope Annotation", "DROP", None),
+            QApplication.translate("Scope Annotation", "COOL", None)]
+        return {
+            "size": tuple(self.qmc.fig.get_size_inches()),
+            "dpi": self.qmc.fig.dpi,
+            "palette": dict(self.qmc.palette),
+            "fontfamily": self.mpl_fontproperties.get_family(),
+            "mode": self.qmc.mode,
+            "xlabel": self.arabicReshape(QApplication.translate("Label", "min",None)),
+            "startofx": self.qmc.startofx,
+            "endofx": self.qmc.endofx,
+            "xgrid": (self.qmc.xgrid if self.qmc.xgrid else 60.),
+            "ylimit": self.qmc.ylimit,
+            "ylimit_min": self.qmc.ylimit_min,
+            "ygrid": self.qmc.ygrid,
+            "gridstyle": self.qmc.gridstyles[self.qmc.gridlinestyle],
+            "gridthickness": self.qmc.gridthickness,
+            "gridalpha": self.qmc.gridalpha,
+            "delta": bool(self.qmc.DeltaETflag or self.qmc.DeltaBTflag),
+            "delta_unit": "/min",
+            "zlimit": self.qmc.zlimit,
+            "zlimit_min": self.qmc.zlimit_min,
+            "zgrid": self.qmc.zgrid,
+            "deltasamples": max(1,self.qmc.deltasamples),
+            "ETcurve": self.qmc.ETcurve,
+            "BTcurve": self.qmc.BTcurve,
+            "DeltaETflag": self.qmc.DeltaETflag,
+            "DeltaBTflag": self.qmc.DeltaBTflag,
+            "ETlinewidth": self.qmc.ETlinewidth,
+            "ETlinestyle": self.qmc.ETlinestyle,
+            "BTlinewidth": self.qmc.BTlinewidth,
+            "BTlinestyle": self.qmc.BTlinestyle,
+            "ETdeltalinewidth": self.qmc.ETdeltalinewidth,
+            "ETdeltalinestyle": self.qmc.ETdeltalinestyle,
+            "BTdeltalinewidth": self.qmc.BTdeltalinewidth,
+            "BTdeltalinestyle": self.qmc.BTdeltalinestyle,
+            "extralinewidth": self.qmc.extra_linewidth_default,
+            "extralinewidths1": list(self.qmc.extralinewidths1),
+            "extralinewidths2": list(self.qmc.extralinewidths2),
+            "extralinestyles1": list(self.qmc.extralinestyles1),
+            "extralinestyles2": list(self.qmc.extralinestyles2),
+            "extraCurveVisibility1": list(self.extraCurveVisibility1),
+            "extraCurveVisibility2": list(self.extraCurveVisibility2),
+            "ETlabel": self.arabicReshape(QApplication.translate("Label", "ET", None)),
+            "BTlabel": self.arabicReshape(QApplication.translate("Label", "BT", None)),
+            "DeltaETlabel": self.arabicReshape(deltaLabelUTF8 + QApplication.translate("Label", "ET", None)),
+            "DeltaBTlabel": self.arabicReshape(deltaLabelUTF8 + QApplication.translate("Label", "BT", None)),
+            "eventlabels": [self.arabicReshape(l) for l in labels],
+            "LCDdecimalplaces": self.qmc.LCDdecimalplaces,
+            "legendloc": self.qmc.legendloc}
+
+    def toggleFastImageConversion(self):
+        self.fastImageConversion = not self.fastImageConversion
+        self.fastImageConversionAction.setChecked(self.fastImageConversion)
+
+    # renders the charts of the selected profiles into image files of the given format (.png, .svg or .pdf)
+    # by default each profile is loaded and its full chart is drawn by the GUI; with fastImageConversion a simplified
+    # chart is rendered by worker processes (see artisanlib.render) while the GUI stays responsive
     def fileConvertIMG(self,ext):
         files = self.ArtisanOpenFilesDialog(ext="*.alog")
         if files and len(files) > 0:
             outdir = self.ArtisanExistingDirectoryDialog()
-            progress = QProgressDialog(QApplication.translate("Message", "Converting...",None), None, 0, len(files), self)
-            progress.setCancelButton(None)
-            progress.setWindowModality(Qt.WindowModal)
-            progress.setAutoClose(True)
-            progress.show()
-            i = 1
-            flag_temp = aw.qmc.roastpropertiesflag
+            jobs = []
             for f in files:
-                try:
+                fname = u(QFileInfo(f).fileName())
+                fconv = u(QDir(outdir).filePath(fname + u(ext)))
+                if not os.path.exists(fconv):
+                    jobs.append((u(f),fconv))
+                else:
+                    aw.sendmessage(QApplication.translate("Message","Target file {0} exists. {1} not converted.", None).format(fconv,fname + u(ext)))
+            if jobs:
+                progress = QProgressDialog(QApplication.translate("Message", "Converting...",None), None, 0, len(jobs), self)
+                progress.setCancelButton(None)
+                progress.setWindowModality(Qt.WindowModal)
+                progress.setAutoClose(True)
+                progress.show()
+                def update(i):
                     progress.setValue(i)
                     QApplication.processEvents()
-                    fname = u(QFileInfo(f).fileName())
-                    fconv = u(QDir(outdir).filePath(fname + u(ext)))
-                    if not os.path.exists(fconv):
-                        aw.qmc.reset(redraw=False,soundOn=False)
-                        self.setProfile(f,self.deserialize(f),quiet=True)
-                        self.qmc.redraw()
-                        aw.qmc.fig.savefig(fconv,transparent=True,facecolor='none', edgecolor='none',frameon=True) # transparent=True is need to get the delta curves and legend drawn
+                try:
+                    if self.fastImageConversion:
+                        for fconv,error in renderProfiles(jobs,self.chartRenderSettings(),update):
+                            if error is not None:
+                                aw.qmc.adderror((QApplication.translate("Error Message", "Exception:",None) + " fileConvertIMG() {0}: {1}").format(fconv,error))
                     else:
-                        aw.sendmessage(QApplication.translate("Message","Target file {0} exists. {1} not converted.", None).format(fconv,fname + u(ext)))
-                except:
-                    pass
-                i += 1
-                aw.qmc.reset(soundOn=False)
-            aw.qmc.roastpropertiesflag = flag_temp
-            progress.cancel()
-            progress = None
+                        self.fileConvertIMGjobs(jobs,ext,update)
+                except Exception as ex:
+                    _, _, exc_tb = sys.exc_info()
+                    aw.qmc.adderror((QApplication.translate("Error Message", "Exception:",None) + " fileConvertIMG(): {0}").format(str(ex)),exc_tb.tb_lineno)
+                finally:
+                    progress.cancel()
+                    progress = None
+
+    # renders the given (profile file,target file) jobs by loading each profile and saving the chart drawn by redraw()
+    def fileConvertIMGjobs(self,jobs,ext,progress):
+        flag_temp = aw.qmc.roastpropertiesflag
+        for i,(f,fconv) in enumerate(jobs):
+            try:
+                aw.qmc.reset(redraw=False,soundOn=False)
+                self.setProfile(f,self.deserialize(f),quiet=True)
+                self.qmc.redraw()
+                if ext == ".png":
+                    self.image = aw.qmc.grab()
+                    self.image.save(fconv,"PNG")
+                else:
+                    aw.qmc.savefig(fconv,transparent=True,facecolor='none', edgecolor='none',frameon=True) # transparent=True is need to get the delta curves and legend drawn
+            except Exception as ex:
+                aw.qmc.adderror((QApplication.translate("Error Message", "Exception:",None) + " fileConvertIMG() {0}: {1}").format(fconv,str(ex)))
+            progress(i+1)
+        aw.qmc.reset(soundOn=False)
+        aw.qmc.roastpropertiesflag = flag_temp
         
     def fileConvertToFahrenheit(self):
         self.fileConverToTemp("F")
@@ -17765,37 +18095,69 @@ class ApplicationWindow(QMainWindow):
     def fileConvertToCelsius(self):
         self.fileConverToTemp("C")
         
+    # converts the temperatures of the selected profiles to the given unit t ("C" or "F")
+    # the profiles are converted as profile dicts without loading them (see artisanlib.units)
     def fileConverToTemp(self,t):
         files = self.ArtisanOpenFilesDialog(ext="*.alog")
         if files and len(files) > 0:
             outdir = self.ArtisanExistingDirectoryDialog()
-            progress = QProgressDialog(QApplication.translate("Message", "Converting...",None), None, 0, len(files), self)
-            progress.setCancelButton(None)
-            progress.setWindowModality(Qt.WindowModal)
-            progress.setAutoClose(True)
-            progress.show()
-            i = 1
-            flag_temp = aw.qmc.roastpropertiesflag
+            jobs = []
             for f in files:
-                try:
-                    progress.setValue(i)
-                    QApplication.processEvents()
-                    fname = u(QFileInfo(f).fileName())
-                    fconv = u(QDir(outdir).filePath(fname))
+                fname = u(QFileInfo(f).fileName())
+                fconv = u(QDir(outdir).filePath(fname))
+                if not os.path.exists(fconv):
+                    jobs.append((u(f),fconv))
+                else:
+                    aw.sendmessage(QApplication.translate("Message","Target file {0} exists. {1} not converted.", None).format(fconv,fname))
+            self.convertProfileFilesToTemp(jobs,t)
+
+    def folderConvertToFahrenheit(self):
+        self.folderConvertToTemp("F")
+
+    def folderConvertToCelsius(self):
+        self.folderConvertToTemp("C")
+
+    # converts the temperatures of all profiles of a folder and its subfolders to the given unit t ("C" or "F")
+    # the converted profiles are written to the same relative paths within the target folder
+    def folderConvertToTemp(self,t):
+        source = self.ArtisanExistingDirectoryDialog(msg=QApplication.translate("Message","Select Source Directory",None))
+        if source:
+            outdir = self.ArtisanExistingDirectoryDialog(msg=QApplication.translate("Message","Select Target Directory",None))
+            if outdir:
+                jobs = []
+                for f in profileFiles(source):
+                    fname = os.path.relpath(f,source)
+                    fconv = os.path.join(outdir,fname)
                     if not os.path.exists(fconv):
-                        aw.qmc.reset(redraw=False,soundOn=False)
-                        self.setProfile(f,self.deserialize(f),quiet=True)
-                        aw.qmc.convertTemperature(t,True)
-                        aw.fileSave(fconv)
+                        jobs.append((f,fconv))
                     else:
                         aw.sendmessage(QApplication.translate("Message","Target file {0} exists. {1} not converted.", None).format(fconv,fname))
-                except:
-                    pass
-                i += 1
-                aw.qmc.reset(soundOn=False)
-            aw.qmc.roastpropertiesflag = flag_temp
-            progress.cancel()
-            progress = None
+                for folder in sorted(set(os.path.dirname(fconv) for _,fconv in jobs)):
+                    if not os.path.isdir(folder):
+                        os.makedirs(folder)
+                self.convertProfileFilesToTemp(jobs,t)
+
+    # converts the given (profile file,target file) jobs to the given unit t, using worker processes for larger batches
+    def convertProfileFilesToTemp(self,jobs,t):
+        if jobs:
+            progress = QProgressDialog(QApplication.translate("Message", "Converting...",None), None, 0, len(jobs), self)
+            progress.setCancelButton(None)
+            progress.setWindowModality(Qt.WindowModal)
+            progress.setAutoClose(True)
+            progress.show()
+            def update(i):
+                progress.setValue(i)
+                QApplication.processEvents()
+            try:
+                for fconv,error in convertProfileFiles(jobs,t,aw.qmc.binaryprofiles,aw.qmc.binaryprofilescompression,update):
+                    if error is not None:
+                        aw.qmc.adderror((QApplication.translate("Error Message", "Exception:",None) + " convertProfileFilesToTemp() {0}: {1}").format(fconv,error))
+            except Exception as ex:
+                _, _, exc_tb = sys.exc_info()
+                aw.qmc.adderror((QApplication.translate("Error Message", "Exception:",None) + " convertProfileFilesToTemp(): {0}").format(str(ex)),exc_tb.tb_lineno)
+            finally:
+                progress.cancel()
+                progress = None
 
     def fileImport(self,msg,loader,reset=False):
         try:
@@ -17871,6 +18233,8 @@ class ApplicationWindow(QMainWindow):
                 self.qmc.phidget1048_changeTriggers = [aw.float2float(toFloat(x)) for x in toList(settings.value("phidget1048_changeTriggers",self.qmc.phidget1048_changeTriggers))]
             if settings.contains("phidget1048_dataRate"):
                 self.qmc.phidget1048_dataRate = toInt(settings.value("phidget1048_dataRate",self.qmc.phidget1048_dataRate))
+            if settings.contains("phidgetAsyncAggregation"):
+                self.qmc.phidgetAsyncAggregation = toInt(settings.value("phidgetAsyncAggregation",self.qmc.phidgetAsyncAggregation))
             if settings.contains("phidget1046_gain"):
                 self.qmc.phidget1046_gain = [toInt(x) for x in toList(settings.value("phidget1046_gain",self.qmc.phidget1046_gain))]
             if settings.contains("phidget1046_formula"):
@@ -18045,6 +18409,21 @@ class ApplicationWindow(QMainWindow):
             if settings.contains("Oversampling"):
                 self.qmc.oversampling = bool(toBool(settings.value("Oversampling",self.qmc.oversampling)))
                 aw.oversamplingAction.setChecked(aw.qmc.oversampling)
+            if settings.contains("OversamplingReads"):
+                self.qmc.oversampling_reads = max(2,toInt(settings.value("OversamplingReads",self.qmc.oversampling_reads)))
+            if settings.contains("OversamplingAggregation"):
+                self.qmc.oversampling_aggregation = toInt(settings.value("OversamplingAggregation",self.qmc.oversampling_aggregation))
+            if settings.contains("OversamplingExtra"):
+                self.qmc.oversampling_extra = bool(toBool(settings.value("OversamplingExtra",self.qmc.oversampling_extra)))
+            # restore parallel sampling
+            if settings.contains("ParallelSampling"):
+                self.qmc.parallel_sampling = bool(toBool(settings.value("ParallelSampling",self.qmc.parallel_sampling)))
+                self.qmc.parallel_sampling_deadline = toInt(settings.value("ParallelSamplingDeadline",int(self.qmc.parallel_sampling_deadline)))
+                aw.parallelSamplingAction.setChecked(aw.qmc.parallel_sampling)
+            # restore the image conversion mode
+            if settings.contains("FastImageConversion"):
+                self.fastImageConversion = bool(toBool(settings.value("FastImageConversion",self.fastImageConversion)))
+                self.fastImageConversionAction.setChecked(self.fastImageConversion)
             # restore extra event sampling interval
             if settings.contains("ExtraEventSamplingDelay"):
                 self.qmc.extra_event_sampling_delay = toInt(settings.value("ExtraEventSamplingDelay",int(self.qmc.extra_event_sampling_delay)))
@@ -18692,10 +19071,10 @@ class ApplicationWindow(QMainWindow):
                 self.qmc.extratimex.append([])
                 self.qmc.extrastemp1.append([])
                 self.qmc.extrastemp2.append([])
-                self.qmc.extractimex1.append([])
-                self.qmc.extractimex2.append([])
-                self.qmc.extractemp1.append([])
-                self.qmc.extractemp2.append([])
+                self.qmc.extractimex1.append(ProfileColumn())
+                self.qmc.extractimex2.append(ProfileColumn())
+                self.qmc.extractemp1.append(ProfileColumn())
+                self.qmc.extractemp2.append(ProfileColumn())
             #extra LCDs
             self.updateLCDproperties()
             # set extraLCD colors
@@ -18712,6 +19091,9 @@ class ApplicationWindow(QMainWindow):
                 self.extrastopbits = [toInt(x) for x in toList(settings.value("extrastopbits",self.extrastopbits))]
                 self.extratimeout = [aw.float2float(toFloat(x)) for x in toList(settings.value("extratimeout",self.extratimeout))]
                 lenextraports = len(self.extracomport)
+                for ser in self.extraser:
+                    if ser is not None:
+                        ser.releaseport()
                 self.extraser = [None]*lenextraports
                 #populate aw.extraser
                 for i in range(lenextraports):
@@ -18825,6 +19207,9 @@ class ApplicationWindow(QMainWindow):
                 self.qmc.autosaveflag = toInt(settings.value("autosaveflag",self.qmc.autosaveflag))
             if settings.contains("autosavepdf"):
                 self.qmc.autosavepdf = bool(toBool(settings.value("autosavepdf",self.qmc.autosavepdf)))
+            if settings.contains("binaryprofiles"):
+                self.qmc.binaryprofiles = bool(toBool(settings.value("binaryprofiles",self.qmc.binaryprofiles)))
+                self.qmc.binaryprofilescompression = bool(toBool(settings.value("binaryprofilescompression",self.qmc.binaryprofilescompression)))
             if settings.contains("autosaveprefix"):
                 self.qmc.autosaveprefix = toString(settings.value("autosaveprefix",self.qmc.autosaveprefix))
             # WebLCDs            
@@ -19286,6 +19671,7 @@ class ApplicationWindow(QMainWindow):
             settings.setValue("phidget1048_async",self.qmc.phidget1048_async)
             settings.setValue("phidget1048_changeTriggers",self.qmc.phidget1048_changeTriggers)
             settings.setValue("phidget1048_dataRate",self.qmc.phidget1048_dataRate)
+            settings.setValue("phidgetAsyncAggregation",self.qmc.phidgetAsyncAggregation)
             settings.setValue("phidget1046_async",self.qmc.phidget1046_async)
             settings.setValue("phidget1046_gain",self.qmc.phidget1046_gain)
             settings.setValue("phidget1046_formula",self.qmc.phidget1046_formula)
@@ -19387,6 +19773,14 @@ class ApplicationWindow(QMainWindow):
             settings.setValue("Delay",self.qmc.delay)
             # save oversampling
             settings.setValue("Oversampling",self.qmc.oversampling)
+            settings.setValue("OversamplingReads",self.qmc.oversampling_reads)
+            settings.setValue("OversamplingAggregation",self.qmc.oversampling_aggregation)
+            settings.setValue("OversamplingExtra",self.qmc.oversampling_extra)
+            # save parallel sampling
+            settings.setValue("ParallelSampling",self.qmc.parallel_sampling)
+            settings.setValue("ParallelSamplingDeadline",self.qmc.parallel_sampling_deadline)
+            # save the image conversion mode
+            settings.setValue("FastImageConversion",self.fastImageConversion)
             # save extra event sampling interval
             settings.setValue("ExtraEventSamplingDelay",self.qmc.extra_event_sampling_delay)
             #save colors
@@ -19781,6 +20175,8 @@ class ApplicationWindow(QMainWindow):
             settings.endGroup()
             settings.setValue("autosaveflag",self.qmc.autosaveflag)
             settings.setValue("autosavepdf",self.qmc.autosavepdf)
+            settings.setValue("binaryprofiles",self.qmc.binaryprofiles)
+            settings.setValue("binaryprofilescompression",self.qmc.binaryprofilescompression)
             settings.setValue("autosaveprefix",self.qmc.autosaveprefix)
             settings.beginGroup("WebLCDs")
             settings.setValue("active",self.WebLCDs)
@@ -20294,78 +20690,17 @@ class ApplicationWindow(QMainWindow):
             loss_num = '{0:.2f}'.format(ds["weight_loss_num"]),
         )
         
-    # extracts the following from a give profile dict in a new dict:
-    #  . "batchprefix": string
-    #  . "batchnr": int
-    #  . "title": string
-    #  . "roastdate": QDateTime
-    #  . "beans": string
-    #  . "weight": [<weight-in>:float,<weight-out>:float,<units>: string] or None
+    # see artisanlib.reports.profileProductionData()
     def profileProductionData(self,profile):
-        res = {}
-        # id ("prefix+nr (sequence)")
-        if "roastbatchprefix" in profile:
-            res["batchprefix"] = d(profile["roastbatchprefix"])
-        else:
-            res["batchprefix"] = ""
-        # batch number
-        if "roastbatchnr" in profile:
-            res["batchnr"] = int(profile["roastbatchnr"])
-        else:
-            res["batchnr"] = 0
-        # title
-        if "title" in profile:
-            res["title"] = d(profile["title"])
-        else:
-            res["title"] = ""
-        # date and time
-        res["roastdate"] = None
-        if "roastdate" in profile:
-            try:
-                date = QDate.fromString(d(profile["roastdate"]))
-                if "roasttime" in profile:
-                    try:
-                        time = QTime.fromString(d(profile["roasttime"]))
-                        res["roastdate"] = QDateTime(date,time)
-                    except Exception:
-                        res["roastdate"] = QDateTime(date)
-                else:
-                    res["roastdate"] = QDateTime(date)
-            except Exception:
-                pass
-        if "roastisodate" in profile:
-            try:
-                date = QDate.fromString(d(profile["roastisodate"]), Qt.ISODate)
-                if "roasttime" in profile:
-                    try:
-                        time = QTime.fromString(d(profile["roasttime"]))
-                        res["roastdate"] = QDateTime(date,time)
-                    except Exception:
-                        res["roastdate"] = QDateTime(date)
-                else:
-                    res["roastdate"] = QDateTime(date)
-            except Exception:
-                pass
-        # beans
-        if "beans" in profile:
-            res["beans"] = d(profile["beans"])
-        else:
-            res["beans"] = ""
-        # weight
-        if "weight" in profile:
-            res["weight"] = [profile["weight"][0],profile["weight"][1],d(profile["weight"][2])]
-        return res
+        return profileProductionData(profile)
 
     def productionReport(self):
         # get profile filenames
         files = self.reportFiles()
         try:
             if files and len(files) > 0:
-                profiles = [self.deserialize(f) for f in files]
-                # let's sort by isodate
-                profiles = sorted(profiles, 
-                    key=lambda p: (QDateTime(QDate.fromString(p["roastisodate"], Qt.ISODate),QTime.fromString(p["roasttime"])).toMSecsSinceEpoch()
-                         if "roastisodate" in p and "roasttime" in p else 0))
+                # report entries sorted by isodate
+                profiles = self.reportEntries(files)
                 with open(u(self.getResourcePath() + 'report-template.htm'), 'r') as myfile:
                     HTML_REPORT_TEMPLATE=myfile.read()
                 entries = ""
@@ -20375,7 +20710,7 @@ class ApplicationWindow(QMainWindow):
                 # collect data
                 c = 1
                 for p in profiles:
-                    d = self.profileProductionData(p)
+                    d = p["production"]
                     last_unit = d["weight"][2]
                     total_in += aw.convertWeight(d["weight"][0],aw.qmc.weight_units.index(last_unit),aw.qmc.weight_units.index(unit))
                     total_out += aw.convertWeight(d["weight"][1],aw.qmc.weight_units.index(last_unit),aw.qmc.weight_units.index(unit))
@@ -20447,7 +20782,7 @@ class ApplicationWindow(QMainWindow):
                     c = 1
                     for p in profiles:
                         try:
-                            d = self.productionData2string(self.profileProductionData(self.deserialize(p)),units=False)
+                            d = self.productionData2string(self.profileProductionData(self.deserializeMetadata(p)),units=False)
                             writer.writerow([
                                 s2a(d["id"]),
                                 s2a(d["time"]),
@@ -20461,6 +20796,7 @@ class ApplicationWindow(QMainWindow):
                             pass
                     # close file
                     outfile.close()
+                    self.saveProfileMetadataCache()
                 except:
                     pass
                     
@@ -20512,7 +20848,7 @@ class ApplicationWindow(QMainWindow):
                     c = 1
                     for p in profiles:
                         try:
-                            raw_data = self.profileProductionData(self.deserialize(p))
+                            raw_data = self.profileProductionData(self.deserializeMetadata(p))
                             c += 1
                             d = self.productionData2string(raw_data,units=False)
                             ws['A{0}'.format(c)] = d["id"]
@@ -20550,6 +20886,7 @@ class ApplicationWindow(QMainWindow):
                         ws['G{0}'.format(c+1)].font = bf 
                         ws['G{0}'.format(c+1)].number_format = '0.0%'
                     wb.save(filename)
+                    self.saveProfileMetadataCache()
                     aw.sendmessage(QApplication.translate("Message","Excel Production Report exported to {0}", None).format(filename))
                 except Exception as e:
 #                    import traceback
@@ -20561,84 +20898,9 @@ class ApplicationWindow(QMainWindow):
 
                     
                     
-    # extracts the following from a give profile dict in a new dict:
-    #  . "temp_unit": string (temperature unit, F or C)
-    #  . "timex" : [] array of sample times
-    #  . "temp2" : [] array of temperatures
-    #  . "charge_temp": int
-    #  . "FCs_time": int (in seconds)
-    #  . "FCs_temp": string
-    #  . "DROP_time": int (in seconds)
-    #  . "DROP_temp": string
-    #  . "DRY_percent": float (first phase percentage)
-    #  . "MAI_percent": float (second phase percentage)
-    #  . "DEV_percent": float (third phase percentage)
-    #  . "DRY_time": int (in seconds) 
-    #  . "MAI_time": int (in seconds) 
-    #  . "DEV_time": int (in seconds) 
-    #  . "AUC": int
-    #  . "color": int
-    #  . "cup": int
+    # see artisanlib.reports.profileRankingData()
     def profileRankingData(self,profile):
-        res = {}
-        # temp_unit
-        res["temp_unit"] = profile["mode"]
-        timex = profile["timex"]
-        res["timex"] = timex
-        timeindex = profile["timeindex"]
-        res["charge_idx"] = (timeindex[0] if timeindex[0] > -1 else 0)
-        res["drop_idx"] = (timeindex[6] if timeindex[6] > 0 else len(timex))
-        bt = profile["temp2"]        
-        res["temp"] = bt
-        # charge_temp
-        if timeindex[0] > -1:
-            start = timex[timeindex[0]]
-            res["charge_temp"] = bt[timeindex[0]]
-        else:
-            start = 0
-        if timeindex[2] > 0:
-            # FCs_time
-            res["FCs_time"] = timex[timeindex[2]] - start
-            # FCs_temp
-            res["FCs_temp"] = bt[timeindex[2]]
-        if timeindex[6] > 0:
-            # DROP_time
-            res["DROP_time"] = timex[timeindex[6]] - start
-            # DROP_temp
-            res["DROP_temp"] = bt[timeindex[6]]
-        total_time = (timex[timeindex[6]] - start)
-        # DRY_time
-        if timeindex[1] > 0:
-            # DRY_time
-            dry_time = timex[timeindex[1]] - start
-            # DRY_percent
-            res["DRY_percent"] = (dry_time/total_time) * 100.
-            res["DRY_time"] = dry_time
-        # MAI_time
-        if timeindex[1] > 0 and timeindex[2] > 0:
-            # MAI_time
-            mai_time = timex[timeindex[2]] - timex[timeindex[1]]
-            # MAI_percent
-            res["MAI_percent"] = (mai_time/total_time) * 100.
-            res["MAI_time"] = mai_time
-        if timeindex[2] > 0 and timeindex[6] > 0:
-            # DEV_time
-            dev_time = timex[timeindex[6]] - timex[timeindex[2]]
-            # DEV_percent
-            res["DEV_percent"] = (dev_time/total_time) * 100.
-            res["DEV_time"] = dev_time
-        # AUC
-        if "computed" in profile:
-            comp = profile["computed"]
-            if "AUC" in comp:
-                res["AUC"] = comp["AUC"]
-        # color
-        if "ground_color" in profile:
-            res["color"] = profile["ground_color"]
-        # cup
-        if "flavors" in profile:
-            res["cupping"] = self.cuppingSum(profile["flavors"])
-        return res
+        return profileRankingData(profile)
         
         
     # takes ranking data generated by profileRankingData(profile) and extracts the following as keyed string values in a dict:
@@ -20763,11 +21025,8 @@ class ApplicationWindow(QMainWindow):
         # get profile filenames
         files = self.reportFiles()
         if files and len(files) > 0:
-            profiles = [self.deserialize(f) for f in files]
-            # let's sort by isodate
-            profiles = sorted(profiles, 
-                key=lambda p: (QDateTime(QDate.fromString(p["roastisodate"], Qt.ISODate),QTime.fromString(p["roasttime"])).toMSecsSinceEpoch()
-                     if "roastisodate" in p and "roasttime" in p else 0))
+            # report entries sorted by isodate, with the AUC recomputed with the actual settings
+            profiles = self.reportEntries(files,ranking=True,AUCsettings=(aw.qmc.mode,aw.qmc.AUCbegin,aw.qmc.AUCbaseFlag,aw.qmc.AUCbase))
             with open(u(self.getResourcePath() + 'ranking-template.htm'), 'r') as myfile:
                 HTML_REPORT_TEMPLATE=myfile.read()
             entries = ""
@@ -20789,7 +21048,7 @@ class ApplicationWindow(QMainWindow):
             MAI_percent_count = 0
             DEV_percent = 0
             DEV_percent_count = 0
-            AUC = 0
+            auc_value = 0
             AUC_count = 0
             loss = 0
             loss_count = 0   
@@ -20814,19 +21073,15 @@ class ApplicationWindow(QMainWindow):
             max_drop_time = 0
             label_chr_nr = 0
             for p in profiles:
-                pd = self.profileProductionData(p)
+                pd = dict(p["production"]) # copied as the batch labels are modified below
                 c += 1
                 try:
                     cl = next(color) # here to keep colors in sync with the pct graph colors
                 except Exception as e:
                     pass
-                try:
-                    rd = self.profileRankingData(p)
-                except Exception as e:
-#                        import traceback
-#                        traceback.print_exc(file=sys.stdout)
-                    _, _, exc_tb = sys.exc_info()
-                    aw.qmc.adderror((QApplication.translate("Error Message","Exception (probably due to an empty profile):",None) + " rankingReport() {0}").format(str(e)),exc_tb.tb_lineno)
+                rd = p["ranking"]
+                if rd is None:
+                    aw.qmc.adderror((QApplication.translate("Error Message","Exception (probably due to an empty profile):",None) + " rankingReport() {0}").format(p["error"]))
                     continue
                 i = aw.convertWeight(pd["weight"][0],aw.qmc.weight_units.index(pd["weight"][2]),aw.qmc.weight_units.index(aw.qmc.weight[2]))
                 o = aw.convertWeight(pd["weight"][1],aw.qmc.weight_units.index(pd["weight"][2]),aw.qmc.weight_units.index(aw.qmc.weight[2]))
@@ -20859,26 +21114,8 @@ class ApplicationWindow(QMainWindow):
                 if "DEV_percent" in rd:
                     DEV_percent += rd["DEV_percent"]
                     DEV_percent_count += 1
-                # -- recompute AUC with actual settings
-                try:
-                    AUCidx = max(0,aw.AUCstartidx(p["timeindex"],p["computed"]["TP_time"]))
-                    if aw.qmc.AUCbaseFlag:
-                        # we take the base temperature from the BT at st
-                        rtbt = p["temp2"][AUCidx]
-                    else:
-                        rtbt = aw.qmc.AUCbase
-                    rtbt = aw.qmc.convertTemp(rtbt,aw.qmc.mode,"C")
-                    ed = min(len(p["timex"]),p["timeindex"][6])
-                    BT_AUC = 0
-                    for i in range(AUCidx,ed):
-                        BT_AUC += self.calcAUC(rtbt,p["timex"],p["temp2"],i)
-                    BT_AUC = int(round(BT_AUC/60.))
-                    rd["AUC"] = BT_AUC
-                except:
-                    pass
-                # -- 
                 if "AUC" in rd:
-                    AUC += rd["AUC"]
+                    auc_value += rd["AUC"]
                     AUC_count += 1
                     
                 if i > 0 and o > 0:
@@ -20915,7 +21152,7 @@ class ApplicationWindow(QMainWindow):
                         charge = max(0,rd["charge_idx"]) # start of visible data
                         drop = rd["drop_idx"] # end of visible data
                         stemp = numpy.concatenate(([None]*charge,stemp[charge:drop],[None]*(len(timex)-drop)))
-                        timeindex = p["timeindex"]
+                        timeindex = rd["timeindex"]
                         if first_profile:
                         # align with CHARGE
                             delta = timex[rd["charge_idx"]]
@@ -21043,7 +21280,7 @@ class ApplicationWindow(QMainWindow):
                         os.remove(graph_image)
                     except OSError:
                         pass
-                    self.qmc.fig.savefig(graph_image)
+                    self.qmc.savefig(graph_image)
                         
                     #add some random number to force HTML reloading
                     graph_image = path2url(graph_image)
@@ -21111,16 +21348,11 @@ class ApplicationWindow(QMainWindow):
                     for p in profiles:
                         i -= 1
                         cl = next(color),'#00b950', '#ffb347', '#9f7960'
-                        try:
-                            rd = self.profileRankingData(p)
-                        except Exception as e:
-        #                        import traceback
-        #                        traceback.print_exc(file=sys.stdout)
-                            _, _, exc_tb = sys.exc_info()
-                            aw.qmc.adderror((QApplication.translate("Error Message","Exception (probably due to an empty profile):",None) + " rankingReport() {0}").format(str(e)),exc_tb.tb_lineno)
+                        rd = p["ranking"]
+                        if rd is None:
                             i += 1   #avoid a blank line
                             continue
-                        pd = self.profileProductionData(p)
+                        pd = p["production"]
                         label = ((u(pd["batchprefix"]) + u(pd["batchnr"])) if pd["batchnr"] > 0 else u(""))[:8]
                         if "DRY_percent" in rd and "MAI_percent" in rd and "DEV_percent" in rd:
                             ax.broken_barh( [ (0, m), 
@@ -21203,7 +21435,7 @@ class ApplicationWindow(QMainWindow):
                 DRY_percent_avg = ('{0:.1f}%'.format(DRY_percent / DRY_percent_count) if DRY_percent > 0 and DRY_percent_count > 0 else ""),
                 MAI_percent_avg = ('{0:.1f}%'.format(MAI_percent / MAI_percent_count) if MAI_percent > 0 and MAI_percent_count > 0 else ""),
                 DEV_percent_avg = ('{0:.1f}%'.format(DEV_percent / DEV_percent_count) if DEV_percent > 0 and DEV_percent_count > 0 else ""),
-                AUC_avg = ('{0:.0f}'.format(AUC / AUC_count) if AUC > 0 and AUC_count > 0 else ""),
+                AUC_avg = ('{0:.0f}'.format(auc_value / AUC_count) if auc_value > 0 and AUC_count > 0 else ""),
                 loss_avg = ('{0:.1f}'.format(loss / loss_count) + "%" if loss_count > 0 and loss > 0 else ""),
                 colors_avg = ("#" + '{0:.0f}'.format(colors / colors_count) if colors > 0 and colors_count > 0 else ""),
                 cup_avg = ('{0:.2f}'.format(cuppings / cuppings_count) if cuppings > 0 and cuppings_count > 0 else ""),
@@ -21254,9 +21486,10 @@ class ApplicationWindow(QMainWindow):
                     c = 1
                     for p in profiles:
                         try:
-                            pd = self.productionData2string(self.profileProductionData(self.deserialize(p)),units=False)
+                            profile = self.deserializeMetadata(p)
+                            pd = self.productionData2string(self.profileProductionData(profile),units=False)
                             c += 1
-                            dct = self.profileRankingData(self.deserialize(p))
+                            dct = self.profileRankingData(profile)
                             rd = self.rankingData2string(dct,units=False)
                             writer.writerow([
                                 s2a(pd["id"]),
@@ -21282,6 +21515,7 @@ class ApplicationWindow(QMainWindow):
                             pass
                     # close file
                     outfile.close()
+                    self.saveProfileMetadataCache()
                 except Exception as e:
                     pass
                     
@@ -21347,9 +21581,10 @@ class ApplicationWindow(QMainWindow):
                     c = 1
                     for p in profiles:
                         try:
-                            raw_data = self.profileProductionData(self.deserialize(p))
+                            profile = self.deserializeMetadata(p)
+                            raw_data = self.profileProductionData(profile)
                             c += 1
-                            rd = self.profileRankingData(self.deserialize(p))
+                            rd = self.profileRankingData(profile)
                             d = self.productionData2string(raw_data,units=False)
                             
                             if "id" in d:
@@ -21462,6 +21697,7 @@ class ApplicationWindow(QMainWindow):
                         ws['P{0}'.format(c+1)].number_format = "0.00"                                      
                     # close file
                     wb.save(filename)
+                    self.saveProfileMetadataCache()
                     aw.sendmessage(QApplication.translate("Message","Excel Ranking Report exported to {0}", None).format(filename))
                 except Exception as e:
 #                    import traceback
@@ -21504,7 +21740,7 @@ class ApplicationWindow(QMainWindow):
                 os.remove(graph_image)
             except OSError:
                 pass
-            self.qmc.fig.savefig(graph_image)
+            self.qmc.savefig(graph_image)
             #add some random number to force HTML reloading
             graph_image = path2url(graph_image)
             graph_image = graph_image + "?dummy=" + str(int(libtime.time()))
@@ -21516,7 +21752,7 @@ class ApplicationWindow(QMainWindow):
                 os.remove(flavor_image)
             except OSError:
                 pass
-            self.qmc.fig.savefig(flavor_image)
+            self.qmc.savefig(flavor_image)
             flavor_image = path2url(flavor_image)
             flavor_image = flavor_image + "?dummy=" + str(int(libtime.time()))
             #return screen to GRAPH profile mode
@@ -21736,13 +21972,7 @@ class ApplicationWindow(QMainWindow):
             return u("")
 
     def cuppingSum(self,flavors):
-        score = 0.
-        nflavors = len(flavors)
-        for i in range(nflavors):   
-            score += flavors[i]
-        score /= (nflavors)
-        score *= 10.
-        return score
+        return cuppingSum(flavors)
 
     def volume_weight2html(self,amount,out,unit,change):
         if amount:
@@ -22103,18 +22333,9 @@ class ApplicationWindow(QMainWindow):
                                     aw.qmc.l_AUCguide.set_data([],[])
     
     def AUCstartidx(self,timeindex,TPindex):
-        if aw.qmc.AUCbegin == 0 and timeindex[0] > -1: # start after CHARGE
-            idx = timeindex[0]
-        elif aw.qmc.AUCbegin == 1 and TPindex: # start ater TP
-            idx = TPindex
-        elif aw.qmc.AUCbegin == 2 and timeindex[1] > 0: # DRY END
-            idx = timeindex[1]
-        elif aw.qmc.AUCbegin == 3 and timeindex[2] > 0: # FC START
-            idx = timeindex[2]
-        else:
-            idx = -1
-        return idx
+        return AUCstartidx(aw.qmc.AUCbegin,timeindex,TPindex)
 
+    # returns the AUC added by the readings since the last call
     def thisAUC(self,idx,timex,temp,mode):
         if aw.qmc.AUCbaseFlag:
             # we take the base temperature from the BT at st
@@ -22122,7 +22343,7 @@ class ApplicationWindow(QMainWindow):
         else:
             tbase = aw.qmc.AUCbase
         tbase = aw.qmc.convertTemp(tbase,mode,"C")
-        return self.calcAUC(tbase,timex,temp)/60.
+        return aw.qmc.AUCaccumulator.update(idx,tbase,timex,temp,mode)/60.
 
     # updates the running AUC variables aw.qmc.AUCvalue and aw.qmc.AUCsinceFCs during recording
     def updateAUC(self):
@@ -22137,6 +22358,7 @@ class ApplicationWindow(QMainWindow):
         else:
             aw.qmc.AUCvalue = 0
             aw.qmc.AUCsinceFCs = 0
+            aw.qmc.AUCaccumulator.reset()
 
     # calculates the area underneath the temp curve between the last two measurements
     #  base: the base temperature in C
@@ -22233,10 +22455,7 @@ class ApplicationWindow(QMainWindow):
                 rtet = aw.qmc.convertTemp(rtet,aw.qmc.mode,"C")
                 rtbt = aw.qmc.convertTemp(rtbt,aw.qmc.mode,"C")
 
-                for i in range(st,ed):
-                    ET += self.calcAUC(rtet,timex,temp1,i)
-                    BT += self.calcAUC(rtbt,timex,temp2,i)
-                    delta += self.calcAUC(rtbt,timex,temp1,i,temp2)
+                delta, ET, BT = AUCs(rtet,rtbt,timex,temp1,temp2,aw.qmc.mode,st,ed)
             except Exception as e:
 #                import traceback
 #                traceback.print_exc(file=sys.stdout)
@@ -22409,6 +22628,21 @@ class ApplicationWindow(QMainWindow):
             QMessageBox.warning(aw,QApplication.translate("Message", "Warning",None),QApplication.translate("Message", 
             "Oversampling is only active with a sampling interval equal or larger than 3s.",None))
 
+    def parallelsampling(self):
+        if aw.qmc.parallel_sampling:
+            aw.qmc.parallel_sampling = False
+        else:
+            # ask for the per round deadline; 0 uses the full sampling interval
+            deadline, ok = QInputDialog.getDouble(self,
+                    QApplication.translate("Message", "Parallel Sampling",None),
+                    QApplication.translate("Message", "Deadline (seconds, 0 = sampling interval)",None),
+                    aw.qmc.parallel_sampling_deadline/1000.,
+                    0.,30.)
+            if ok:
+                aw.qmc.parallel_sampling_deadline = int(deadline*1000.)
+                aw.qmc.parallel_sampling = True
+        aw.parallelSamplingAction.setChecked(aw.qmc.parallel_sampling)
+
 
     def calibratedelay(self):
         secondsdelay, ok = QInputDialog.getDouble(self,
@@ -22998,6 +23232,7 @@ class ApplicationWindow(QMainWindow):
         self.qmc.roastbatchprefixB = u("")
         self.qmc.roastbatchposB = 1
         self.qmc.temp1B, self.qmc.temp2B, self.qmc.temp1BX, self.qmc.temp2BX, self.qmc.timeB = [],[],[],[],[]
+        self.qmc.timeBIndex.invalidate()
         self.qmc.stemp1B,self.qmc.stemp2B,self.qmc.stemp1BX,self.qmc.stemp2BX = [],[],[],[] # smoothed versions of the background courves
         self.qmc.extraname1B,self.qmc.extraname2B = [],[]
         self.qmc.backgroundEvents, self.qmc.backgroundEtypes = [],[]
@@ -23732,7 +23967,7 @@ class ApplicationWindow(QMainWindow):
             if filename:
                 if extension not in filename:
                     filename += extension
-                aw.qmc.fig.savefig(filename,transparent=(aw.qmc.palette["canvas"] is None or aw.qmc.palette["canvas"]=='None'),facecolor=str(aw.qmc.palette["canvas"]),edgecolor=None,frameon=True) # transparent=True is need to get the delta curves and legend drawn
+                aw.qmc.savefig(filename,transparent=(aw.qmc.palette["canvas"] is None or aw.qmc.palette["canvas"]=='None'),facecolor=str(aw.qmc.palette["canvas"]),edgecolor=None,frameon=True) # transparent=True is need to get the delta curves and legend drawn
                 aw.qmc.updateBackground() # that redraw is needed to avoid the "transparent flicker"
                                 
                 self.sendmessage(QApplication.translate("Message","{0} saved", None).format(str(filename)))
@@ -25366,6 +25601,7 @@ class HUDDlg(ArtisanDialog):
 
                     else:
                         aw.qmc.timeB = x_range[:]
+                        aw.qmc.timeBIndex.invalidate()
                         aw.qmc.temp1B = y_range[:]
                         aw.qmc.stemp1B = y_range[:] 
                         aw.qmc.temp2B = y_range2[:]               
@@ -28924,6 +29160,14 @@ class autosaveDlg(ArtisanDialog):
         self.autopdfcheckbox = QCheckBox()
         self.autopdfcheckbox.setToolTip(QApplication.translate("Tooltip", "Save PDF version alongside .alog profiles",None))
         self.autopdfcheckbox.setChecked(aw.qmc.autosavepdf)        
+        binarylabel = QLabel(QApplication.translate("CheckBox","Binary format", None))
+        self.binarycheckbox = QCheckBox()
+        self.binarycheckbox.setToolTip(QApplication.translate("Tooltip", "Save profiles in the fast loading binary format (not readable by older versions)",None))
+        self.binarycheckbox.setChecked(aw.qmc.binaryprofiles)
+        compressionlabel = QLabel(QApplication.translate("CheckBox","Compressed", None))
+        self.compressioncheckbox = QCheckBox()
+        self.compressioncheckbox.setToolTip(QApplication.translate("Tooltip", "Compress the readings of binary profiles",None))
+        self.compressioncheckbox.setChecked(aw.qmc.binaryprofilescompression)
         prefixlabel = QLabel()
         prefixlabel.setAlignment(Qt.Alignment(Qt.AlignBottom | Qt.AlignRight))
         prefixlabel.setText(u(QApplication.translate("Label", "Prefix",None)))
@@ -28950,6 +29194,10 @@ class autosaveDlg(ArtisanDialog):
         autolayout.addWidget(self.pathEdit,2,1)
         autolayout.addWidget(self.autopdfcheckbox,3,0,Qt.AlignRight)
         autolayout.addWidget(autopdflabel,3,1)
+        autolayout.addWidget(self.binarycheckbox,4,0,Qt.AlignRight)
+        autolayout.addWidget(binarylabel,4,1)
+        autolayout.addWidget(self.compressioncheckbox,5,0,Qt.AlignRight)
+        autolayout.addWidget(compressionlabel,5,1)
         mainLayout = QVBoxLayout()
         mainLayout.addLayout(autolayout)
         mainLayout.addStretch()
@@ -28972,6 +29220,8 @@ class autosaveDlg(ArtisanDialog):
             message = QApplication.translate("Message","Autosave OFF", None)
             aw.sendmessage(message)
         aw.qmc.autosavepdf = self.autopdfcheckbox.isChecked()
+        aw.qmc.binaryprofiles = self.binarycheckbox.isChecked()
+        aw.qmc.binaryprofilescompression = self.compressioncheckbox.isChecked()
         self.close()
 
 ##########################################################################
@@ -33703,17 +33953,14 @@ class serialport(object):
 
     def __init__(self):
         #default initial settings. They are changed by settingsload() at initiation of program acording to the device chosen
+        self._comport = None
         self.comport = "COM4"      #NOTE: this string should not be translated. It is an argument for lib Pyserial
         self.baudrate = 9600
         self.bytesize = 8
         self.parity= 'O'
         self.stopbits = 1
         self.timeout=1.0
-        #serial port for ET/BT
-        import serial  # @UnusedImport
-        self.SP = serial.Serial()
-        #used only in devices that also control the roaster like PIDs or arduino (possible to recieve asynchrous comands from GUI commands and thread sample()). 
-        self.COMsemaphore = QSemaphore(1) 
+        #the serial port object (self.SP) and its lock (self.COMsemaphore) are shared by all serialport objects on the same port, see serialmux
         #list of comm ports available after Scan
         self.commavailable = []
         ##### SPECIAL METER FLAGS ########
@@ -33721,17 +33968,21 @@ class serialport(object):
         #stores the Phidget 1048 TemperatureSensor object (None if not initialized)
         self.PhidgetTemperatureSensor = None # either None or a list containing one PhidgetTemperatureSensor() object per channel
         self.Phidget1048values = [-1]*4 # the values gathered by registered change triggers
+        self.Phidget1048accumulators = [ChannelAccumulator() for _ in range(4)] # the readings of the change triggers within the current sampling interval
         # list of (serial,port) tuples filled on attaching the corresponding main device and consumed on attaching the other channel pairs
         #stores the Phidget 1045 TemperatureSensor object (None if not initialized)
         self.PhidgetIRSensor = None
         self.PhidgetIRSensorIC = None
         self.Phidget1045value = -1
+        self.Phidget1045accumulator = ChannelAccumulator()
         #stores the Phidget BridgeSensor object (None if not initialized)
         self.PhidgetBridgeSensor = None
         self.Phidget1046values = [-1]*4 # the values gathered by registered change triggers
+        self.Phidget1046accumulators = [ChannelAccumulator() for _ in range(4)]
         #stores the Phidget IO object (None if not initialized)
         self.PhidgetIO = None
         self.PhidgetIOvalues = [-1]*8 # the values gathered by registered change triggers
+        self.PhidgetIOaccumulators = [ChannelAccumulator() for _ in range(8)]
         #stores the Phidget Digital Output PMW objects (None if not initialized)      
         self.PhidgetDigitalOut = None
         self.PhidgetDigitalOutLastPWM = [0]*4 # 0-100
@@ -33875,23 +34126,75 @@ class serialport(object):
         self.externaloutprogram = "out.py" # this program is called with arguments <ET>,<BT>,<ETB>,<BTB> values on each sampling
         self.externaloutprogramFlag = False # if true the externaloutprogram will be called on each sample()
 
+    #name of the serial port. On changing the port, this object is moved to the shared port of the new name and
+    #the previous shared port is closed if no other device communicates over it
+    @property
+    def comport(self):
+        return self._comport
+
+    @comport.setter
+    def comport(self,name):
+        if name != self._comport:
+            serialMultiplexer.acquire(name)
+            if self._comport is not None:
+                serialMultiplexer.release(self._comport)
+            self._comport = name
+
+    #releases the shared port of this object; to be called on discarding it
+    def releaseport(self):
+        if self._comport is not None:
+            serialMultiplexer.release(self._comport)
+            self._comport = None
+
+    #serial port for ET/BT, shared with all other devices communicating over the same physical port
+    @property
+    def SP(self):
+        return serialMultiplexer.port(self.comport).SP
+
+    #used only in devices that also control the roaster like PIDs or arduino (possible to recieve asynchrous comands from GUI commands and thread sample()).
+    #locks the port for all devices communicating over it
+    @property
+    def COMsemaphore(self):
+        return serialMultiplexer.port(self.comport).semaphore
+
 #####################  FUNCTIONS  ############################
     ######### functions used by Fuji PIDs
     def sendFUJIcommand(self,binstring,nbytes):
+        # replies to read requests (function codes 3 and 4) are shared within the sampling round with all devices on the same port,
+        # any other request invalidates them
+        if len(binstring) > 1 and o(binstring[1]) in [3,4]:
+            request = (binstring,nbytes)
+            r = serialMultiplexer.cachedReply(self.comport,request)
+            if r is not None:
+                return r
+        else:
+            request = None
+            serialMultiplexer.invalidate(self.comport)
+        r = "0"
         try:
             ###  lock resources ##
             self.COMsemaphore.acquire(1)
             if not self.SP.isOpen():
                 self.openport()
             if self.SP.isOpen():
+                port = serialMultiplexer.port(self.comport)
+                #this garantees a minimum of 35 miliseconds between the last reply and the next request on this port (for all Fujis)
+                wait = port.last_transaction + 0.035 - libtime.time()
+                if wait > 0:
+                    libtime.sleep(wait)
                 self.SP.flushInput()
                 self.SP.flushOutput()
                 self.SP.write(binstring)
                 #self.SP.flush()
-                libtime.sleep(.1)
-                r = self.SP.read(nbytes)
-                #serTX.close()
-                libtime.sleep(0.035)                     #this garantees a minimum of 35 miliseconds between readings (for all Fujis)
+                # read until the expected number of bytes is received, or the 5 bytes of an error reply (function code with bit 7 set)
+                # the read returns as soon as the bytes arrived and blocks at most for the port timeout
+                r = self.SP.read(min(3,nbytes))
+                if len(r) == 3:
+                    if o(r[1]) & 0x80:
+                        r += self.SP.read(2)
+                    else:
+                        r += self.SP.read(nbytes - 3)
+                port.last_transaction = libtime.time()
                 lenstring = len(r)
                 if lenstring:
                     # CHECK FOR RECEIVED ERROR CODES
@@ -33913,6 +34216,8 @@ class serialport(object):
                         crcRx =  hex2int(r[-1],r[-2])
                         crcCal1 = aw.fujipid.fujiCrc16(r[:-2])
                         if crcCal1 == crcRx:
+                            if request is not None:
+                                serialMultiplexer.storeReply(self.comport,request,r)
                             return r           #OK. Return r after it has been checked for errors
                         else:
                             aw.qmc.adderror(QApplication.translate("Error Message","CRC16 data corruption ERROR. TX does not match RX. Check wiring",None))
@@ -33938,15 +34243,26 @@ class serialport(object):
 
     #finds time, ET and BT when using Fuji PID. Updates sv (set value) LCD. Finds power duty cycle
     def fujitemperature(self):
+        # read the ET PV, the SV and the duty of the control PID and the BT PV in one batch,
+        # with one request per station if the words are consecutive
+        requests = [(self.controlETpid[0],self.controlETpid[1],"pv?"),
+                    (aw.ser.controlETpid[0],aw.ser.controlETpid[1],"sv?"),
+                    (aw.ser.controlETpid[0],aw.ser.controlETpid[1],"mv1")]
+        #if Fuji for BT is not None (0= PXG, 1 = PXR, 2 = None 3 = DTA)
+        if self.readBTpid[0] < 2 or self.readBTpid[0] == 4:
+            requests.append((self.readBTpid[0],self.readBTpid[1],"pv?"))
+        words = aw.fujipid.readstations(requests)
         #update ET SV LCD 6
-        aw.qmc.currentpidsv = aw.fujipid.readcurrentsv()
+        if words[1] != -1:
+            aw.qmc.currentpidsv = words[1]/10.
+        else:
+            aw.qmc.currentpidsv = -1
         #get time of temperature reading in seconds from start; .elapsed() returns miliseconds
         tx = aw.qmc.timeclock.elapsed()/1000.
-        # get the temperature for ET. aw.fujipid.gettemperature(unitID)
-        t1 = aw.fujipid.gettemperature(self.controlETpid[0],self.controlETpid[1])/10.  #Need to divide by 10 because using 1 decimal point in Fuji (ie. received 843 = 84.3)
-        #if Fuji for BT is not None (0= PXG, 1 = PXR, 2 = None 3 = DTA)
-        if self.readBTpid[0] < 2 or self.readBTpid[0] == 4:                    
-            t2 = aw.fujipid.gettemperature(self.readBTpid[0],self.readBTpid[1])/10.
+        # get the temperature for ET
+        t1 = words[0]/10.  #Need to divide by 10 because using 1 decimal point in Fuji (ie. received 843 = 84.3)
+        if self.readBTpid[0] < 2 or self.readBTpid[0] == 4:
+            t2 = words[3]/10.
         elif self.readBTpid[0] == 3:
             ### arguments to create command to READ TEMPERATURE
             unitID = self.readBTpid[1]
@@ -33960,7 +34276,7 @@ class serialport(object):
             t2 = -1
         #get current duty cycle and update LCD 7
         try:
-            dc = aw.fujipid.readdutycycle()
+            dc = aw.fujipid.word2duty(words[2])
             if dc != -1: # on wrong reading we just keep the previous one
                 aw.qmc.dutycycle = max(0,min(100,dc))
             aw.qmc.dutycycleTX = aw.qmc.timeclock.elapsed()/1000.
@@ -34023,6 +34339,13 @@ class serialport(object):
         return tx,t1,t2
 
     def sendDTAcommand(self,command):
+        # replies to read commands are shared within the sampling round with all devices on the same port
+        if command[4] == "3":
+            t1 = serialMultiplexer.cachedReply(self.comport,command)
+            if t1 is not None:
+                return t1
+        else:
+            serialMultiplexer.invalidate(self.comport)
         try:
             ###  lock resources ##
             self.COMsemaphore.acquire(1)
@@ -34049,6 +34372,7 @@ class serialport(object):
                         #CRCcalculated = aw.dtapid.DTACalcChecksum(r[1:11]) #bytes 1-10
                         #if CRCreceived == CRCcalculated:
                         t1 = float(int(r[7:11], 16))*0.1    #convert ascii string from bytes 8-11 (4 bytes) to a float
+                        serialMultiplexer.storeReply(self.comport,command,t1)
                         return t1
 ##                        else:
 ##                            aw.qmc.adderror(QApplication.translate("Error Message","DTAtemperature(): Data corruption. Check wiring",None))            
@@ -34355,19 +34679,24 @@ class serialport(object):
             self.R1 = AillioR1()
         tx = aw.qmc.timeclock.elapsed()/1000.
         try:
+            # all frames received since the last sample are decoded once and the readings taken from the latest
+            readings = self.R1.get_readings()
             if aw.qmc.batchcounter != -1:
-                aw.qmc.batchcounter = self.R1.get_roast_number()
-            aw.qmc.R1_BT = self.R1.get_bt()
-            aw.qmc.R1_DT = self.R1.get_dt()
-            aw.qmc.R1_DRUM = self.R1.get_drum() * 10
-            aw.qmc.R1_VOLTAGE = self.R1.get_voltage()
-            aw.qmc.R1_HEATER = self.R1.get_heater() * 10
-            aw.qmc.R1_FAN = self.R1.get_fan() * 10
-            aw.qmc.R1_BT_ROR = self.R1.get_bt_ror()
-            aw.qmc.R1_EXIT_TEMP = self.R1.get_exit_temperature()
-            aw.qmc.R1_STATE = self.R1.get_state()
+                aw.qmc.batchcounter = readings["roast_number"]
+            aw.qmc.R1_BT = readings["bt"]
+            aw.qmc.R1_DT = readings["dt"]
+            aw.qmc.R1_DRUM = readings["drum"] * 10
+            aw.qmc.R1_VOLTAGE = readings["voltage"]
+            aw.qmc.R1_HEATER = readings["heater"] * 10
+            aw.qmc.R1_FAN = readings["fan"] * 10
+            aw.qmc.R1_BT_ROR = readings["bt_ror"]
+            aw.qmc.R1_EXIT_TEMP = readings["exitt"]
+            aw.qmc.R1_STATE = readings["state"]
             aw.qmc.R1_TX = tx
-            newstate = self.R1.get_state_string()
+            if aw.seriallogflag:
+                stats = self.R1.get_frame_stats()
+                aw.addserial("R1 : frames = " + str(stats["frames"]) + " || invalid = " + str(stats["invalid"]) + " || dropped = " + str(stats["dropped"]) + " || latency = " + "{0:.3f}".format(stats["latency"]))
+            newstate = readings["state_str"]
             if newstate != aw.qmc.R1_STATE_STR:
                 aw.qmc.R1_STATE_STR = newstate
                 aw.sendmessage(QApplication.translate("Message", "R1 state: " + newstate, None))
@@ -34859,8 +35188,11 @@ class serialport(object):
 
     def HOTTOPtemperatures(self):
         try:
-            from artisanlib.hottop import getHottop
+            from artisanlib.hottop import getHottop, getHottopFrameStats
             BT, ET, heater, main_fan = getHottop()
+            if aw.seriallogflag:
+                stats = getHottopFrameStats()
+                aw.addserial("Hottop : frames = " + str(stats["frames"]) + " || lost = " + str(stats["lost"]) + " || errors = " + str(stats["errors"]) + " || latency = " + "{0:.3f}".format(stats["latency"]))
             aw.qmc.hottop_HEATER = heater
             aw.qmc.hottop_MAIN_FAN = main_fan
             aw.qmc.hottop_ET = ET
@@ -35015,10 +35347,8 @@ class serialport(object):
         res = []
         for i in range(mode*2,mode*2+2):
             if aw.s7.area[i]:
-                if aw.s7.type[i]:
-                    v = aw.s7.readFloat(aw.s7.area[i]-1,aw.s7.db_nr[i],aw.s7.start[i])
-                else:
-                    v = aw.s7.readInt(aw.s7.area[i]-1,aw.s7.db_nr[i],aw.s7.start[i])
+                # all configured channels are fetched by a few block reads on the first call per sample
+                v = aw.s7.readChannel(i)
                 v = self.processChannelData(v,aw.s7.div[i],("C" if aw.s7.mode[i]==1 else ("F" if aw.s7.mode[i]==2 else "")))         
                 res.append(v)
             else:
@@ -35028,84 +35358,14 @@ class serialport(object):
     #returns v1,v2 from a connected MODBUS device
     def MODBUSread(self):
         # slave, register
-        just_send = False
-        if aw.modbus.input1slave:
-            aw.modbus.sleepBetween() # we start with a sleep, as it could be that just a send command happend before the semaphore was catched
-            if aw.modbus.input1float:
-                res1 = aw.modbus.readFloat(aw.modbus.input1slave,aw.modbus.input1register,aw.modbus.input1code)
-            elif aw.modbus.input1bcd:
-                res1 = aw.modbus.readBCD(aw.modbus.input1slave,aw.modbus.input1register,aw.modbus.input1code)
-            else:
-                res1 = aw.modbus.readSingleRegister(aw.modbus.input1slave,aw.modbus.input1register,aw.modbus.input1code)
-            res1 = self.processChannelData(res1,aw.modbus.input1div,aw.modbus.input1mode)
-            just_send = True
-        else:
-            res1 = -1
-        if aw.modbus.input2slave:
-            if just_send:
-                aw.modbus.sleepBetween()
-            if aw.modbus.input2float:
-                res2 = aw.modbus.readFloat(aw.modbus.input2slave,aw.modbus.input2register,aw.modbus.input2code)
-            elif aw.modbus.input2bcd:
-                res2 = aw.modbus.readBCD(aw.modbus.input2slave,aw.modbus.input2register,aw.modbus.input2code)
-            else:
-                res2 = aw.modbus.readSingleRegister(aw.modbus.input2slave,aw.modbus.input2register,aw.modbus.input2code)
-            res2 = self.processChannelData(res2,aw.modbus.input2div,aw.modbus.input2mode)
-            just_send = True
-        else:
-            res2 = -1
-        if aw.modbus.input3slave:
-            if just_send:
-                aw.modbus.sleepBetween()
-            if aw.modbus.input3float:
-                res3 = aw.modbus.readFloat(aw.modbus.input3slave,aw.modbus.input3register,aw.modbus.input3code)
-            elif aw.modbus.input3bcd:
-                res3 = aw.modbus.readBCD(aw.modbus.input3slave,aw.modbus.input3register,aw.modbus.input3code)
-            else:
-                res3 = aw.modbus.readSingleRegister(aw.modbus.input3slave,aw.modbus.input3register,aw.modbus.input3code)
-            res3 = self.processChannelData(res3,aw.modbus.input3div,aw.modbus.input3mode)
-            just_send = True
-        else:
-            res3 = -1
-        if aw.modbus.input4slave:
-            if just_send:
-                aw.modbus.sleepBetween()
-            if aw.modbus.input4float:
-                res4 = aw.modbus.readFloat(aw.modbus.input4slave,aw.modbus.input4register,aw.modbus.input4code)
-            elif aw.modbus.input4bcd:
-                res4 = aw.modbus.readBCD(aw.modbus.input4slave,aw.modbus.input4register,aw.modbus.input4code)
-            else:
-                res4 = aw.modbus.readSingleRegister(aw.modbus.input4slave,aw.modbus.input4register,aw.modbus.input4code)
-            res4 = self.processChannelData(res4,aw.modbus.input4div,aw.modbus.input4mode)
-            just_send = True
-        else:
-            res4 = -1
-        if aw.modbus.input5slave:
-            if just_send:
-                aw.modbus.sleepBetween()
-            if aw.modbus.input5float:
-                res5 = aw.modbus.readFloat(aw.modbus.input5slave,aw.modbus.input5register,aw.modbus.input5code)
-            elif aw.modbus.input5bcd:
-                res5 = aw.modbus.readBCD(aw.modbus.input5slave,aw.modbus.input5register,aw.modbus.input5code)
-            else:
-                res5 = aw.modbus.readSingleRegister(aw.modbus.input5slave,aw.modbus.input5register,aw.modbus.input5code)
-            res5 = self.processChannelData(res5,aw.modbus.input5div,aw.modbus.input5mode)
-            just_send = True
-        else:
-            res5 = -1
-        if aw.modbus.input6slave:
-            if just_send:
-                aw.modbus.sleepBetween()
-            if aw.modbus.input6float:
-                res6 = aw.modbus.readFloat(aw.modbus.input6slave,aw.modbus.input6register,aw.modbus.input6code)
-            elif aw.modbus.input6bcd:
-                res6 = aw.modbus.readBCD(aw.modbus.input6slave,aw.modbus.input6register,aw.modbus.input6code)
-            else:
-                res6 = aw.modbus.readSingleRegister(aw.modbus.input6slave,aw.modbus.input6register,aw.modbus.input6code)
-            res6 = self.processChannelData(res6,aw.modbus.input6div,aw.modbus.input6mode)
-            just_send = True
-        else:
-            res6 = -1
+        # all inputs are read at once, coalescing the register inputs of a slave into block reads
+        res = aw.modbus.readInputs()
+        res1 = self.processChannelData(res[0],aw.modbus.input1div,aw.modbus.input1mode) if aw.modbus.input1slave else -1
+        res2 = self.processChannelData(res[1],aw.modbus.input2div,aw.modbus.input2mode) if aw.modbus.input2slave else -1
+        res3 = self.processChannelData(res[2],aw.modbus.input3div,aw.modbus.input3mode) if aw.modbus.input3slave else -1
+        res4 = self.processChannelData(res[3],aw.modbus.input4div,aw.modbus.input4mode) if aw.modbus.input4slave else -1
+        res5 = self.processChannelData(res[4],aw.modbus.input5div,aw.modbus.input5mode) if aw.modbus.input5slave else -1
+        res6 = self.processChannelData(res[5],aw.modbus.input6div,aw.modbus.input6mode) if aw.modbus.input6slave else -1
         aw.qmc.extraMODBUSt3 = res3
         aw.qmc.extraMODBUSt4 = res4
         aw.qmc.extraMODBUSt5 = res5
@@ -35641,16 +35901,14 @@ class serialport(object):
 #---
 
     def phidget1045TemperatureChanged(self,_,t):
-        if self.Phidget1045value != -1:
-            self.Phidget1045value = (self.Phidget1045value + t)/2.0
-        else:
-            self.Phidget1045value = t
+        self.Phidget1045accumulator.add(t)
             
     def phidget1045temp(self,temp,ambient):
         return (temp - ambient) * aw.qmc.phidget1045_emissivity + ambient
 
     def configure1045(self):
         self.Phidget1045value = -1
+        self.Phidget1045accumulator.clear()
         if self.PhidgetIRSensor is not None:
             try:
                 if aw.qmc.phidget1045_async:
@@ -35669,6 +35927,7 @@ class serialport(object):
             
     def configureOneTC(self):
         self.Phidget1045value = -1
+        self.Phidget1045accumulator.clear()
         self.PhidgetIRSensor.setThermocoupleType(PHIDGET_THERMOCOUPLE_TYPE(aw.qmc.phidget1048_types[0]))
         if aw.qmc.phidget1048_async[0]:
             self.PhidgetIRSensor.setTemperatureChangeTrigger(aw.qmc.phidget1048_changeTriggers[0])
@@ -35681,6 +35940,7 @@ class serialport(object):
             
     def configureOneRTD(self):
         self.Phidget1045value = -1
+        self.Phidget1045accumulator.clear()
         self.PhidgetIRSensor.setRTDType(PHIDGET_RTD_TYPE(aw.qmc.phidget1200_formula))
         self.PhidgetIRSensor.setRTDWireSetup(PHIDGET_RTD_WIRE(aw.qmc.phidget1200_wire))        
         if aw.qmc.phidget1200_async:
@@ -35781,7 +36041,10 @@ class serialport(object):
                     if (deviceType == DeviceID.PHIDID_1045 and aw.qmc.phidget1045_async) or \
                         (deviceType in [DeviceID.PHIDID_1051,DeviceID.PHIDID_TMP1100] and aw.qmc.phidget1048_async[0]) or \
                         (deviceType == DeviceID.PHIDID_TMP1200 and aw.qmc.phidget1200_async):
-                        if self.Phidget1045value == -1:
+                        v = self.Phidget1045accumulator.interval(aw.qmc.phidgetAsyncAggregation)
+                        if v is not None:
+                            self.Phidget1045value = v
+                        elif self.Phidget1045value == -1:
                             self.Phidget1045value = self.PhidgetIRSensor.getTemperature()
                         probe = self.Phidget1045value
                     else:
@@ -35833,14 +36096,14 @@ class serialport(object):
         if self.PhidgetTemperatureSensor and len(self.PhidgetTemperatureSensor) > idx:
             channel = self.PhidgetTemperatureSensor[idx].getChannel()
             if aw.qmc.phidget1048_async[channel]:
-                if self.Phidget1048values[channel] != -1:
-                    self.Phidget1048values[channel] = (self.Phidget1048values[channel] + t)/2.0
-                else:
-                    self.Phidget1048values[channel] = t
+                self.Phidget1048accumulators[channel].add(t)
 
     def phidget1048getSensorReading(self,i,idx):
         if aw.qmc.phidget1048_async[i]:
-            if self.Phidget1048values[i] == -1:
+            v = self.Phidget1048accumulators[i].interval(aw.qmc.phidgetAsyncAggregation)
+            if v is not None:
+                self.Phidget1048values[i] = v
+            elif self.Phidget1048values[i] == -1:
                 self.Phidget1048values[i] = self.PhidgetTemperatureSensor[idx].getTemperature()
             return self.Phidget1048values[i]
         else:
@@ -35870,6 +36133,7 @@ class serialport(object):
                 except:
                     pass
                 self.Phidget1048values[channel] = -1
+                self.Phidget1048accumulators[channel].clear()
 
     def phidget1048attached(self,idx):
         self.configure1048(idx)
@@ -36034,14 +36298,11 @@ class serialport(object):
     def phidget1046TemperatureChanged(self,v,idx):
         if self.PhidgetBridgeSensor and len(self.PhidgetBridgeSensor) > idx:
             channel = self.PhidgetBridgeSensor[idx].getChannel()
-            if self.phidget1046_async[channel]:        
+            if aw.qmc.phidget1046_async[channel]:
                 temp = self.bridgeValue2Temperature(channel,v)
                 if aw.qmc.mode == "F":
                     temp = aw.qmc.fromCtoF(temp)
-                if self.Phidget1046values[channel] != -1:
-                    self.Phidget1046values[channel] = (self.Phidget1046values[channel] + temp)/2.0
-                else:
-                    self.Phidget1046values[channel] = temp
+                self.Phidget1046accumulators[channel].add(temp)
 
     def bridgeValue2Temperature(self,i,bv):
         v = -1
@@ -36075,8 +36336,11 @@ class serialport(object):
                         
     def phidget1046getSensorReading(self,i,idx):
         if aw.qmc.phidget1046_async[i]:
-            if self.Phidget1046values[i] == -1:
-                self.Phidget1046values[i] = self.phidget1046getTemperature(i,idx)               
+            v = self.Phidget1046accumulators[i].interval(aw.qmc.phidgetAsyncAggregation)
+            if v is not None:
+                self.Phidget1046values[i] = v
+            elif self.Phidget1046values[i] == -1:
+                self.Phidget1046values[i] = self.phidget1046getTemperature(i,idx)
             return self.Phidget1046values[i]
         else:
             return self.phidget1046getTemperature(i,idx)
@@ -36111,6 +36375,7 @@ class serialport(object):
                     self.PhidgetBridgeSensor[idx].setOnVoltageRatioChangeHandler(lambda *_:None)
                 # reset async value
                 self.Phidget1046values[channel] = -1
+                self.Phidget1046accumulators[channel].clear()
 
     def phidget1046attached(self,idx):
         self.configure1046(idx)
@@ -36504,15 +36769,15 @@ class serialport(object):
         if self.PhidgetIO and len(self.PhidgetIO) > idx:
             v = v * aw.qmc.phidget1018valueFactor
             if aw.qmc.phidget1018_async[channel]:
-                if self.PhidgetIOvalues[channel] != -1:
-                    self.PhidgetIOvalues[channel] = (self.PhidgetIOvalues[channel] + v)/2.0
-                else:
-                    self.PhidgetIOvalues[channel] = v
+                self.PhidgetIOaccumulators[channel].add(v)
 
     def phidget1018getSensorReading(self,i,idx,digital=False):
         if self.PhidgetIO and len(self.PhidgetIO) > idx: 
-            if not digital and aw.qmc.phidget1018_async[i]:            
-                if self.PhidgetIOvalues[i] == -1:
+            if not digital and aw.qmc.phidget1018_async[i]:
+                v = self.PhidgetIOaccumulators[i].interval(aw.qmc.phidgetAsyncAggregation)
+                if v is not None:
+                    self.PhidgetIOvalues[i] = v
+                elif self.PhidgetIOvalues[i] == -1:
                     self.PhidgetIOvalues[i] = self.PhidgetIO[idx].getVoltage() * aw.qmc.phidget1018valueFactor
                 return self.PhidgetIOvalues[i]
             else:
@@ -36551,6 +36816,7 @@ class serialport(object):
                     self.PhidgetIO[idx].setVoltageChangeTrigger(0.0)
                     self.PhidgetIO[idx].setOnVoltageChangeHandler(lambda *_:None) 
             self.PhidgetIOvalues[channel] = -1
+            self.PhidgetIOaccumulators[channel].clear()
 
     def phidget1018attached(self,deviceType,idx,digital=False):
         self.configure1018(deviceType,idx,digital)
@@ -39218,6 +39484,9 @@ class comportDlg(ArtisanDialog):
                         if timeoutEdit:
                             aw.extratimeout[i] = int(str(timeoutEdit.text()))
             #create serial ports for each extra device
+            for ser in aw.extraser:
+                if ser is not None:
+                    ser.releaseport()
             aw.extraser = [None]*ser_ports
             #load the settings for the extra serial ports found
             for i in range(ser_ports):
@@ -39394,16 +39663,22 @@ class scanModbusDlg(ArtisanDialog):
             if self.code4:
                 aw.modbus.sleepBetween()
                 aw.modbus.sleepBetween()
-                aw.modbus.connect()
-                res = aw.modbus.peekSingleRegister(self.slave,int(register),code=4)
+                try:
+                    aw.modbus.connect()
+                    res = aw.modbus.peekSingleRegister(self.slave,int(register),code=4)
+                except Exception: # the MODBUS link is down
+                    res = None
                 if res is not None:
                     result += str(register) + "(4)," + str(res) + "<br>"
                     self.modbusEdit.setHtml(result)
             if self.code3:
                 aw.modbus.sleepBetween()
                 aw.modbus.sleepBetween()
-                aw.modbus.connect()
-                res = aw.modbus.peekSingleRegister(self.slave,int(register),code=3)   
+                try:
+                    aw.modbus.connect()
+                    res = aw.modbus.peekSingleRegister(self.slave,int(register),code=3)
+                except Exception: # the MODBUS link is down
+                    res = None
                 if res is not None:
                     result += str(register) + "(3)," + str(res) + "<br>"
                     self.modbusEdit.setHtml(result)
@@ -40572,10 +40847,8 @@ class DeviceAssignmentDlg(ArtisanDialog):
             if len(aw.extratimeout) > x:
                 aw.extratimeout.pop(x)
             if len(aw.extraser) > x:
-                if aw.extraser[x].SP.isOpen():
-                    aw.extraser[x].SP.close()
-                    libtime.sleep(0.7) # on OS X opening a serial port too fast after closing the port get's disabled
-                aw.extraser.pop(x)
+                # the shared port is closed only if no other device communicates over it
+                aw.extraser.pop(x).releaseport()
             self.createDeviceTable()
             aw.qmc.resetlinecountcaches()
             aw.qmc.redraw(recomputeAllDeltas=False)
@@ -46405,6 +46678,10 @@ class PXG4pidDlgControl(PXpidDlgControl):
 # The command to read T is the always the same for PXR and PXG but with the unit ID changed.
 
 class FujiPID(object):
+
+    # the maximal number of unused words read along to combine the reads of words of one station into one request
+    max_read_gap = 4
+
     def __init__(self):
     
         # follow background: if True, Artisan sends SV values taken from the current background profile if any
@@ -46876,7 +47153,7 @@ class FujiPID(object):
             if reg is not None:
                 v = aw.modbus.readSingleRegister(aw.ser.controlETpid[1],reg,4)
             else:
-                val = -1
+                v = None
         else:
             command = ""
             #if control pid is fuji PXG4
@@ -46891,16 +47168,8 @@ class FujiPID(object):
             elif aw.ser.controlETpid[0] == 4:
                 command = self.message2send(aw.ser.controlETpid[1],4,self.PXF["mv1"][1],1)
                 v = self.readoneword(command)
-        if v is None:
-            val = -1
-        elif v >= 65236: # -3% to 0%
-            val = 0   
-        elif v <= 10300: # <= 103%
-            val = v/100.
-        else: # value out of range (possible a communication error)
-            val = -1   
         #val range -3 to 103%. Check for possible decimal digit user settings
-        return val
+        return self.word2duty(v)
 
     #turns ON turns OFF current ramp soak mode
     #flag =0 OFF, flag = 1 ON, flag = 2 hold
@@ -47366,6 +47635,74 @@ class FujiPID(object):
             aw.qmc.adderror(errorcode)
             return -1
 
+    # reads nwords consecutive words starting at memory from the given station in one function 4 request
+    # returns the list of words or None on failure
+    def readwords(self,stationNo,memory,nwords):
+        if aw.ser.useModbusPort:
+            # we use the pymodbus implementation
+            return aw.modbus.readRegisters(stationNo,aw.modbus.address2register(memory,4),nwords,4)
+        else:
+            #SEND command and RECEIVE 5 + 2*nwords bytes back
+            nbytes = 5 + 2*nwords
+            r = aw.ser.sendFUJIcommand(self.message2send(stationNo,4,memory,nwords),nbytes)
+            if len(r) == nbytes:
+                return [hex2int(r[3+2*i],r[4+2*i]) for i in range(nwords)]
+            else:
+                errorcode = QApplication.translate("Error Message","pid.readwords(): {0} RX bytes received ({1} needed) for unit ID={2}",None).format(len(r),nbytes,stationNo)
+                aw.qmc.adderror(errorcode)
+                return None
+
+    # returns the memory dict of the given PID type (0: PXG, 1: PXR, 4: PXF) or None
+    def memory(self,pidType):
+        if pidType == 0:
+            return self.PXG4
+        elif pidType == 1:
+            return self.PXR
+        elif pidType == 4:
+            return self.PXF
+        else:
+            return None
+
+    # reads the words of the given list of (pidType,stationNo,key) from the PIDs and returns them in the same order (-1 on failure)
+    # words of one station are read by one request per block of consecutive words (accepting up to max_read_gap unused words in between)
+    def readstations(self,requests):
+        res = [-1]*len(requests)
+        stations = []
+        for i,(pidType,stationNo,key) in enumerate(requests):
+            reg_dict = self.memory(pidType)
+            if reg_dict is not None and key in reg_dict:
+                station = next((st for st in stations if st[0] == stationNo),None)
+                if station is None:
+                    stations.append((stationNo,[(reg_dict[key][1],i)]))
+                else:
+                    station[1].append((reg_dict[key][1],i))
+        for stationNo,words in stations:
+            words.sort()
+            blocks = []
+            for memory,i in words:
+                if blocks and memory - blocks[-1][1] <= self.max_read_gap + 1:
+                    blocks[-1][1] = memory
+                    blocks[-1][2].append((memory,i))
+                else:
+                    blocks.append([memory,memory,[(memory,i)]])
+            for start,end,block in blocks:
+                values = self.readwords(stationNo,start,end - start + 1)
+                if values is not None:
+                    for memory,i in block:
+                        res[i] = values[memory - start]
+        return res
+
+    # returns the duty signal of the given mv1 word in the range 0-100 or -1
+    def word2duty(self,v):
+        if v is None or v < 0:
+            return -1
+        elif v >= 65236: # -3% to 0%
+            return 0
+        elif v <= 10300: # <= 103%
+            return v/100.
+        else: # value out of range (possible a communication error)
+            return -1
+
     #FUJICRC16 function calculates the CRC16 of the data. It expects a binary string as input and returns an int
     def fujiCrc16(self,string):
         crc16tab = (0x0000,
@@ -0,0 +1,164 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# ABOUT
+# Compiler for the symbolic expressions of the open-source roast logging software Artisan.
+# A symbolic expression like "(Y1 + Y2[-2])/2" is parsed only once into a code object
+# together with the list of symbols the expression refers to.
+
+# LICENSE
+# This program or module is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 2 of the License, or
+# version 3 of the License, or (at your option) any later versison. It is
+# provided for educational purposes and is distributed in the hope that
+# it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See
+# the GNU General Public License for more details.
+
+import re
+import math
+
+# the globals for evaluating compiled expressions. This dictionary is shared and never modified.
+math_functions = {"__builtins__":None,
+    "min":min,"max":max,"sin":math.sin,"cos":math.cos,"tan":math.tan,"pow":math.pow,"exp":math.exp,"pi":math.pi,"e":math.e,
+    "abs":abs,"acos":math.acos,"asin":math.asin,"atan":math.atan,"log":math.log,"radians":math.radians,
+    "sqrt":math.sqrt,"atan2":math.atan,"degrees":math.degrees}
+
+# symbol kinds
+#  "Y": Y<n> ET (Y1), BT (Y2) and extra device channels (Y3,..)
+#  "x": the actual value
+#  "k","o": factor and offset to plot RoR values on the temperature axis
+#  "E": E<n> the value of the last event of type <n>
+#  "t": the actual time
+#  "P": P<n> the result of plotter equation <n>
+#  "B": B<n> the background ET (B1), BT (B2) and the selected background extra curve (B3,..)
+#  "F": F<n> the n-th previous result
+# timeshifted symbols like Y2[-3] are rewritten to Y20030 (Y2[+3] to Y21131) and have a shift != None
+symbol_patterns = [
+    ("Y",re.compile(r"^Y(\d\d?)$")),
+    ("E",re.compile(r"^E(\d)$")),
+    ("P",re.compile(r"^P(\d)$")),
+    ("B",re.compile(r"^B(\d)$")),
+    ("F",re.compile(r"^F(\d)$"))]
+
+# cache of compiled expressions keyed by the expression text
+cache = {}
+cache_size = 256
+
+class CompiledExpression(object):
+    __slots__ = ["text","code","symbols"]
+    def __init__(self,text,code,symbols):
+        self.text = text # the original expression
+        self.code = code # the code object of the rewritten expression
+        self.symbols = symbols # list of (name,kind,n,shift) tuples of the symbols the expression refers to
+
+# returns the CompiledExpression for the given expression text, compiling it only on first use
+# raises an Exception if the expression cannot be parsed
+def compile_expression(text):
+    try:
+        return cache[text]
+    except KeyError:
+        pass
+    expression,shifts = rewrite_timeshifts(text)
+    code = compile(expression,"<expression>","eval")
+    symbols = []
+    for name in code_names(code):
+        if name in shifts:
+            kind,n,shift = shifts[name]
+            symbols.append((name,kind,n,shift))
+        elif name in ["x","k","o","t"]:
+            symbols.append((name,name,None,None))
+        else:
+            for kind,pattern in symbol_patterns:
+                m = pattern.match(name)
+                if m:
+                    symbols.append((name,kind,int(m.group(1)),None))
+                    break
+    res = CompiledExpression(text,code,symbols)
+    if len(cache) >= cache_size:
+        cache.clear()
+    cache[text] = res
+    return res
+
+# returns the names referenced by the given code object and its nested code objects, without duplicates
+def code_names(code):
+    names = []
+    for n in code.co_names:
+        if n not in names:
+            names.append(n)
+    for c in code.co_consts:
+        if hasattr(c,"co_names"):
+            for n in code_names(c):
+                if n not in names:
+                    names.append(n)
+    return names
+
+def evalsign(sign):
+    if sign == "-":
+        return "0"  # "-" becomes digit "0" for python eval compatibility
+    elif sign == "+":
+        return "1"  # "+" becomes digit "1"
+    else:
+        raise ValueError("timeshift sign expected: {0}".format(sign))
+
+# converts timeshifted symbols like "Y2[+9]" to names compatible for python eval()
+# METHOD USED: replace all non digits chars with sign value.
+# Example1 "Y2[-7]" = "Y20070"   Example2 "Y2[+9]" = "Y21191"
+# returns the rewritten expression and a dictionary mapping the new names to their (kind,n,shift)
+def rewrite_timeshifts(mathexpression):
+    shifts = {}
+    mlen = len(mathexpression)
+    for i in range(mlen):
+        c = mathexpression[i]
+        if c in ["Y","B"]:
+            # Y1[-2], Y1[-12], B2[+3],..
+            if i+1 < mlen and mathexpression[i+1].isdigit() and i+5 < len(mathexpression) and mathexpression[i+2] == "[":
+                seconddigitstr = ""
+                Yshiftval = int(mathexpression[i+4])
+                sign = mathexpression[i+3]
+                #timeshift with two digits
+                if mathexpression[i+5].isdigit():
+                    seconddigitstr = mathexpression[i+5]
+                    mathexpression = mathexpression[:i+5]+mathexpression[i+6:]
+                    Yshiftval = 10*Yshiftval + int(seconddigitstr)
+                es = evalsign(sign)
+                name = c + mathexpression[i+1] + es*2 + mathexpression[i+4] + seconddigitstr + es
+                shifts[name] = (c,int(mathexpression[i+1]),(-Yshiftval if sign == "-" else Yshiftval))
+                mathexpression = name.join((mathexpression[:i],mathexpression[i+6:]))
+        elif c == "t":
+            # time timeshift of absolute time (not relative to CHARGE): t[-2], t[+12]
+            if i+4 < len(mathexpression) and mathexpression[i+1] == "[":
+                seconddigitstr = ""
+                Yshiftval = int(mathexpression[i+3])
+                sign = mathexpression[i+2]
+                if mathexpression[i+4].isdigit():
+                    seconddigitstr = mathexpression[i+4]
+                    mathexpression = mathexpression[:i+4]+mathexpression[i+5:]
+                    Yshiftval = 10*Yshiftval + int(seconddigitstr)
+                es = evalsign(sign)
+                name = c + es*2 + mathexpression[i+3] + seconddigitstr + es
+                shifts[name] = ("t",None,(-Yshiftval if sign == "-" else Yshiftval))
+                mathexpression = name.join((mathexpression[:i],mathexpression[i+5:]))
+        elif c == "P":
+            # plotter results timeshift (one digit only): P1[-2]
+            if i+1 < mlen and mathexpression[i+1].isdigit() and i+5 < len(mathexpression) and mathexpression[i+2] == "[" and mathexpression[i+5] == "]":
+                Yshiftval = int(mathexpression[i+4])
+                sign = mathexpression[i+3]
+                es = evalsign(sign)
+                name = "P" + mathexpression[i+1] + es*2 + mathexpression[i+4] + es
+                shifts[name] = ("P",int(mathexpression[i+1]),(-Yshiftval if sign == "-" else Yshiftval))
+                mathexpression = name.join((mathexpression[:i],mathexpression[i+6:]))
+    return mathexpression,shifts
+
+# returns the index shifted by shift clamped to [0,length-1]
+def shift_index(index,shift,length):
+    shiftedindex = index + shift
+    if shift < 0:
+        #  ie. original [1,2,3,4,5,6]; shift right 2 = [1,1,1,2,3,4]
+        if shiftedindex < 0:
+            shiftedindex = 0
+    elif shiftedindex >= length:
+        # original [1,2,3,4,5,6]; shift left 2  = [3,4,5,6,6,6]
+        shiftedindex = length - 1
+    return shiftedindex
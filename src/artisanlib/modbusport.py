@@ -1,6 +1,7 @@
 import time
+import struct
 
-from PyQt5.QtCore import QSemaphore
+from PyQt5.QtCore import QSemaphore, QThread, QMutex, QWaitCondition
 from PyQt5.QtWidgets import QApplication
 
 from artisanlib.compat import *
@@ -75,6 +76,43 @@ def getBinaryPayloadDecoderFromRegisters(registers,byteorderLittle=True,wordorde
         # pymodbus v1.3 and older
         return BinaryPayloadDecoder.fromRegisters(registers, endian=byteorder)
 
+# the maximal number of registers fetched by one block read (the MODBUS spec allows up to 125)
+max_block_registers = 100
+# the maximal number of unused registers between two inputs fetched by the same block read
+max_block_gap = 4
+
+# returns the list of block reads covering the given register inputs
+#  inputs: list of (i,slave,register,code,isfloat,isbcd) tuples with code 3 or 4 and i the index of the input
+# the inputs are grouped by slave and function code and registers of one group, that are contiguous or separated
+# by at most max_gap unused registers, are fetched by one block read of at most max_count registers
+# returns a list of (slave,code,register,count,[(i,offset,isfloat,isbcd),..]) tuples with offset the
+# position of the first register of input i within the registers of the block
+def planBlockReads(inputs,max_gap=max_block_gap,max_count=max_block_registers):
+    groups = {}
+    order = []
+    for inp in inputs:
+        key = (inp[1],inp[3])
+        if key not in groups:
+            groups[key] = []
+            order.append(key)
+        groups[key].append(inp)
+    blocks = []
+    for slave,code in order:
+        block = None
+        for (i,_,register,_,isfloat,isbcd) in sorted(groups[(slave,code)],key=lambda inp: inp[2]):
+            n = (2 if isfloat else 1)
+            if block is not None and register - (block[2] + block[3]) <= max_gap and register + n - block[2] <= max_count:
+                block[3] = max(block[3],register + n - block[2])
+            else:
+                block = [slave,code,register,n,[]]
+                blocks.append(block)
+            block[4].append((i,register - block[2],isfloat,isbcd))
+    return [tuple(b) for b in blocks]
+
+# raised on transactions while the link is taken as down
+class ModbusLinkDown(Exception):
+    pass
+
 
 ###########################################################################################
 ##################### MODBUS PORT #########################################################
@@ -165,7 +203,24 @@ class modbusport(object):
         self.lastReadResult = 0 # this is set by eventaction following some custom button/slider Modbus actions with "read" command
         
         self.commError = False # True after a communication error was detected and not yet cleared by receiving proper data
-        
+
+        # connection management
+        self.connectionManager = None # the modbusConnectionManager thread checking the connection while connected
+        self.linkDown = False # True if the connection is taken as down, while the connection manager tries to reopen it
+        self.failedTransactions = {} # maps slaves to (n,first) with n the number of their transactions failed in a row without response and first the number of the first of those transactions
+        self.maxFailedTransactions = 3 # number of transactions of a slave failing in a row without any response after which the link is taken as down
+        self.transactionCount = 0 # number of transactions so far
+        self.lastResponse = 0 # number of the last transaction answered by any slave
+        self.reconnectDelayMin = 0.5 # initial delay in seconds before trying to reopen a link taken as down
+        self.reconnectDelayMax = 8 # maximal delay in seconds between reconnect attempts
+        self.reconnectDelay = self.reconnectDelayMin # delay before the next reconnect attempt
+        self.reconnectTime = 0 # time of the next reconnect attempt
+
+        self.writeQueue = modbusWriteQueue(self) # the queue of asynchronous writes, see queuedWriter()
+
+        self.blockReadPlan = None # the cached (inputs,blocks) block read plan of the register inputs, see readInputs()
+        self.readRejected = False # True if the last readRegisters() failed on an exception response of the slave (like an illegal data address)
+
     # this garantees a minimum of 30 miliseconds between readings and 80ms between writes (according to the Modbus spec) on serial connections
     # this sleep delays between requests seems to be beneficial on slow RTU serial connections like those of the FZ-94
     def sleepBetween(self,write=False):
@@ -191,90 +246,218 @@ class modbusport(object):
         return not (self.master is None) and self.master.socket
         
     def disconnect(self):
+        self.writeQueue.stop() # pending writes are delivered first
+        self.stopConnectionManager()
         try:
             self.master.close()
         except Exception:
             pass
         self.master = None
+        self.linkDown = False
+        self.failedTransactions = {}
+        self.reconnectDelay = self.reconnectDelayMin
+
+    # returns an object offering the write methods of this modbusport that queues the writes for asynchronous delivery
+    # callback(success), if given, is called from the queue thread on delivery of each write
+    def queuedWriter(self,priority=0,callback=None):
+        return modbusQueuedWriter(self.writeQueue,priority,callback)
+
+    # returns a new MODBUS master for the current settings, not yet connected
+    def createMaster(self):
+        # as in the following the port is None, no port is opened on creation of the (py)serial object
+        if self.type == 1: # Serial ASCII
+            from pymodbus.client.sync import ModbusSerialClient
+            master = ModbusSerialClient(
+                method='ascii',
+                port=self.comport,
+                baudrate=self.baudrate,
+                bytesize=self.bytesize,
+                parity=self.parity,
+                stopbits=self.stopbits,
+                retry_on_empty=True,
+                timeout=self.timeout)
+        elif self.type == 2: # Serial Binary
+            from pymodbus.client.sync import ModbusSerialClient
+            master = ModbusSerialClient(
+                method='binary',
+                port=self.comport,
+                baudrate=self.baudrate,
+                bytesize=self.bytesize,
+                parity=self.parity,
+                stopbits=self.stopbits,
+                retry_on_empty=True,
+                timeout=self.timeout)  
+        elif self.type == 3: # TCP
+            from pymodbus.client.sync import ModbusTcpClient
+            try:
+                master = ModbusTcpClient(
+                        host=self.host, 
+                        port=self.port,
+                        retry_on_empty=True,
+                        retries=1,
+                        timeout=0.9, #self.timeout
+                        )
+                self.readRetries = 0
+            except:
+                master = ModbusTcpClient(
+                        host=self.host, 
+                        port=self.port,
+                        )
+        elif self.type == 4: # UDP
+            from pymodbus.client.sync import ModbusUdpClient
+            try:
+                master = ModbusUdpClient(
+                    host=self.host, 
+                    port=self.port,
+                    retry_on_empty=True,
+                    retries=3,
+                    timeout=0.7, #self.timeout
+                    )
+            except: # older versions of pymodbus don't support the retries, timeout nor the retry_on_empty arguments
+                master = ModbusUdpClient(
+                    host=self.host, 
+                    port=self.port,
+                    )
+        else: # Serial RTU
+            from pymodbus.client.sync import ModbusSerialClient
+            master = ModbusSerialClient(
+                method='rtu',
+                port=self.comport,
+                baudrate=self.baudrate,
+                bytesize=self.bytesize,
+                parity=self.parity,
+                stopbits=self.stopbits,
+                retry_on_empty=False,
+                timeout=self.timeout)   
+            self.readRetries = 1
+        return master
 
     def connect(self):
 #        if self.master and not self.master.socket:
 #            self.master = None
         if self.master is None:
             self.commError = False
+            self.linkDown = False
+            self.failedTransactions = {}
+            self.reconnectDelay = self.reconnectDelayMin
             try:
-                # as in the following the port is None, no port is opened on creation of the (py)serial object
-                if self.type == 1: # Serial ASCII
-                    from pymodbus.client.sync import ModbusSerialClient
-                    self.master = ModbusSerialClient(
-                        method='ascii',
-                        port=self.comport,
-                        baudrate=self.baudrate,
-                        bytesize=self.bytesize,
-                        parity=self.parity,
-                        stopbits=self.stopbits,
-                        retry_on_empty=True,
-                        timeout=self.timeout)
-                elif self.type == 2: # Serial Binary
-                    from pymodbus.client.sync import ModbusSerialClient
-                    self.master = ModbusSerialClient(
-                        method='binary',
-                        port=self.comport,
-                        baudrate=self.baudrate,
-                        bytesize=self.bytesize,
-                        parity=self.parity,
-                        stopbits=self.stopbits,
-                        retry_on_empty=True,
-                        timeout=self.timeout)  
-                elif self.type == 3: # TCP
-                    from pymodbus.client.sync import ModbusTcpClient
-                    try:
-                        self.master = ModbusTcpClient(
-                                host=self.host, 
-                                port=self.port,
-                                retry_on_empty=True,
-                                retries=1,
-                                timeout=0.9, #self.timeout
-                                )
-                        self.readRetries = 0
-                    except:
-                        self.master = ModbusTcpClient(
-                                host=self.host, 
-                                port=self.port,
-                                )
-                elif self.type == 4: # UDP
-                    from pymodbus.client.sync import ModbusUdpClient
-                    try:
-                        self.master = ModbusUdpClient(
-                            host=self.host, 
-                            port=self.port,
-                            retry_on_empty=True,
-                            retries=3,
-                            timeout=0.7, #self.timeout
-                            )
-                    except: # older versions of pymodbus don't support the retries, timeout nor the retry_on_empty arguments
-                        self.master = ModbusUdpClient(
-                            host=self.host, 
-                            port=self.port,
-                            )
-                else: # Serial RTU
-                    from pymodbus.client.sync import ModbusSerialClient
-                    self.master = ModbusSerialClient(
-                        method='rtu',
-                        port=self.comport,
-                        baudrate=self.baudrate,
-                        bytesize=self.bytesize,
-                        parity=self.parity,
-                        stopbits=self.stopbits,
-                        retry_on_empty=False,
-                        timeout=self.timeout)   
-                    self.readRetries = 1
-                self.master.connect()
-                self.adderror(QApplication.translate("Error Message","Connected via MODBUS",None))
+                self.master = self.createMaster()
+                if self.master.connect() is False:
+                    # the connection is established in the background by the connection manager
+                    self.linkFailed()
+                else:
+                    self.adderror(QApplication.translate("Error Message","Connected via MODBUS",None))
                 time.sleep(.5) # avoid possible hickups on startup
             except Exception as ex:
                 _, _, exc_tb = sys.exc_info()
                 self.adderror((QApplication.translate("Error Message","Modbus Error:",None) + " connect() {0}").format(str(ex)),exc_tb.tb_lineno)
+            self.startConnectionManager()
+        if self.linkDown:
+            # we fail fast instead of waiting for the timeout of a reconnect; the connection manager reconnects in the background
+            raise ModbusLinkDown("MODBUS link down")
+
+    def startConnectionManager(self):
+        if self.connectionManager is None:
+            self.connectionManager = modbusConnectionManager(self)
+            self.connectionManager.start()
+
+    def stopConnectionManager(self):
+        if self.connectionManager is not None:
+            self.connectionManager.running = False
+            self.connectionManager.wait()
+            self.connectionManager = None
+
+    # to be called after each transaction answered by the slave
+    def transactionSucceeded(self,slave):
+        self.transactionCount += 1
+        self.lastResponse = self.transactionCount
+        self.failedTransactions.pop(slave,None)
+        self.reconnectDelay = self.reconnectDelayMin
+
+    # to be called after each failed transaction, with rejected set if the slave answered with an exception response
+    # only transactions without any response (timeouts, socket errors) count: the link is taken as down once a slave
+    # failed maxFailedTransactions transactions in a row and no other slave answered since, such that a single
+    # slave being offline on a multi-drop bus does not take down the link to the others
+    def transactionFailed(self,slave,rejected=False):
+        if rejected:
+            # the slave is reachable, it just refused the request (eg. illegal data address)
+            self.transactionSucceeded(slave)
+            return
+        self.transactionCount += 1
+        n,first = self.failedTransactions.get(slave,(0,self.transactionCount))
+        self.failedTransactions[slave] = (n+1,first)
+        if not self.linkDown and n+1 >= self.maxFailedTransactions and self.lastResponse < first:
+            self.linkFailed()
+
+    # marks the link as down and schedules a reconnect by the connection manager
+    def linkFailed(self):
+        self.linkDown = True
+        self.reconnectTime = time.time() + self.reconnectDelay
+        self.reconnectDelay = min(2*self.reconnectDelay,self.reconnectDelayMax)
+
+    def masterIsOpen(self):
+        try:
+            return self.master.is_socket_open() # requires pymodbus v1.5
+        except Exception:
+            return True
+
+    # called periodically by the connection manager thread
+    # a closed link is taken as down (instead of being reopened inline by the next transaction) and a down link
+    # is reopened with exponential backoff outside of the COMsemaphore
+    def checkConnection(self):
+        if self.master is None:
+            return
+        if not self.linkDown:
+            if not self.masterIsOpen():
+                self.linkFailed()
+            return
+        if time.time() < self.reconnectTime:
+            return
+        try:
+            if self.type in [3,4]: # TCP or UDP
+                # a new master is connected while the current one is still in place
+                master = self.createMaster()
+                if master.connect():
+                    old = None
+                    try:
+                        #### lock shared resources #####
+                        self.COMsemaphore.acquire(1)
+                        if self.master is not None:
+                            old = self.master
+                            self.master = master
+                            master = None
+                            self.linkDown = False
+                            self.failedTransactions = {}
+                    finally:
+                        if self.COMsemaphore.available() < 1:
+                            self.COMsemaphore.release(1)
+                    for m in [old,master]:
+                        try:
+                            if m is not None:
+                                m.close()
+                        except Exception:
+                            pass
+                else:
+                    master.close()
+                    self.linkFailed()
+            else: # serial connections are reopened on the same port
+                try:
+                    #### lock shared resources #####
+                    self.COMsemaphore.acquire(1)
+                    if self.master is not None:
+                        self.master.close()
+                        if self.master.connect():
+                            self.linkDown = False
+                            self.failedTransactions = {}
+                        else:
+                            self.linkFailed()
+                finally:
+                    if self.COMsemaphore.available() < 1:
+                        self.COMsemaphore.release(1)
+            if not self.linkDown:
+                self.adderror(QApplication.translate("Error Message","Connected via MODBUS",None))
+        except Exception:
+            self.linkFailed()
 
     # function 15 (Write Multiple Coils)
     def writeCoils(self,slave,register,values):
@@ -284,12 +467,16 @@ class modbusport(object):
             self.connect()
             self.master.write_coils(int(register),list(values),unit=int(slave))
             time.sleep(.3) # avoid possible hickups on startup
+            self.transactionSucceeded(slave)
+            return True
         except Exception as ex:
 #            self.disconnect()
 #            import traceback
 #            traceback.print_exc(file=sys.stdout)
+            self.transactionFailed(slave)
             _, _, exc_tb = sys.exc_info()
             self.adderror((QApplication.translate("Error Message","Modbus Error:",None) + " writeCoils() {0}").format(str(ex)),exc_tb.tb_lineno)
+            return False
         finally:
             if self.COMsemaphore.available() < 1:
                 self.COMsemaphore.release(1)    
@@ -302,10 +489,14 @@ class modbusport(object):
             self.connect()
             self.master.write_coil(int(register),value,unit=int(slave))
             time.sleep(.3) # avoid possible hickups on startup
+            self.transactionSucceeded(slave)
+            return True
         except Exception as ex:
 #            self.disconnect()
+            self.transactionFailed(slave)
             _, _, exc_tb = sys.exc_info()
             self.adderror((QApplication.translate("Error Message","Modbus Error:",None) + " writeCoil() {0}").format(str(ex)),exc_tb.tb_lineno)
+            return False
         finally:
             if self.COMsemaphore.available() < 1:
                 self.COMsemaphore.release(1)
@@ -315,13 +506,14 @@ class modbusport(object):
     def writeRegister(self,slave,register,value):
         if stringp(value):
             if "." in value:
-                self.writeWord(slave,register,value)
+                return self.writeWord(slave,register,value)
             else:
-                self.writeSingleRegister(slave,register,value)
+                return self.writeSingleRegister(slave,register,value)
         elif isinstance(value, int):
-            self.writeSingleRegister(slave,register,value)
+            return self.writeSingleRegister(slave,register,value)
         elif isinstance(value, float):
-            self.writeWord(slave,register,value)
+            return self.writeWord(slave,register,value)
+        return False
 
     # function 6 (Write Single Holding Register)
     def writeSingleRegister(self,slave,register,value):
@@ -332,13 +524,17 @@ class modbusport(object):
             self.connect()
             self.master.write_register(int(register),int(value),unit=int(slave))
             time.sleep(.03) # avoid possible hickups on startup
+            self.transactionSucceeded(slave)
+            return True
         except Exception as ex:
 #            _logger.debug("writeSingleRegister exception: %s" % str(ex))
 #            import traceback
 #            traceback.print_exc(file=sys.stdout)
 #            self.disconnect()
+            self.transactionFailed(slave)
             _, _, exc_tb = sys.exc_info()
             self.adderror((QApplication.translate("Error Message","Modbus Error:",None) + " writeSingleRegister() {0}").format(str(ex)),exc_tb.tb_lineno)
+            return False
         finally:
             if self.COMsemaphore.available() < 1:
                 self.COMsemaphore.release(1)
@@ -351,12 +547,16 @@ class modbusport(object):
             self.connect()
             self.master.mask_write_register(int(register),int(and_mask),int(or_mask),unit=int(slave))
             time.sleep(.03)
+            self.transactionSucceeded(slave)
+            return True
         except Exception as ex:
 #            import traceback
 #            traceback.print_exc(file=sys.stdout)
 #            self.disconnect()
+            self.transactionFailed(slave)
             _, _, exc_tb = sys.exc_info()
             self.adderror((QApplication.translate("Error Message","Modbus Error:",None) + " writeMask() {0}").format(str(ex)),exc_tb.tb_lineno)
+            return False
         finally:
             if self.COMsemaphore.available() < 1:
                 self.COMsemaphore.release(1)
@@ -370,10 +570,14 @@ class modbusport(object):
             self.connect()
             self.master.write_registers(int(register),values,unit=int(slave))
             time.sleep(.03)
+            self.transactionSucceeded(slave)
+            return True
         except Exception as ex:
 #            self.disconnect()
+            self.transactionFailed(slave)
             _, _, exc_tb = sys.exc_info()
             self.adderror((QApplication.translate("Error Message","Modbus Error:",None) + " writeRegisters() {0}").format(str(ex)),exc_tb.tb_lineno)
+            return False
         finally:
             if self.COMsemaphore.available() < 1:
                 self.COMsemaphore.release(1)
@@ -392,10 +596,14 @@ class modbusport(object):
             payload = builder.build() # .tolist()
             self.master.write_registers(int(register),payload,unit=int(slave),skip_encode=True)
             time.sleep(.03)
+            self.transactionSucceeded(slave)
+            return True
         except Exception as ex:
 #            self.disconnect()
+            self.transactionFailed(slave)
             _, _, exc_tb = sys.exc_info()
             self.adderror((QApplication.translate("Error Message","Modbus Error:",None) + " writeWord() {0}").format(str(ex)),exc_tb.tb_lineno)
+            return False
         finally:
             if self.COMsemaphore.available() < 1:
                 self.COMsemaphore.release(1)
@@ -412,17 +620,54 @@ class modbusport(object):
             payload = builder.build() # .tolist()
             self.master.write_registers(int(register),payload,unit=int(slave),skip_encode=True)
             time.sleep(.03)
+            self.transactionSucceeded(slave)
+            return True
         except Exception as ex:
 #            self.disconnect()
+            self.transactionFailed(slave)
             _, _, exc_tb = sys.exc_info()
             self.adderror((QApplication.translate("Error Message","Modbus Error:",None) + " writeWord() {0}").format(str(ex)),exc_tb.tb_lineno)
+            return False
         finally:
             if self.COMsemaphore.available() < 1:
                 self.COMsemaphore.release(1)
                 
+    # returns the payload (list of 2-byte register values) of the given value as written by writeSingleRegister() (kind "register"),
+    # writeWord() (kind "word") or writeBCD() (kind "bcd")
+    def encodeRegisters(self,kind,value):
+        if kind == "register":
+            return [struct.pack(">H",int(value))]
+        builder = getBinaryPayloadBuilder(self.byteorderLittle,self.wordorderLittle)
+        if kind == "word":
+            builder.add_32bit_float(float(value))
+        else: # bcd
+            builder.add_16bit_uint(convert_to_bcd(int(value)))
+        return builder.build()
+
+    # function 16 (Write Multiple Holding Registers)
+    # writes the given payload (list of 2-byte register values) starting at register
+    def writePayload(self,slave,register,payload):
+        try:
+            #### lock shared resources #####
+            self.COMsemaphore.acquire(1)
+            self.connect()
+            self.master.write_registers(int(register),payload,unit=int(slave),skip_encode=True)
+            time.sleep(.03)
+            self.transactionSucceeded(slave)
+            return True
+        except Exception as ex:
+            self.transactionFailed(slave)
+            _, _, exc_tb = sys.exc_info()
+            self.adderror((QApplication.translate("Error Message","Modbus Error:",None) + " writePayload() {0}").format(str(ex)),exc_tb.tb_lineno)
+            return False
+        finally:
+            if self.COMsemaphore.available() < 1:
+                self.COMsemaphore.release(1)
+
     # function 3 (Read Multiple Holding Registers) and 4 (Read Input Registers)
     def readFloat(self,slave,register,code=3):
         from pymodbus.pdu import ExceptionResponse
+        rejected = False # True if the slave answered with an exception response
         try:
             #### lock shared resources #####
             self.COMsemaphore.acquire(1)
@@ -439,11 +684,13 @@ class modbusport(object):
                         retry = retry - 1
                         #time.sleep(0.020)
                     else:
+                        rejected = isinstance(res,ExceptionResponse)
                         raise Exception("Exception response")
                 else:
                     break
             decoder = getBinaryPayloadDecoderFromRegisters(res.registers, self.byteorderLittle, self.wordorderLittle)
             r = decoder.decode_32bit_float()
+            self.transactionSucceeded(slave)
             if self.commError: # we clear the previous error and send a message
                 self.commError = False
                 self.adderror(QApplication.translate("Error Message","Modbus Communication Resumed",None))
@@ -454,6 +701,7 @@ class modbusport(object):
 #            self.disconnect()
 #            _, _, exc_tb = sys.exc_info()
 #            self.adderror((QApplication.translate("Error Message","Modbus Error:",None) + " readFloat() {0}").format(str(ex)),exc_tb.tb_lineno)
+            self.transactionFailed(slave,rejected)
             self.adderror(QApplication.translate("Error Message","Modbus Communication Error",None))
         finally:
             if self.COMsemaphore.available() < 1:
@@ -465,6 +713,7 @@ class modbusport(object):
     # function 3 (Read Multiple Holding Registers) and 4 (Read Input Registers)
     def readBCD(self,slave,register,code=3):
         from pymodbus.pdu import ExceptionResponse
+        rejected = False # True if the slave answered with an exception response
         try:
             #### lock shared resources #####
             self.COMsemaphore.acquire(1)
@@ -481,11 +730,13 @@ class modbusport(object):
                         retry = retry - 1
                         #time.sleep(0.020)
                     else:
+                        rejected = isinstance(res,ExceptionResponse)
                         raise Exception("Exception response")
                 else:
                     break
             decoder = getBinaryPayloadDecoderFromRegisters(res.registers, self.byteorderLittle, self.wordorderLittle)            
             r = decoder.decode_16bit_uint()
+            self.transactionSucceeded(slave)
             if self.commError: # we clear the previous error and send a message
                 self.commError = False
                 self.adderror(QApplication.translate("Error Message","Modbus Communication Resumed",None))
@@ -497,6 +748,7 @@ class modbusport(object):
 #            self.disconnect()
 #            _, _, exc_tb = sys.exc_info()
 #            self.adderror((QApplication.translate("Error Message","Modbus Error:",None) + " readBCD() {0}").format(str(ex)),exc_tb.tb_lineno)
+            self.transactionFailed(slave,rejected)
             self.adderror(QApplication.translate("Error Message","Modbus Communication Error",None))
         finally:
             if self.COMsemaphore.available() < 1:
@@ -541,6 +793,7 @@ class modbusport(object):
     # function 4 (Read Input Registers)
     def readSingleRegister(self,slave,register,code=3):
         from pymodbus.pdu import ExceptionResponse
+        rejected = False # True if the slave answered with an exception response
 #        import logging
 #        logging.basicConfig()
 #        log = logging.getLogger()
@@ -568,10 +821,12 @@ class modbusport(object):
                         retry = retry - 1
                         time.sleep(0.020)
                     else:
+                        rejected = isinstance(res,ExceptionResponse)
                         raise Exception("Exception response")
                 else:
                     break
             if code in [1,2]:
+                self.transactionSucceeded(slave)
                 if res is not None and res.bits[0]:
                     return 1
                 else:
@@ -579,6 +834,7 @@ class modbusport(object):
             else:
                 decoder = getBinaryPayloadDecoderFromRegisters(res.registers, self.byteorderLittle, self.wordorderLittle)
                 r = decoder.decode_16bit_uint()
+                self.transactionSucceeded(slave)
                 if self.commError: # we clear the previous error and send a message
                     self.commError = False
                     self.adderror(QApplication.translate("Error Message","Modbus Communication Resumed",None))
@@ -589,6 +845,7 @@ class modbusport(object):
 #            traceback.print_exc(file=sys.stdout)
 #            _, _, exc_tb = sys.exc_info()
 #            self.adderror((QApplication.translate("Error Message","Modbus Error:",None) + " readSingleRegister() {0}").format(str(ex)),exc_tb.tb_lineno)
+            self.transactionFailed(slave,rejected)
             self.adderror(QApplication.translate("Error Message","Modbus Communication Error",None))
             self.commError = True
         finally:
@@ -598,6 +855,130 @@ class modbusport(object):
             settings = str(self.comport) + "," + str(self.baudrate) + "," + str(self.bytesize)+ "," + str(self.parity) + "," + str(self.stopbits) + "," + str(self.timeout)
             self.addserial("MODBUS readSingleRegister :" + settings + " || Slave = " + str(slave) + " || Register = " + str(register) + " || Code = " + str(code) + " || Rx = " + str(r))
 
+    # function 3 (Read Multiple Holding Registers) and 4 (Read Input Registers)
+    # returns the list of count registers starting at register or None on failure
+    # on failure readRejected is set if the slave answered with an exception response instead of not answering at all
+    def readRegisters(self,slave,register,count,code=3):
+        from pymodbus.pdu import ExceptionResponse
+        res = None
+        self.readRejected = False
+        try:
+            #### lock shared resources #####
+            self.COMsemaphore.acquire(1)
+            self.connect()
+            retry = self.readRetries
+            while True:
+                try:
+                    if code==4:
+                        res = self.master.read_input_registers(int(register),int(count),unit=int(slave))
+                    else: # code==3
+                        res = self.master.read_holding_registers(int(register),int(count),unit=int(slave))
+                except Exception:
+                    res = None
+                if res is None or res.isError(): # requires pymodbus v1.5.1
+                    if retry > 0:
+                        retry = retry - 1
+                        time.sleep(0.020)
+                    else:
+                        self.readRejected = isinstance(res,ExceptionResponse)
+                        raise Exception("Exception response")
+                else:
+                    break
+            self.transactionSucceeded(slave)
+            if self.commError: # we clear the previous error and send a message
+                self.commError = False
+                self.adderror(QApplication.translate("Error Message","Modbus Communication Resumed",None))
+            return res.registers
+        except Exception:
+            self.transactionFailed(slave,self.readRejected)
+            res = None
+            return None
+        finally:
+            if self.COMsemaphore.available() < 1:
+                self.COMsemaphore.release(1)
+            #note: logged chars should be unicode not binary
+            settings = str(self.comport) + "," + str(self.baudrate) + "," + str(self.bytesize)+ "," + str(self.parity) + "," + str(self.stopbits) + "," + str(self.timeout)
+            self.addserial("MODBUS readRegisters :" + settings + " || Slave = " + str(slave) + " || Register = " + str(register) + " || Count = " + str(count) + " || Code = " + str(code) + " || Rx = " + str(None if res is None else res.registers))
+
+    # decodes the int, float or BCD value of an input from the given registers of a block read starting at offset
+    def decodeRegisters(self,registers,offset,isfloat=False,isbcd=False):
+        if isfloat:
+            decoder = getBinaryPayloadDecoderFromRegisters(registers[offset:offset+2], self.byteorderLittle, self.wordorderLittle)
+            return decoder.decode_32bit_float()
+        else:
+            decoder = getBinaryPayloadDecoderFromRegisters(registers[offset:offset+1], self.byteorderLittle, self.wordorderLittle)
+            r = decoder.decode_16bit_uint()
+            if isbcd:
+                return convert_from_bcd(r)
+            else:
+                return r
+
+    # returns the list of the (slave,register,code,isfloat,isbcd) settings of the 6 inputs; slave is 0 for inputs not configured
+    def inputSettings(self):
+        return [
+            (self.input1slave,self.input1register,self.input1code,self.input1float,self.input1bcd),
+            (self.input2slave,self.input2register,self.input2code,self.input2float,self.input2bcd),
+            (self.input3slave,self.input3register,self.input3code,self.input3float,self.input3bcd),
+            (self.input4slave,self.input4register,self.input4code,self.input4float,self.input4bcd),
+            (self.input5slave,self.input5register,self.input5code,self.input5float,self.input5bcd),
+            (self.input6slave,self.input6register,self.input6code,self.input6float,self.input6bcd)]
+
+    # returns the block reads covering the register inputs (function 3 and 4) of the given input settings
+    # the plan is cached and recomputed only if the input settings change
+    def blockReads(self,inputs):
+        if self.blockReadPlan is None or self.blockReadPlan[0] != inputs:
+            registerInputs = [(i,slave,register,code,bool(isfloat),bool(isbcd) and not isfloat)
+                for i,(slave,register,code,isfloat,isbcd) in enumerate(inputs) if slave and code in [3,4]]
+            self.blockReadPlan = (inputs,planBlockReads(registerInputs))
+        return self.blockReadPlan[1]
+
+    # reads all configured inputs and returns the list of their 6 values (None for inputs not configured or not read)
+    # register inputs of the same slave and function code located close to each other are fetched by one block read
+    # and decoded locally, coils and discrete inputs (function 1 and 2) are read one by one
+    def readInputs(self):
+        inputs = self.inputSettings()
+        res = [None]*len(inputs)
+        failed = []
+        for (slave,code,register,count,entries) in self.blockReads(inputs):
+            # we start with a sleep, as it could be that just a send command happend before the semaphore was catched
+            self.sleepBetween()
+            registers = self.readRegisters(slave,register,count,code)
+            if registers is None or len(registers) < count:
+                if len(entries) > 1 and registers is None and self.readRejected:
+                    # the device does not allow to read the unused registers of this block (it answered with an exception
+                    # response like illegal data address), we read its inputs one by one from now on
+                    # on timeouts and other transient failures the block is read again on the next call
+                    failed.append((slave,code,register,count,entries))
+                else:
+                    self.adderror(QApplication.translate("Error Message","Modbus Communication Error",None))
+                    self.commError = True
+            else:
+                for (i,offset,isfloat,isbcd) in entries:
+                    try:
+                        res[i] = self.decodeRegisters(registers,offset,isfloat,isbcd)
+                    except Exception:
+                        res[i] = None
+                if any(isbcd for (_,_,_,isbcd) in entries):
+                    time.sleep(0.020) # we add a small sleep between requests to help out the slow Loring electronic
+        if failed:
+            blocks = [b for b in self.blockReadPlan[1] if b not in failed]
+            for (slave,code,register,count,entries) in failed:
+                for (i,offset,isfloat,isbcd) in entries:
+                    self.sleepBetween()
+                    if isfloat:
+                        res[i] = self.readFloat(slave,register + offset,code)
+                    elif isbcd:
+                        res[i] = self.readBCD(slave,register + offset,code)
+                    else:
+                        res[i] = self.readSingleRegister(slave,register + offset,code)
+                    blocks.append((slave,code,register + offset,(2 if isfloat else 1),[(i,0,isfloat,isbcd)]))
+            self.blockReadPlan = (self.blockReadPlan[0],blocks)
+        for i,(slave,register,code,_,_) in enumerate(inputs):
+            if slave and code in [1,2]:
+                self.sleepBetween()
+                res[i] = self.readSingleRegister(slave,register,code)
+        return res
+
 
     def setTarget(self,sv):
         if self.PID_slave_ID:
@@ -619,3 +1000,272 @@ class modbusport(object):
             self.writeSingleRegister(self.PID_slave_ID,self.PID_i_register,i*multiplier)
             self.writeSingleRegister(self.PID_slave_ID,self.PID_d_register,d*multiplier)
         
+
+
+# Thread checking the connection of a modbusport in the background while it is connected, see modbusport.checkConnection()
+class modbusConnectionManager(QThread):
+    def __init__(self,modbus,interval=250):
+        QThread.__init__(self)
+        self.modbus = modbus
+        self.interval = interval # check interval in ms
+        self.running = True
+
+    def run(self):
+        while self.running:
+            self.msleep(self.interval)
+            if self.running:
+                try:
+                    self.modbus.checkConnection()
+                except Exception:
+                    pass
+
+
+# the kinds of writes of the modbusWriteQueue
+coil_write_kinds = ["coil","coils"] # coil writes, all other kinds write holding registers
+coalesced_write_kinds = ["register","word","bcd","coil"] # single writes that can replace a pending write of the same kind to the same register (or coil)
+batch_write_kinds = ["register","word","bcd"] # holding register writes that can be batched into one function 16 request
+# mask writes ("mask") are never coalesced nor batched as each one modifies the result of the previous one
+
+# a write pending in the modbusWriteQueue
+class modbusWrite(object):
+    __slots__ = ["kind","slave","register","value","priority","seq","group","callbacks"]
+
+    def __init__(self,kind,slave,register,value,priority,seq,group=None):
+        self.kind = kind
+        self.slave = slave
+        self.register = register
+        self.value = value
+        self.priority = priority # writes of lower priority value are delivered first
+        self.seq = seq # writes of the same priority are delivered in the order they were first queued
+        self.group = group # the writes queued by one action (or command sequence) share the same group and are never coalesced
+        self.callbacks = []
+
+    # the number of registers (or coils) written
+    def size(self):
+        if self.kind == "word":
+            return 2
+        elif self.kind in ["registers","coils"] and isinstance(self.value,list):
+            return len(self.value)
+        else:
+            return 1
+
+    # returns True if both writes modify at least one common register (or coil)
+    def overlaps(self,other):
+        return self.slave == other.slave and (self.kind in coil_write_kinds) == (other.kind in coil_write_kinds) and \
+            self.register < other.register + other.size() and other.register < self.register + self.size()
+
+
+# Thread delivering queued MODBUS writes, so that the issuer (like an event action triggered by a slider) does not wait
+# for the COMsemaphore held by the sampling
+# - a single write to a slave register (or coil) replaces the pending write of the same kind to that register queued by
+#   another action (the latest value wins), keeping its position in the queue; writes of the same action are never
+#   coalesced and neither are writes separated by another pending write to that register (like a mask write)
+# - pending writes of the lowest priority value are delivered first, those of the same priority in order, but a write
+#   never overtakes an earlier pending write to any of its registers (or coils)
+# - pending register writes of the same slave and priority to adjacent registers are batched into one function 16 request
+#   and pending coil writes into one function 15 request
+# - the callbacks of a write are called with True if the write (or the write replacing it) was delivered and False otherwise
+class modbusWriteQueue(QThread):
+
+    max_batch_registers = 100 # maximal number of registers of one batched write (the MODBUS spec allows up to 123)
+    max_batch_coils = 800 # maximal number of coils of one batched write (the MODBUS spec allows up to 1968)
+
+    def __init__(self,modbus):
+        QThread.__init__(self)
+        self.modbus = modbus
+        self.batching = True # if False, each write is delivered on its own
+        self.mutex = QMutex()
+        self.workAvailable = QWaitCondition()
+        self.idle = QWaitCondition()
+        self.pending = [] # the pending modbusWrite objects
+        self.busy = False # True while a batch is delivered
+        self.running = False
+        self.seq = 0
+
+    # queues a write of the given kind (see modbusQueuedWriter)
+    # group identifies the action (or command sequence) issuing the write; writes of the same group are never coalesced
+    def put(self,kind,slave,register,value,priority=0,callback=None,group=None):
+        write = modbusWrite(kind,int(slave),int(register),value,priority,0,group)
+        self.mutex.lock()
+        try:
+            entry = None
+            if kind in coalesced_write_kinds:
+                # the latest pending write to the same registers is replaced only if it is a single write of the same kind
+                # to the same register issued by another action
+                overlapping = [w for w in self.pending if w.overlaps(write)]
+                if overlapping:
+                    last = max(overlapping,key=lambda w: w.seq)
+                    if last.kind == kind and last.register == write.register and (group is None or last.group is not group):
+                        entry = last
+            if entry is None:
+                self.seq += 1
+                write.seq = self.seq
+                entry = write
+                self.pending.append(entry)
+            else: # the latest value wins
+                entry.value = write.value
+                entry.group = write.group
+                entry.priority = min(entry.priority,write.priority)
+            if callback is not None:
+                entry.callbacks.append(callback)
+            if not self.running:
+                self.running = True
+                self.start()
+            self.workAvailable.wakeAll()
+        finally:
+            self.mutex.unlock()
+
+    # waits until all pending writes are delivered
+    def flush(self):
+        self.mutex.lock()
+        try:
+            while self.pending or self.busy:
+                self.idle.wait(self.mutex)
+        finally:
+            self.mutex.unlock()
+
+    # delivers all pending writes and stops the thread
+    def stop(self):
+        self.mutex.lock()
+        try:
+            self.running = False
+            self.workAvailable.wakeAll()
+        finally:
+            self.mutex.unlock()
+        self.wait()
+
+    # returns True if no pending write queued before the given one modifies any of its registers (or coils),
+    # except for those in the given batch
+    def ready(self,write,batch=()):
+        return not any(w.seq < write.seq and w.overlaps(write) and w not in batch for w in self.pending)
+
+    # removes and returns the writes to be delivered next, to be called with the mutex locked
+    def nextBatch(self):
+        first = min((w for w in self.pending if self.ready(w)),key=lambda w: (w.priority,w.seq))
+        batch = [first]
+        if self.batching and (first.kind in batch_write_kinds or first.kind == "coil"):
+            if first.kind == "coil":
+                kinds = ["coil"]
+                limit = self.max_batch_coils
+            else:
+                kinds = batch_write_kinds
+                limit = self.max_batch_registers
+            candidates = [w for w in self.pending if w is not first and w.kind in kinds and w.slave == first.slave and w.priority == first.priority and
+                not w.overlaps(first) and self.ready(w,[first])]
+            starts = dict((w.register,w) for w in candidates)
+            ends = dict((w.register + w.size(),w) for w in candidates)
+            start = first.register
+            end = first.register + first.size()
+            while end in starts and end + starts[end].size() - start <= limit:
+                w = starts.pop(end)
+                batch.append(w)
+                end += w.size()
+            while start in ends and end - ends[start].register <= limit and ends[start] not in batch:
+                w = ends.pop(start)
+                batch.insert(0,w)
+                start = w.register
+        for w in batch:
+            self.pending.remove(w)
+        return batch
+
+    # delivers the given batch and returns True on success
+    def deliver(self,batch):
+        try:
+            self.modbus.sleepBetween(write=True)
+            first = batch[0]
+            if len(batch) == 1:
+                if first.kind == "register":
+                    return self.modbus.writeSingleRegister(first.slave,first.register,first.value)
+                elif first.kind == "word":
+                    return self.modbus.writeWord(first.slave,first.register,first.value)
+                elif first.kind == "bcd":
+                    return self.modbus.writeBCD(first.slave,first.register,first.value)
+                elif first.kind == "registers":
+                    return self.modbus.writeRegisters(first.slave,first.register,first.value)
+                elif first.kind == "coil":
+                    return self.modbus.writeCoil(first.slave,first.register,first.value)
+                elif first.kind == "coils":
+                    return self.modbus.writeCoils(first.slave,first.register,first.value)
+                elif first.kind == "mask":
+                    return self.modbus.maskWriteRegister(first.slave,first.register,first.value[0],first.value[1])
+                return False
+            elif first.kind == "coil":
+                return self.modbus.writeCoils(first.slave,first.register,[w.value for w in batch])
+            else:
+                payload = []
+                for w in batch:
+                    payload.extend(self.modbus.encodeRegisters(w.kind,w.value))
+                return self.modbus.writePayload(first.slave,first.register,payload)
+        except Exception:
+            return False
+
+    def run(self):
+        while True:
+            self.mutex.lock()
+            try:
+                while not self.pending and self.running:
+                    self.workAvailable.wait(self.mutex)
+                if not self.pending: # stopped
+                    break
+                batch = self.nextBatch()
+                self.busy = True
+            finally:
+                self.mutex.unlock()
+            res = self.deliver(batch)
+            for w in batch:
+                for callback in w.callbacks:
+                    try:
+                        callback(res)
+                    except Exception:
+                        pass
+            self.mutex.lock()
+            try:
+                self.busy = False
+                self.idle.wakeAll()
+            finally:
+                self.mutex.unlock()
+
+
+# Offers the write methods of the modbusport, but queues the writes with the given priority and callback
+# in the modbusWriteQueue of the modbusport instead of delivering them directly
+class modbusQueuedWriter(object):
+    def __init__(self,queue,priority=0,callback=None):
+        self.queue = queue
+        self.priority = priority
+        self.callback = callback
+
+    # all writes of one modbusQueuedWriter belong to the same group and are thus never coalesced with each other
+    def put(self,kind,slave,register,value):
+        self.queue.put(kind,slave,register,value,self.priority,self.callback,self)
+
+    def writeCoils(self,slave,register,values):
+        self.put("coils",slave,register,list(values))
+
+    def writeCoil(self,slave,register,value):
+        self.put("coil",slave,register,value)
+
+    def writeRegister(self,slave,register,value):
+        if stringp(value):
+            if "." in value:
+                self.writeWord(slave,register,value)
+            else:
+                self.writeSingleRegister(slave,register,value)
+        elif isinstance(value, int):
+            self.writeSingleRegister(slave,register,value)
+        elif isinstance(value, float):
+            self.writeWord(slave,register,value)
+
+    def writeSingleRegister(self,slave,register,value):
+        self.put("register",slave,register,int(value))
+
+    def maskWriteRegister(self,slave,register,and_mask,or_mask):
+        self.put("mask",slave,register,(int(and_mask),int(or_mask)))
+
+    def writeRegisters(self,slave,register,values):
+        self.put("registers",slave,register,values)
+
+    def writeWord(self,slave,register,value):
+        self.put("word",slave,register,float(value))
+
+    def writeBCD(self,slave,register,value):
+        self.put("bcd",slave,register,int(value))
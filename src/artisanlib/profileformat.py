@@ -0,0 +1,154 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# ABOUT
+# Binary profile container of the open-source roast logging software Artisan.
+# A binary profile stores the profile metadata as JSON and the time series (timex, temp1, temp2 and the
+# extra device series) as arrays of little-endian float64 values, thus loading a profile does not require
+# parsing the textual float lists of the .alog format.
+#
+# Layout:
+#   header    magic (8 bytes), flags (uint8), 3 reserved bytes, length of the metadata (uint32)
+#   metadata  UTF-8 encoded JSON object {"profile":<the profile without its time series>,"arrays":[[key,idx,count],..]}
+#             idx is None for the series timex, temp1, temp2 and the device index for extratimex, extratemp1, extratemp2
+#   arrays    the values of all series concatenated in the order of "arrays", zlib compressed if the flag COMPRESSED is set
+# Missing readings (None) are stored as NaN.
+
+# LICENSE
+# This program or module is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 2 of the License, or
+# version 3 of the License, or (at your option) any later versison. It is
+# provided for educational purposes and is distributed in the hope that
+# it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See
+# the GNU General Public License for more details.
+
+import ast
+import codecs
+import json
+import struct
+import zlib
+
+import numpy
+
+magic = b"ALOGBIN1"
+header = struct.Struct("<8sB3xI")
+
+# flags
+COMPRESSED = 1
+
+dtype = numpy.dtype("<f8")
+
+# the time series stored as arrays
+series_keys = ["timex","temp1","temp2"]
+extra_series_keys = ["extratimex","extratemp1","extratemp2"]
+
+class ProfileFormatError(ValueError):
+    pass
+
+# returns True if the file starts with the binary profile magic
+def isBinaryProfile(filename):
+    try:
+        with open(filename,"rb") as f:
+            return f.read(len(magic)) == magic
+    except Exception:
+        return False
+
+# returns the numpy array of the given series or None if it contains non numeric values
+def seriesArray(values):
+    try:
+        return numpy.array(values,dtype=dtype)
+    except (TypeError,ValueError):
+        return None
+
+def seriesList(a):
+    return [(None if v != v else v) for v in a.tolist()]
+
+# returns the given profile dict encoded as binary profile
+def dumps(profile,compression=True):
+    meta = dict(profile)
+    arrays = []
+    blobs = []
+    for key in series_keys:
+        if key in meta:
+            a = seriesArray(meta[key])
+            if a is not None:
+                del meta[key]
+                arrays.append([key,None,len(a)])
+                blobs.append(a.tobytes())
+    for key in extra_series_keys:
+        if key in meta:
+            extra = [seriesArray(s) for s in meta[key]]
+            if extra and all(a is not None for a in extra):
+                del meta[key]
+                for i,a in enumerate(extra):
+                    arrays.append([key,i,len(a)])
+                    blobs.append(a.tobytes())
+    metadata = json.dumps({"profile":meta,"arrays":arrays},separators=(",",":"))
+    if not isinstance(metadata,bytes):
+        metadata = metadata.encode("utf-8")
+    data = b"".join(blobs)
+    flags = 0
+    if compression:
+        data = zlib.compress(data,1)
+        flags |= COMPRESSED
+    return header.pack(magic,flags,len(metadata)) + metadata + data
+
+# returns the flags, the decoded metadata and the offset of the arrays of the given binary profile data (or its prefix)
+def loadsMetadata(data):
+    if len(data) < header.size:
+        raise ProfileFormatError("truncated binary profile")
+    m,flags,n = header.unpack(data[:header.size])
+    if m != magic:
+        raise ProfileFormatError("not a binary profile")
+    if len(data) < header.size + n:
+        raise ProfileFormatError("truncated binary profile")
+    return flags, json.loads(data[header.size:header.size + n].decode("utf-8")), header.size + n
+
+# returns the profile dict of the given binary profile data
+def loads(data):
+    flags,metadata,offset = loadsMetadata(data)
+    profile = metadata["profile"]
+    arrays = metadata["arrays"]
+    blob = data[offset:]
+    if flags & COMPRESSED:
+        blob = zlib.decompress(blob)
+    values = numpy.frombuffer(blob,dtype=dtype)
+    if len(values) != sum(count for _,_,count in arrays):
+        raise ProfileFormatError("corrupt binary profile")
+    for key in extra_series_keys:
+        if any(k == key for k,_,_ in arrays):
+            profile[key] = []
+    pos = 0
+    for key,i,count in arrays:
+        s = seriesList(values[pos:pos+count])
+        pos += count
+        if i is None:
+            profile[key] = s
+        else:
+            profile[key].append(s)
+    return profile
+
+# writes the profile dict to filename in the binary format
+def writeBinaryProfile(filename,profile,compression=True):
+    data = dumps(profile,compression)
+    with open(filename,"wb") as f:
+        f.write(data)
+
+# reads the profile dict from the binary profile filename
+def readBinaryProfile(filename):
+    with open(filename,"rb") as f:
+        return loads(f.read())
+
+# reads the profile dict from filename in either the textual .alog format or the binary format
+def readProfile(filename):
+    if isBinaryProfile(filename):
+        return readBinaryProfile(filename)
+    else:
+        with codecs.open(filename,"rb",encoding="utf-8") as f:
+            return ast.literal_eval(f.read())
+
+# converts the profile source (in .alog or binary format) to the binary profile target
+def convertProfile(source,target,compression=True):
+    writeBinaryProfile(target,readProfile(source),compression)
@@ -0,0 +1,218 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# ABOUT
+# Metadata-only profile reader and metadata cache of the open-source roast logging software Artisan.
+# Reports over many profiles mostly need the title, dates, weights and a few event indices of each profile,
+# but not its time series. readProfileMetadata() parses only the metadata of a profile file and
+# LazyProfile loads the time series of a profile only if they are accessed.
+
+# LICENSE
+# This program or module is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 2 of the License, or
+# version 3 of the License, or (at your option) any later versison. It is
+# provided for educational purposes and is distributed in the hope that
+# it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See
+# the GNU General Public License for more details.
+
+import os
+import re
+import ast
+import codecs
+import json
+
+from artisanlib.profileformat import isBinaryProfile, readBinaryProfile, loadsMetadata, header, series_keys, extra_series_keys
+
+all_series_keys = series_keys + extra_series_keys
+
+# the characters that may occur in the textual representation of a (nested) list of numbers
+series_text = re.compile(r"^[\[\]\d\s,.eE+\-Noeinf]*$")
+
+# returns the position of the end of the textual list starting at pos or -1
+def endOfList(text,pos,nested):
+    if text.startswith("[]",pos):
+        return pos + 2
+    elif nested:
+        end = text.find("]]",pos)
+        return (end + 2 if end > -1 else -1)
+    else:
+        end = text.find("]",pos)
+        return (end + 1 if end > -1 else -1)
+
+# splits the textual .alog profile into the metadata text, where each time series is replaced by None,
+# and a dict mapping the series keys found to their textual lists
+def splitSeries(text):
+    spans = []
+    for key in all_series_keys:
+        m = re.search(r"""(['"])""" + key + r"""\1\s*:\s*""",text)
+        if m:
+            start = m.end()
+            end = endOfList(text,start,key in extra_series_keys)
+            if end == -1 or not series_text.match(text[start:end]):
+                raise ValueError("unexpected series format")
+            spans.append((start,end,key))
+    spans.sort()
+    parts = []
+    series = {}
+    pos = 0
+    for start,end,key in spans:
+        if start < pos:
+            raise ValueError("overlapping series")
+        parts.append(text[pos:start])
+        parts.append("None")
+        series[key] = text[start:end]
+        pos = end
+    parts.append(text[pos:])
+    return "".join(parts), series
+
+# returns the profile dict of the given file without its time series, and the list of the series keys of the file
+def readProfileMetadata(filename):
+    if isBinaryProfile(filename):
+        with open(filename,"rb") as f:
+            data = f.read(header.size)
+            data += f.read(header.unpack(data)[2])
+        _,metadata,_ = loadsMetadata(data)
+        keys = []
+        for key,_,_ in metadata["arrays"]:
+            if key not in keys:
+                keys.append(key)
+        profile = metadata["profile"]
+        keys += [key for key in all_series_keys if key in profile and key not in keys]
+    else:
+        with codecs.open(filename,"rb",encoding="utf-8") as f:
+            text = f.read()
+        try:
+            metatext,series = splitSeries(text)
+            profile = ast.literal_eval(metatext)
+        except Exception:
+            # fall back to the full parse
+            profile = ast.literal_eval(text)
+        keys = [key for key in all_series_keys if key in profile]
+    for key in keys:
+        profile.pop(key,None)
+    return profile, keys
+
+# reads the given time series of the profile file
+def readProfileSeries(filename,keys):
+    if isBinaryProfile(filename):
+        profile = readBinaryProfile(filename)
+        return dict((key,profile[key]) for key in keys if key in profile)
+    else:
+        with codecs.open(filename,"rb",encoding="utf-8") as f:
+            text = f.read()
+        try:
+            _,series = splitSeries(text)
+            return dict((key,ast.literal_eval(series[key])) for key in keys if key in series)
+        except Exception:
+            profile = ast.literal_eval(text)
+            return dict((key,profile[key]) for key in keys if key in profile)
+
+# returns the cache entry of the given profile file holding its metadata and the keys of its time series
+# together with the modification time and the size of the file the entry is valid for
+def metadataEntry(filename):
+    st = os.stat(filename)
+    metadata,series = readProfileMetadata(filename)
+    return {"mtime":st.st_mtime,"size":st.st_size,"metadata":metadata,"series":series}
+
+
+# A profile dict holding the metadata of a profile file, that loads its time series only on first access.
+# On accessing one time series, all time series of the file are loaded, as reports usually need timex together
+# with a temperature series.
+class LazyProfile(dict):
+
+    def __init__(self,filename,metadata,series):
+        dict.__init__(self,metadata)
+        self.filename = filename
+        self.series = list(series) # the keys of the time series not yet loaded
+
+    def load(self):
+        if self.series:
+            keys = self.series
+            self.series = []
+            self.update(readProfileSeries(self.filename,keys))
+
+    def __missing__(self,key):
+        if key in self.series:
+            self.load()
+            return dict.__getitem__(self,key)
+        raise KeyError(key)
+
+    def __contains__(self,key):
+        return key in self.series or dict.__contains__(self,key)
+
+    def get(self,key,default=None):
+        if key in self:
+            return self[key]
+        else:
+            return default
+
+
+# A cache of the metadata of profile files, kept in a JSON file.
+# Entries are keyed by the absolute path of the profile file and are valid as long as the modification time
+# and the size of the file do not change.
+class ProfileMetadataCache(object):
+
+    def __init__(self,path):
+        self.path = path # the path of the cache file
+        self.entries = None
+        self.dirty = False
+
+    def open(self):
+        if self.entries is None:
+            self.entries = {}
+            try:
+                if os.path.exists(self.path):
+                    with codecs.open(self.path,"rb",encoding="utf-8") as f:
+                        self.entries = json.load(f)
+            except Exception:
+                self.entries = {}
+
+    # returns the valid cache entry of the given profile file or None
+    def entry(self,filename):
+        self.open()
+        path = os.path.abspath(filename)
+        st = os.stat(path)
+        entry = self.entries.get(path)
+        if entry is None or entry["mtime"] != st.st_mtime or entry["size"] != st.st_size:
+            return None
+        else:
+            return entry
+
+    # adds the given entry (see metadataEntry()) of the given profile file
+    def add(self,filename,entry):
+        self.open()
+        self.entries[os.path.abspath(filename)] = entry
+        self.dirty = True
+
+    # returns the LazyProfile of the given profile file, reading its metadata from the cache if valid
+    def profile(self,filename):
+        path = os.path.abspath(filename)
+        entry = self.entry(path)
+        if entry is None:
+            entry = metadataEntry(path)
+            self.add(path,entry)
+        return LazyProfile(path,entry["metadata"],entry["series"])
+
+    # removes the entries of files that do not exist anymore
+    def prune(self):
+        self.open()
+        for path in list(self.entries.keys()):
+            if not os.path.exists(path):
+                del self.entries[path]
+                self.dirty = True
+
+    # writes the cache file if entries were added
+    def save(self):
+        if self.dirty and self.entries is not None:
+            d = os.path.dirname(self.path)
+            if d and not os.path.exists(d):
+                os.makedirs(d)
+            tmp = self.path + ".tmp"
+            with codecs.open(tmp,"wb",encoding="utf-8") as f:
+                json.dump(self.entries,f)
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            os.rename(tmp,self.path)
+            self.dirty = False
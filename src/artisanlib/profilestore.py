@@ -0,0 +1,242 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# ABOUT
+# Array-backed storage for the profile data series of the open-source roast logging software Artisan.
+
+# LICENSE
+# This program or module is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 2 of the License, or
+# version 3 of the License, or (at your option) any later versison. It is
+# provided for educational purposes and is distributed in the hope that
+# it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See
+# the GNU General Public License for more details.
+
+import numpy
+
+# A growable float64 buffer that can be used in place of a Python list of numbers.
+# Values are stored in a preallocated numpy array that grows by a factor of 1.5 if full. None is stored
+# as NaN and read back as None, thus code testing elements against None keeps working while
+# matplotlib and numpy see the NaN sentinel as a gap.
+# view() (and numpy.asarray()) returns a zero-copy numpy array of the filled part of the buffer. Such a view
+# is only valid until the buffer grows the next time, thus it should be requested again on each use.
+# Compared to a list of Python floats (a pointer plus a float object per element) a column takes 8 bytes per element.
+class ProfileColumn(object):
+    __slots__ = ["data","length"]
+
+    initial_capacity = 256
+
+    def __init__(self,values=None,capacity=None):
+        if values is None:
+            values = []
+        n = len(values)
+        if capacity is None:
+            capacity = self.initial_capacity
+        self.data = numpy.empty(max(capacity,n),dtype=numpy.float64)
+        self.length = n
+        if n:
+            self.data[:n] = [numpy.nan if v is None else v for v in values]
+
+    # returns the zero-copy numpy array of the elements of this column
+    def view(self):
+        return self.data[:self.length]
+
+    def __array__(self,dtype=None,copy=None):
+        if dtype is None:
+            return self.view()
+        else:
+            return self.view().astype(dtype)
+
+    def tolist(self):
+        return [(None if v != v else v) for v in self.view().tolist()]
+
+    def grow(self,capacity):
+        if capacity > len(self.data):
+            data = numpy.empty(max(capacity,int(len(self.data)*1.5)+1),dtype=numpy.float64)
+            data[:self.length] = self.data[:self.length]
+            self.data = data
+
+    def append(self,v):
+        if self.length == len(self.data):
+            self.grow(self.length + 1)
+        self.data[self.length] = (numpy.nan if v is None else v)
+        self.length += 1
+
+    def extend(self,values):
+        values = list(values)
+        n = len(values)
+        self.grow(self.length + n)
+        self.data[self.length:self.length+n] = [numpy.nan if v is None else v for v in values]
+        self.length += n
+
+    def insert(self,i,v):
+        i = self.index_range(i,insert=True)
+        self.grow(self.length + 1)
+        self.data[i+1:self.length+1] = self.data[i:self.length].copy()
+        self.data[i] = (numpy.nan if v is None else v)
+        self.length += 1
+
+    def pop(self,i=-1):
+        i = self.index_range(i)
+        v = self[i]
+        self.data[i:self.length-1] = self.data[i+1:self.length].copy()
+        self.length -= 1
+        return v
+
+    def clear(self):
+        self.length = 0
+
+    def index_range(self,i,insert=False):
+        if i < 0:
+            i += self.length
+        if insert:
+            return max(0,min(i,self.length))
+        elif 0 <= i < self.length:
+            return i
+        else:
+            raise IndexError("ProfileColumn index out of range")
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self,i):
+        if isinstance(i,slice):
+            return [(None if v != v else v) for v in self.view()[i].tolist()]
+        else:
+            v = float(self.data[self.index_range(i)])
+            if v != v: # NaN sentinel
+                return None
+            else:
+                return v
+
+    def __setitem__(self,i,v):
+        if isinstance(i,slice):
+            values = self.tolist()
+            values[i] = list(v)
+            self.length = 0
+            self.extend(values)
+        else:
+            self.data[self.index_range(i)] = (numpy.nan if v is None else v)
+
+    def __iter__(self):
+        for v in self.view().tolist():
+            yield (None if v != v else v)
+
+    def __contains__(self,v):
+        if v is None:
+            return bool(numpy.isnan(self.view()).any())
+        else:
+            return bool((self.view() == v).any())
+
+    def index(self,v,start=0,stop=None):
+        a = self.view()[start:stop]
+        if v is None:
+            found = numpy.flatnonzero(numpy.isnan(a))
+        else:
+            found = numpy.flatnonzero(a == v)
+        if len(found):
+            return int(found[0]) + (self.index_range(start,insert=True) if start else 0)
+        raise ValueError("{0} is not in ProfileColumn".format(v))
+
+    # concatenation with lists results in lists
+    def __add__(self,other):
+        return self.tolist() + list(other)
+
+    def __radd__(self,other):
+        return list(other) + self.tolist()
+
+    def __eq__(self,other):
+        try:
+            return self.tolist() == list(other)
+        except TypeError:
+            return False
+
+    def __ne__(self,other):
+        return not self.__eq__(other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(self.tolist())
+
+
+# returns the zero-copy numpy view of the given ProfileColumn to be handed to matplotlib or numpy,
+# other sequences (like the lists of loaded profiles) are returned unchanged
+def columnView(values):
+    if isinstance(values,ProfileColumn):
+        return values.view()
+    else:
+        return values
+
+
+# A cached numpy copy of a sorted time series (like timex or timeB) to find indices of time values without
+# converting the whole list on each lookup.
+# The cache follows the list it is asked for: if the list object is the same and it just grew or its last
+# element was replaced (as done by sample()), only the new elements are copied; on any other change
+# (another list object, shorter list, modified first element) the cache is rebuilt. Modifications
+# of inner elements (like moving points in the designer) have to be signaled by calling invalidate().
+class TimeIndex(object):
+    __slots__ = ["source","column"]
+
+    def __init__(self):
+        self.source = None # the list cached (kept referenced such that its identity cannot be reused by another list)
+        self.column = ProfileColumn()
+
+    def invalidate(self):
+        self.source = None
+
+    # returns the numpy array of the given time list
+    def array(self,timearray):
+        if isinstance(timearray,ProfileColumn):
+            return timearray.view()
+        n = len(timearray)
+        m = len(self.column)
+        if self.source is not timearray or n < m or (m and (timearray[0] != self.column[0])):
+            self.column = ProfileColumn(timearray,capacity=n+256)
+            self.source = timearray
+        else:
+            if m and timearray[m-1] != self.column[m-1]:
+                # the last element was replaced
+                self.column[m-1] = timearray[m-1]
+            if n > m:
+                self.column.extend(timearray[m:])
+        return self.column.view()
+
+    # returns the index of the time in timearray closest to seconds or -1 if timearray is empty
+    def index(self,timearray,seconds):
+        a = self.array(timearray)
+        n = len(a)
+        if n:
+            #if input seconds longer than available time return last index
+            if seconds > a[-1]:
+                return n-1
+            #if given input seconds smaller than first time return first index
+            if seconds < a[0]:
+                return 0
+            i = int(numpy.searchsorted(a,seconds,side='left'))
+            if i < n - 1:
+                #look around (check if the value of the previous index is closer)
+                #return closest (smallest) index
+                if abs(a[i-1] - seconds) < abs(a[i] - seconds):
+                    i = i - 1
+            return i
+        else:
+            return -1
+
+    # vectorized index(); returns a numpy array of indices for the given sequence of seconds (all -1 if timearray is empty)
+    def indices(self,timearray,seconds):
+        a = self.array(timearray)
+        s = numpy.asarray(seconds,dtype=numpy.float64)
+        n = len(a)
+        if n == 0:
+            return numpy.full(s.shape,-1,dtype=numpy.intp)
+        i = numpy.searchsorted(a,s,side='left')
+        j = numpy.clip(i,0,n-1)
+        prev = numpy.clip(i-1,0,n-1)
+        closer = (i < n - 1) & (numpy.abs(a[prev] - s) < numpy.abs(a[j] - s))
+        i = numpy.where(closer,i-1,i)
+        i = numpy.where(s > a[-1],n-1,i)
+        i = numpy.where(s < a[0],0,i)
+        return i
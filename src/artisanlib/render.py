@@ -0,0 +1,231 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# ABOUT
+# Headless chart rendering of the open-source roast logging software Artisan.
+# Converts profiles to PNG/SVG/PDF chart images without touching the GUI. The chart settings are taken once from the
+# GUI process as a plain dict (see ApplicationWindow.chartRenderSettings()), each worker process sets up one figure on
+# the Agg backend from those settings (a ChartTemplate) and reuses it for all profiles it renders, replacing only the
+# artists that depend on the profile.
+# The chart is a simplified version of the one drawn by tgraphcanvas.redraw() (no curve smoothing, background profile,
+# statistics, event bars nor AUC and a plain RoR) and is used only if ApplicationWindow.fastImageConversion is set.
+
+# LICENSE
+# This program or module is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 2 of the License, or
+# version 3 of the License, or (at your option) any later versison. It is
+# provided for educational purposes and is distributed in the hope that
+# it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See
+# the GNU General Public License for more details.
+
+import os
+import time
+import multiprocessing
+
+import numpy
+
+from artisanlib.compat import d
+from artisanlib.profileformat import readProfile
+from artisanlib.scene import clearAxes
+from artisanlib.units import convertTemps
+
+# conversions over less profiles are rendered within the GUI process
+parallel_min_profiles = 4
+
+# the seconds the GUI process waits for the next result before processing its events again
+poll_interval = 0.05
+
+# the seconds the GUI process waits for the next result of the worker processes before it renders the remaining jobs
+# itself (a job taken by a worker process that dies is lost and its result would never arrive)
+result_timeout = 60
+
+# formats the given number of seconds as mm:ss
+def mmss(seconds):
+    m, s = divmod(int(round(abs(seconds))),60)
+    return "%s%02d:%02d"%(("-" if seconds < 0 else ""),m,s)
+
+# returns the RoR in degrees per minute over the given number of samples between CHARGE and DROP, None elsewhere
+def rateOfRise(timex,temps,span,start,end):
+    res = [None]*len(timex)
+    for i in range(max(span,start + span),min(end + 1,len(timex))):
+        t1 = temps[i]
+        t0 = temps[i - span]
+        dt = timex[i] - timex[i - span]
+        if t1 is not None and t0 is not None and dt > 0:
+            res[i] = (t1 - t0) / dt * 60.
+    return res
+
+
+# One figure of the size, palette, line styles and axis limits of the given settings, set up once per process.
+class ChartTemplate(object):
+
+    def __init__(self,settings):
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib import ticker
+        self.settings = settings
+        palette = settings["palette"]
+        self.fig = Figure(figsize=settings["size"],dpi=settings["dpi"],facecolor=palette["canvas"])
+        FigureCanvasAgg(self.fig)
+        self.ax = self.fig.add_subplot(111,facecolor=palette["background"])
+        self.ax.set_ylim(settings["ylimit_min"],settings["ylimit"])
+        self.ax.set_ylabel(settings["mode"],color=palette["ylabel"])
+        self.ax.grid(True,color=palette["grid"],linestyle=settings["gridstyle"],linewidth=settings["gridthickness"],alpha=settings["gridalpha"])
+        self.ax.yaxis.set_major_locator(ticker.MultipleLocator(settings["ygrid"]))
+        self.ax.xaxis.set_major_locator(ticker.MultipleLocator(settings["xgrid"]))
+        self.ax.set_xlabel(settings["xlabel"],color=palette["xlabel"])
+        if settings["delta"]:
+            self.delta_ax = self.ax.twinx()
+            self.delta_ax.set_ylim(settings["zlimit_min"],settings["zlimit"])
+            self.delta_ax.set_ylabel(settings["mode"] + settings["delta_unit"],color=palette["ylabel"])
+            self.delta_ax.yaxis.set_major_locator(ticker.MultipleLocator(settings["zgrid"]))
+        else:
+            self.delta_ax = None
+        self.fontfamily = settings["fontfamily"]
+
+    # removes the artists of the last profile
+    def clear(self):
+        clearAxes(self.ax)
+        if self.delta_ax is not None:
+            clearAxes(self.delta_ax)
+        self.fig.suptitle("")
+
+    # renders the given profile into the given file, the format is taken from the file extension
+    def render(self,profile,filename):
+        from matplotlib import ticker
+        s = self.settings
+        palette = s["palette"]
+        self.clear()
+        mode = profile.get("mode",s["mode"])
+        timex = profile.get("timex",[])
+        temp1 = convertTemps(profile.get("temp1",[]),mode,s["mode"])
+        temp2 = convertTemps(profile.get("temp2",[]),mode,s["mode"])
+        timeindex = profile.get("timeindex",[-1,0,0,0,0,0,0,0])
+        charge = (timex[timeindex[0]] if timeindex[0] > -1 and timeindex[0] < len(timex) else 0)
+        drop_idx = (timeindex[6] if timeindex[6] and timeindex[6] < len(timex) else len(timex) - 1)
+
+        # x-axis as set by ApplicationWindow.setProfile()
+        xmin = profile.get("xmin",s["startofx"])
+        xmax = profile.get("xmax",(timex[-1] + 40 - charge if timex else s["endofx"]))
+        self.ax.set_xlim(xmin,xmax + charge)
+        self.ax.xaxis.set_major_locator(ticker.FixedLocator(numpy.arange(charge - s["xgrid"]*int((charge - xmin)//s["xgrid"] + 1),xmax + charge + s["xgrid"],s["xgrid"])))
+        self.ax.xaxis.set_major_formatter(ticker.FuncFormatter(lambda x,_: mmss(x - charge)))
+
+        handles = []
+        # extra curves
+        extratimex = profile.get("extratimex",[])
+        for i in range(len(extratimex)):
+            for n,visibility in [("1",s["extraCurveVisibility1"]),("2",s["extraCurveVisibility2"])]:
+                linewidths = s["extralinewidths" + n]
+                linestyles = s["extralinestyles" + n]
+                temps = profile.get("extratemp" + n,[])
+                colors = profile.get("extradevicecolor" + n,[])
+                names = profile.get("extraname" + n,[])
+                hints = profile.get("extraNoneTempHint" + n,[])
+                if i < len(visibility) and visibility[i] and i < len(temps) and len(temps[i]) == len(extratimex[i]):
+                    l, = self.ax.plot(extratimex[i],(temps[i] if i < len(hints) and hints[i] else convertTemps(temps[i],mode,s["mode"])),color=(d(colors[i]) if i < len(colors) else palette["xt"]),
+                        linewidth=(linewidths[i] if i < len(linewidths) else s["extralinewidth"]),linestyle=(linestyles[i] if i < len(linestyles) else "-"),
+                        label=(d(names[i]) if i < len(names) else ""))
+                    handles.append(l)
+        # ET/BT
+        if s["ETcurve"] and len(temp1) == len(timex):
+            l, = self.ax.plot(timex,temp1,color=palette["et"],linewidth=s["ETlinewidth"],linestyle=s["ETlinestyle"],label=s["ETlabel"])
+            handles.append(l)
+        if s["BTcurve"] and len(temp2) == len(timex):
+            l, = self.ax.plot(timex,temp2,color=palette["bt"],linewidth=s["BTlinewidth"],linestyle=s["BTlinestyle"],label=s["BTlabel"])
+            handles.append(l)
+        # RoR between CHARGE and DROP
+        if self.delta_ax is not None and len(timex) > 1:
+            start = max(0,timeindex[0])
+            if s["DeltaETflag"] and len(temp1) == len(timex):
+                l, = self.delta_ax.plot(timex,rateOfRise(timex,temp1,s["deltasamples"],start,drop_idx),color=palette["deltaet"],
+                    linewidth=s["ETdeltalinewidth"],linestyle=s["ETdeltalinestyle"],label=s["DeltaETlabel"])
+                handles.append(l)
+            if s["DeltaBTflag"] and len(temp2) == len(timex):
+                l, = self.delta_ax.plot(timex,rateOfRise(timex,temp2,s["deltasamples"],start,drop_idx),color=palette["deltabt"],
+                    linewidth=s["BTdeltalinewidth"],linestyle=s["BTdeltalinestyle"],label=s["DeltaBTlabel"])
+                handles.append(l)
+        # event markers on BT
+        fmt = ("%.1f" if s["LCDdecimalplaces"] else "%.0f")
+        for i,label in enumerate(s["eventlabels"]):
+            if i < len(timeindex) and (timeindex[i] > 0 or (i == 0 and timeindex[i] > -1)) and timeindex[i] < len(timex) and temp2[timeindex[i]] is not None:
+                x = timex[timeindex[i]]
+                y = temp2[timeindex[i]]
+                text = u"%s\n%s\n%s"%(label,fmt%y,mmss(x - charge))
+                self.ax.annotate(text,xy=(x,y),xytext=(x,y + (s["ylimit"] - s["ylimit_min"])/10.),fontsize="x-small",family=self.fontfamily,
+                    color=palette["text"],ha="center",arrowprops=dict(arrowstyle="-",color=palette["text"]))
+        # title and legend
+        self.fig.suptitle(d(profile.get("title","")),color=palette["title"],family=self.fontfamily)
+        if handles and s["legendloc"]:
+            leg = self.ax.legend(handles,[h.get_label() for h in handles],loc=s["legendloc"],fontsize="x-small",framealpha=0.4,fancybox=True)
+            leg.get_frame().set_facecolor(palette["legendbg"])
+            leg.get_frame().set_edgecolor(palette["legendborder"])
+
+        ext = os.path.splitext(filename)[1].lower()
+        if ext == ".png":
+            self.fig.savefig(filename,dpi=s["dpi"],facecolor=self.fig.get_facecolor())
+        else:
+            # transparent=True is need to get the delta curves and legend drawn
+            self.fig.savefig(filename,transparent=True,facecolor="none",edgecolor="none")
+
+# the chart template of the worker process, set up by initWorker()
+template = None
+
+def initWorker(settings):
+    global template
+    template = ChartTemplate(settings)
+
+# the job run by the worker processes: renders the profile of the given file into the given target file
+# returns the target and None on success or the error message
+def renderJob(args):
+    filename,target = args
+    try:
+        template.render(readProfile(filename),target)
+        return target, None
+    except Exception as e:
+        return target, str(e)
+
+# renders the given (profile file,target file) jobs with the given chart settings using worker processes
+# returns the list of (target,error) of all jobs, error being None on success
+#  progress: called with the number of jobs done so far, also while waiting for results, thus the GUI can process its events
+#  processes: the number of worker processes (defaults to the number of CPUs)
+def renderProfiles(jobs,settings,progress=None,processes=None):
+    global template
+    res = []
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    if len(jobs) >= parallel_min_profiles and processes > 1:
+        pool = None
+        try:
+            pool = multiprocessing.Pool(processes=min(processes,len(jobs)),initializer=initWorker,initargs=(settings,))
+            it = pool.imap_unordered(renderJob,jobs)
+            last_result = time.time()
+            while len(res) < len(jobs):
+                try:
+                    res.append(it.next(poll_interval))
+                    last_result = time.time()
+                except multiprocessing.TimeoutError:
+                    if time.time() - last_result > result_timeout:
+                        # a worker process died or hangs
+                        break
+                if progress is not None:
+                    progress(len(res))
+            pool.close()
+        except Exception:
+            # fall back to the sequential rendering of the jobs not yet done
+            pass
+        finally:
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+    if len(res) < len(jobs):
+        done = set(r[0] for r in res)
+        template = ChartTemplate(settings)
+        for job in jobs:
+            if job[1] not in done:
+                res.append(renderJob(job))
+                if progress is not None:
+                    progress(len(res))
+    return res
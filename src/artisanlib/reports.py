@@ -0,0 +1,310 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# ABOUT
+# Report data extraction of the open-source roast logging software Artisan.
+# The production and ranking data of a profile only depend on the profile itself and on a few settings,
+# thus they can be computed in worker processes, one profile per job, while the GUI process merges the results.
+
+# LICENSE
+# This program or module is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 2 of the License, or
+# version 3 of the License, or (at your option) any later versison. It is
+# provided for educational purposes and is distributed in the hope that
+# it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See
+# the GNU General Public License for more details.
+
+import multiprocessing
+
+from PyQt5.QtCore import QDate, QTime, QDateTime, Qt
+
+from artisanlib.compat import d
+from artisanlib.auc import AUC
+from artisanlib.profilemetadata import LazyProfile, metadataEntry
+
+# reports over less profiles are computed within the GUI process
+parallel_min_profiles = 16
+
+def cuppingSum(flavors):
+    score = 0.
+    nflavors = len(flavors)
+    for i in range(nflavors):   
+        score += flavors[i]
+    score /= (nflavors)
+    score *= 10.
+    return score
+
+# extracts the following from a give profile dict in a new dict:
+#  . "batchprefix": string
+#  . "batchnr": int
+#  . "title": string
+#  . "roastdate": QDateTime
+#  . "beans": string
+#  . "weight": [<weight-in>:float,<weight-out>:float,<units>: string] or None
+def profileProductionData(profile):
+    res = {}
+    # id ("prefix+nr (sequence)")
+    if "roastbatchprefix" in profile:
+        res["batchprefix"] = d(profile["roastbatchprefix"])
+    else:
+        res["batchprefix"] = ""
+    # batch number
+    if "roastbatchnr" in profile:
+        res["batchnr"] = int(profile["roastbatchnr"])
+    else:
+        res["batchnr"] = 0
+    # title
+    if "title" in profile:
+        res["title"] = d(profile["title"])
+    else:
+        res["title"] = ""
+    # date and time
+    res["roastdate"] = None
+    if "roastdate" in profile:
+        try:
+            date = QDate.fromString(d(profile["roastdate"]))
+            if "roasttime" in profile:
+                try:
+                    time = QTime.fromString(d(profile["roasttime"]))
+                    res["roastdate"] = QDateTime(date,time)
+                except Exception:
+                    res["roastdate"] = QDateTime(date)
+            else:
+                res["roastdate"] = QDateTime(date)
+        except Exception:
+            pass
+    if "roastisodate" in profile:
+        try:
+            date = QDate.fromString(d(profile["roastisodate"]), Qt.ISODate)
+            if "roasttime" in profile:
+                try:
+                    time = QTime.fromString(d(profile["roasttime"]))
+                    res["roastdate"] = QDateTime(date,time)
+                except Exception:
+                    res["roastdate"] = QDateTime(date)
+            else:
+                res["roastdate"] = QDateTime(date)
+        except Exception:
+            pass
+    # beans
+    if "beans" in profile:
+        res["beans"] = d(profile["beans"])
+    else:
+        res["beans"] = ""
+    # weight
+    if "weight" in profile:
+        res["weight"] = [profile["weight"][0],profile["weight"][1],d(profile["weight"][2])]
+    return res
+
+# extracts the following from a give profile dict in a new dict:
+#  . "temp_unit": string (temperature unit, F or C)
+#  . "timex" : [] array of sample times
+#  . "temp2" : [] array of temperatures
+#  . "charge_temp": int
+#  . "FCs_time": int (in seconds)
+#  . "FCs_temp": string
+#  . "DROP_time": int (in seconds)
+#  . "DROP_temp": string
+#  . "DRY_percent": float (first phase percentage)
+#  . "MAI_percent": float (second phase percentage)
+#  . "DEV_percent": float (third phase percentage)
+#  . "DRY_time": int (in seconds) 
+#  . "MAI_time": int (in seconds) 
+#  . "DEV_time": int (in seconds) 
+#  . "AUC": int
+#  . "color": int
+#  . "cup": int
+#  . "timeindex": [] the event indices
+def profileRankingData(profile):
+    res = {}
+    # temp_unit
+    res["temp_unit"] = profile["mode"]
+    timex = profile["timex"]
+    res["timex"] = timex
+    timeindex = profile["timeindex"]
+    res["timeindex"] = timeindex
+    res["charge_idx"] = (timeindex[0] if timeindex[0] > -1 else 0)
+    res["drop_idx"] = (timeindex[6] if timeindex[6] > 0 else len(timex))
+    bt = profile["temp2"]        
+    res["temp"] = bt
+    # charge_temp
+    if timeindex[0] > -1:
+        start = timex[timeindex[0]]
+        res["charge_temp"] = bt[timeindex[0]]
+    else:
+        start = 0
+    if timeindex[2] > 0:
+        # FCs_time
+        res["FCs_time"] = timex[timeindex[2]] - start
+        # FCs_temp
+        res["FCs_temp"] = bt[timeindex[2]]
+    if timeindex[6] > 0:
+        # DROP_time
+        res["DROP_time"] = timex[timeindex[6]] - start
+        # DROP_temp
+        res["DROP_temp"] = bt[timeindex[6]]
+    total_time = (timex[timeindex[6]] - start)
+    # DRY_time
+    if timeindex[1] > 0:
+        # DRY_time
+        dry_time = timex[timeindex[1]] - start
+        # DRY_percent
+        res["DRY_percent"] = (dry_time/total_time) * 100.
+        res["DRY_time"] = dry_time
+    # MAI_time
+    if timeindex[1] > 0 and timeindex[2] > 0:
+        # MAI_time
+        mai_time = timex[timeindex[2]] - timex[timeindex[1]]
+        # MAI_percent
+        res["MAI_percent"] = (mai_time/total_time) * 100.
+        res["MAI_time"] = mai_time
+    if timeindex[2] > 0 and timeindex[6] > 0:
+        # DEV_time
+        dev_time = timex[timeindex[6]] - timex[timeindex[2]]
+        # DEV_percent
+        res["DEV_percent"] = (dev_time/total_time) * 100.
+        res["DEV_time"] = dev_time
+    # AUC
+    if "computed" in profile:
+        comp = profile["computed"]
+        if "AUC" in comp:
+            res["AUC"] = comp["AUC"]
+    # color
+    if "ground_color" in profile:
+        res["color"] = profile["ground_color"]
+    # cup
+    if "flavors" in profile:
+        res["cupping"] = cuppingSum(profile["flavors"])
+    return res
+
+# returns the index the AUC computation starts from given the AUCbegin setting (0: CHARGE, 1: TP, 2: DRY END, 3: FC START) or -1
+def AUCstartidx(AUCbegin,timeindex,TPindex):
+    if AUCbegin == 0 and timeindex[0] > -1: # start after CHARGE
+        idx = timeindex[0]
+    elif AUCbegin == 1 and TPindex: # start ater TP
+        idx = TPindex
+    elif AUCbegin == 2 and timeindex[1] > 0: # DRY END
+        idx = timeindex[1]
+    elif AUCbegin == 3 and timeindex[2] > 0: # FC START
+        idx = timeindex[2]
+    else:
+        idx = -1
+    return idx
+
+# returns the BT AUC of the profile computed with the given AUC settings (mode,AUCbegin,AUCbaseFlag,AUCbase)
+def profileAUC(profile,AUCsettings):
+    mode,AUCbegin,AUCbaseFlag,AUCbase = AUCsettings
+    AUCidx = max(0,AUCstartidx(AUCbegin,profile["timeindex"],profile["computed"]["TP_time"]))
+    if AUCbaseFlag:
+        # we take the base temperature from the BT at st
+        rtbt = profile["temp2"][AUCidx]
+    else:
+        rtbt = AUCbase
+    if mode == "F" and rtbt not in [-1,None]:
+        rtbt = (rtbt-32.0)*(5.0/9.0)
+    ed = min(len(profile["timex"]),profile["timeindex"][6])
+    return int(round(AUC(rtbt,profile["timex"],profile["temp2"],mode,AUCidx,ed)/60.))
+
+# returns the key reports are sorted by (the roast date in ms since epoch or 0)
+def profileSortKey(profile):
+    if "roastisodate" in profile and "roasttime" in profile:
+        return QDateTime(QDate.fromString(profile["roastisodate"], Qt.ISODate),QTime.fromString(profile["roasttime"])).toMSecsSinceEpoch()
+    else:
+        return 0
+
+# returns the report entry of the given profile as dict with the keys
+#  . "sortkey": the key reports are sorted by
+#  . "production": the production data of the profile
+#  . "ranking": the ranking data of the profile (if ranking is set) with the AUC recomputed if AUCsettings are given,
+#       None if the ranking data could not be computed
+#  . "error": the error message if the ranking data could not be computed, None otherwise
+def reportEntry(profile,ranking=False,AUCsettings=None):
+    res = {"sortkey":profileSortKey(profile),"production":profileProductionData(profile),"ranking":None,"error":None}
+    if ranking:
+        try:
+            rd = profileRankingData(profile)
+        except Exception as e:
+            res["error"] = str(e)
+            return res
+        if AUCsettings is not None:
+            # -- recompute AUC with actual settings
+            try:
+                rd["AUC"] = profileAUC(profile,AUCsettings)
+            except (KeyError,IndexError,TypeError,ValueError):
+                pass # keep the AUC stored in the profile
+        res["ranking"] = rd
+    return res
+
+# the job run by the worker processes: loads the profile of the given file and returns its report entry
+# together with the metadata cache entry of the file (see artisanlib.profilemetadata.metadataEntry()).
+# If the valid cache entry of the file is given, its metadata is not read again and None is returned instead.
+def loadReportEntry(args):
+    filename,entry,ranking,AUCsettings = args
+    new_entry = None
+    try:
+        if entry is None:
+            entry = new_entry = metadataEntry(filename)
+        profile = LazyProfile(filename,entry["metadata"],entry["series"])
+    except Exception:
+        # like ApplicationWindow.deserialize(), unreadable profiles are reported as empty
+        profile = {}
+    return reportEntry(profile,ranking,AUCsettings), new_entry
+
+# returns the report entries of the given profile files sorted by the roast date
+#  loader: the function to load a profile within the GUI process (used for small reports or if worker processes are not available)
+#  progress: called with the number of profiles processed so far
+#  processes: the number of worker processes (defaults to the number of CPUs)
+#  cache: the ProfileMetadataCache the metadata of the profiles is taken from and the metadata read by the worker processes is added to
+def reportEntries(files,loader,ranking=False,AUCsettings=None,progress=None,processes=None,cache=None):
+    res = []
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    if len(files) >= parallel_min_profiles and processes > 1:
+        pool = None
+        try:
+            entries = [None]*len(files)
+            jobs = []
+            for i,f in enumerate(files):
+                entry = None
+                if cache is not None:
+                    try:
+                        entry = cache.entry(f)
+                    except Exception:
+                        pass # left to the worker process
+                if entry is not None and not ranking:
+                    # production data of cached profiles is computed from the cached metadata only
+                    entries[i] = reportEntry(LazyProfile(f,entry["metadata"],entry["series"]))
+                else:
+                    jobs.append((i,(f,entry,ranking,AUCsettings)))
+            done = len(files) - len(jobs)
+            if progress is not None and done:
+                progress(done)
+            if jobs:
+                pool = multiprocessing.Pool(processes=min(processes,len(jobs)))
+                results = pool.imap(loadReportEntry,[j for _,j in jobs],chunksize=max(1,len(jobs)//(4*processes)))
+                for (i,(f,_,_,_)),(e,new_entry) in zip(jobs,results):
+                    entries[i] = e
+                    if cache is not None and new_entry is not None:
+                        cache.add(f,new_entry)
+                    done += 1
+                    if progress is not None:
+                        progress(done)
+                pool.close()
+            res = entries
+        except Exception:
+            # fall back to the sequential computation
+            res = []
+        finally:
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+    if len(res) != len(files):
+        res = []
+        for f in files:
+            res.append(reportEntry(loader(f),ranking,AUCsettings))
+            if progress is not None:
+                progress(len(res))
+    # sort by isodate (stable, thus profiles without date keep their order)
+    return sorted(res,key=lambda e: e["sortkey"])
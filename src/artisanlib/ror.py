@@ -0,0 +1,118 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# ABOUT
+# Streaming smoothing for the temperature and RoR computation of the open-source roast logging software Artisan.
+
+# LICENSE
+# This program or module is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 2 of the License, or
+# version 3 of the License, or (at your option) any later versison. It is
+# provided for educational purposes and is distributed in the hope that
+# it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See
+# the GNU General Public License for more details.
+
+# Decay weighted average over the last <window> values of a growing list
+#   numpy.average(values[-min(len(values),window):],weights=numpy.arange(1,window+1)[max(0,window-len(values)):])
+# computed in constant time per sample by keeping the values of the window in a ring buffer together with the
+# running sum S and the running weighted sum W of the window. On appending a value x all weights decrease by one,
+# the oldest value (of weight 1) drops out and x enters with weight window:
+#   W' = W - S + window * x
+#   S' = S - oldest + x
+# update(values) follows the list it is called with: if the list grew by one element, that element is appended;
+# if its length did not change, the last element is replaced (as done by sample() while not recording);
+# on any other change (reset, profile load, missed samples) the window is rebuilt from the tail of the list.
+class DecayAverage(object):
+    __slots__ = ["window","ring","head","count","S","W","length","last","pushes"]
+
+    # number of appends after which the running sums are recomputed from the ring buffer to avoid accumulating rounding errors
+    refresh = 256
+
+    def __init__(self,window=1):
+        self.setWindow(window)
+
+    def setWindow(self,window):
+        self.window = max(1,int(window))
+        self.reset()
+
+    def reset(self):
+        self.ring = [0.]*self.window # the values of the window, oldest at ring[head] once the window is full
+        self.head = 0 # position of the next value to be written
+        self.count = 0 # number of values in the window
+        self.S = 0.
+        self.W = 0.
+        self.length = 0 # the length of the list on the last call to update()
+        self.last = None # the value of the last element of the list on the last call to update()
+        self.pushes = 0
+
+    def rebuild(self,values):
+        self.reset()
+        for v in values[-self.window:]:
+            self.push(v)
+        self.length = len(values)
+        self.last = (values[-1] if self.length else None)
+
+    def push(self,x):
+        x = float(x)
+        if self.count < self.window:
+            self.W = self.W - self.S + self.window * x
+            self.S += x
+            self.count += 1
+        else:
+            oldest = self.ring[self.head]
+            self.W = self.W - self.S + self.window * x
+            self.S = self.S - oldest + x
+        self.ring[self.head] = x
+        self.head = (self.head + 1) % self.window
+        self.pushes += 1
+        if self.pushes % self.refresh == 0:
+            self.resum()
+
+    # replaces the most recent value of the window
+    def replace(self,x):
+        x = float(x)
+        i = (self.head - 1) % self.window
+        diff = x - self.ring[i]
+        self.ring[i] = x
+        self.S += diff
+        self.W += self.window * diff
+
+    # recompute the running sums from the ring buffer
+    def resum(self):
+        self.S = 0.
+        self.W = 0.
+        w = self.window - self.count + 1 # weight of the oldest value in the window
+        start = (self.head - self.count) % self.window
+        for k in range(self.count):
+            v = self.ring[(start + k) % self.window]
+            self.S += v
+            self.W += w * v
+            w += 1
+
+    # returns the decay weighted average over the last window values of the given list or None if the list is empty
+    def update(self,values):
+        n = len(values)
+        if n == 0:
+            self.reset()
+            return None
+        if n == self.length + 1:
+            self.push(values[-1])
+        elif n == self.length and self.count:
+            if values[-1] != self.last:
+                self.replace(values[-1])
+        else:
+            self.rebuild(values)
+        self.length = n
+        self.last = values[-1]
+        return self.average()
+
+    # returns the decay weighted average of the window or None if the window is empty
+    def average(self):
+        if self.count:
+            # sum of the weights window-count+1,..,window
+            weights = self.count * (2 * self.window - self.count + 1) / 2.
+            return self.W / weights
+        else:
+            return None
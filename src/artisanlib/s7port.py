@@ -7,6 +7,42 @@ from artisanlib.suppress_errors import suppress_stdout_stderr
 from PyQt5.QtCore import QSemaphore
 from PyQt5.QtWidgets import QApplication
 
+# the maximal number of bytes fetched by one block read (fitting into the 240 bytes of the smallest S7 PDU)
+max_block_bytes = 200
+# the maximal number of unused bytes between two channels fetched by the same block read
+max_block_gap = 16
+# the number of block reads failing in a row while connected after which the channels of the block are read one by one
+max_block_failures = 3
+# (parts of) the snap7 error messages raised by the PLC on reading bytes not available (like those of a gap between channels)
+address_errors = ["address out of range","item not available","invalid transport size","size over pdu"]
+
+# returns the list of block reads covering the given channels
+#  channels: list of (i,area,dbnumber,start,size) tuples with i the index of the channel and size its number of bytes
+# the channels are grouped by area and DB number and channels of one group, that are contiguous or separated by at
+# most max_gap unused bytes, are fetched by one block read of at most max_size bytes
+# returns a list of (area,dbnumber,start,size,[(i,offset,size),..]) tuples with offset the position of the
+# first byte of channel i within the bytes of the block
+def planBlockReads(channels,max_gap=max_block_gap,max_size=max_block_bytes):
+    groups = {}
+    order = []
+    for ch in channels:
+        key = (ch[1],ch[2])
+        if key not in groups:
+            groups[key] = []
+            order.append(key)
+        groups[key].append(ch)
+    blocks = []
+    for area,dbnumber in order:
+        block = None
+        for (i,_,_,start,size) in sorted(groups[(area,dbnumber)],key=lambda ch: ch[3]):
+            if block is not None and start - (block[2] + block[3]) <= max_gap and start + size - block[2] <= max_size:
+                block[3] = max(block[3],start + size - block[2])
+            else:
+                block = [area,dbnumber,start,size,[]]
+                blocks.append(block)
+            block[4].append((i,start - block[2],size))
+    return [tuple(b) for b in blocks]
+
 
 class s7port(object):
     def __init__(self,sendmessage,adderror,addserial):
@@ -54,6 +90,11 @@ class s7port(object):
         
         self.plc = None
         self.commError = False # True after a communication error was detected and not yet cleared by receiving proper data
+
+        self.blockReadPlan = None # the cached (channels,blocks) block read plan of the channels, see readChannels()
+        self.blockFailures = {} # maps block reads to the number of times they failed in a row while connected
+        self.readRejected = False # True if the last readArea() failed on an address error of the PLC
+        self.readings = {} # the channel readings of the last readChannels() not yet consumed by readChannel()
         
     def setPID(self,p,i,d,PIDmultiplier):
         if self.PID_area and not (self.PID_p_register == self.PID_i_register == self.PID_d_register == 0):
@@ -79,6 +120,7 @@ class s7port(object):
         return not (self.plc is None) and self.plc.get_connected()
         
     def disconnect(self):
+        self.readings = {}
         if self.isConnected():
             try:
                 self.plc.disconnect()
@@ -243,3 +285,101 @@ class s7port(object):
             if self.COMsemaphore.available() < 1:
                 self.COMsemaphore.release(1)
             self.addserial("S7 readInt")  
+
+    # reads size bytes of the given area (index into self.areas) starting at start and returns them as bytearray or None on failure
+    # on failure readRejected is set if the PLC refused the request with an address error
+    def readArea(self,area,dbnumber,start,size):
+        self.readRejected = False
+        try:
+            #### lock shared resources #####
+            self.COMsemaphore.acquire(1)
+            self.connect()
+            if self.plc is not None and self.plc.get_connected():
+                retry = self.readRetries
+                res = None
+                while True:
+                    try:
+                        with suppress_stdout_stderr():
+                            res = self.plc.read_area(self.areas[area],dbnumber,start,size)
+                    except Exception as e:
+                        res = None
+                        self.readRejected = any(err in str(e).lower() for err in address_errors)
+                    if res is None:
+                        if retry > 0:
+                            retry = retry - 1
+                        else:
+                            raise Exception("Communication error")
+                    else:
+                        break
+                if self.commError: # we clear the previous error and send a message
+                    self.commError = False
+                    self.adderror(QApplication.translate("Error Message","S7 Communication Resumed",None))
+                return res
+            else:
+                self.commError = True
+                self.adderror((QApplication.translate("Error Message","S7 Error:",None) + " connecting to PLC failed"))
+                return None
+        except Exception:
+            self.commError = True
+            return None
+        finally:
+            if self.COMsemaphore.available() < 1:
+                self.COMsemaphore.release(1)
+            self.addserial("S7 readArea")
+
+    # returns the block reads covering the configured channels, recomputed only if the channel configuration changes
+    def blockReads(self):
+        channels = [(i,self.area[i]-1,self.db_nr[i],self.start[i],(4 if self.type[i] else 2)) for i in range(self.channels) if self.area[i]]
+        if self.blockReadPlan is None or self.blockReadPlan[0] != channels:
+            self.blockReadPlan = (channels,planBlockReads(channels))
+        return self.blockReadPlan[1]
+
+    # reads all configured channels, fetching channels of the same area and DB located close to each other by one block read
+    # returns a dict mapping the channel indices to their values (-1 on failure)
+    def readChannels(self):
+        from snap7.util import get_real, get_int
+        res = {}
+        failed = []
+        for block in self.blockReads():
+            (area,dbnumber,start,size,entries) = block
+            key = (area,dbnumber,start,size)
+            ba = self.readArea(area,dbnumber,start,size)
+            if ba is None or len(ba) < size:
+                if len(entries) > 1 and self.isConnected():
+                    self.blockFailures[key] = self.blockFailures.get(key,0) + 1
+                if len(entries) > 1 and (self.readRejected or self.blockFailures.get(key,0) >= max_block_failures):
+                    # the PLC does not allow to read the unused bytes of this block (it answered with an address error or
+                    # keeps failing on it while connected), we read its channels one by one from now on
+                    # after a transient failure the block is read again on the next call
+                    self.blockFailures.pop(key,None)
+                    failed.append(block)
+                else:
+                    self.adderror(QApplication.translate("Error Message","S7 Communication Error",None))
+                    for (i,_,_) in entries:
+                        res[i] = -1
+            else:
+                self.blockFailures.pop(key,None)
+                for (i,offset,chsize) in entries:
+                    if chsize == 4:
+                        res[i] = get_real(ba,offset)
+                    else:
+                        res[i] = get_int(ba,offset)
+        if failed:
+            blocks = [b for b in self.blockReadPlan[1] if b not in failed]
+            for (area,dbnumber,start,size,entries) in failed:
+                for (i,offset,chsize) in entries:
+                    if chsize == 4:
+                        res[i] = self.readFloat(area,dbnumber,start + offset)
+                    else:
+                        res[i] = self.readInt(area,dbnumber,start + offset)
+                    blocks.append((area,dbnumber,start + offset,chsize,[(i,0,chsize)]))
+            self.blockReadPlan = (self.blockReadPlan[0],blocks)
+        return res
+
+    # returns the value of channel i (-1 on failure)
+    # all configured channels are read at once on the first request of a sampling round and the following requests for
+    # other channels of the same round (like those of the extra S7 devices) are served from those readings
+    def readChannel(self,i):
+        if i not in self.readings:
+            self.readings = self.readChannels()
+        return self.readings.pop(i,-1)
@@ -0,0 +1,129 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# ABOUT
+# Aggregation of multiple readings per sampling interval for the open-source roast logging software Artisan.
+
+# LICENSE
+# This program or module is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 2 of the License, or
+# version 3 of the License, or (at your option) any later versison. It is
+# provided for educational purposes and is distributed in the hope that
+# it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See
+# the GNU General Public License for more details.
+
+import math
+from collections import deque
+
+# aggregation modes
+MEAN = 0
+MEDIAN = 1
+LAST = 2
+TRIMMED_MEAN = 3
+
+# the proportion of the values cut off at each end by trimmed_mean()
+trim_proportion = 0.25
+
+def mean(values):
+    return sum(values) / float(len(values))
+
+def median(values):
+    s = sorted(values)
+    n = len(s)
+    if n % 2:
+        return s[n // 2]
+    else:
+        return (s[n // 2 - 1] + s[n // 2]) / 2.0
+
+# returns the mean of the values left after cutting off the given proportion of the smallest and the largest values
+def trimmed_mean(values,proportion=trim_proportion):
+    s = sorted(values)
+    k = int(len(s) * proportion)
+    if k and len(s) > 2*k:
+        s = s[k:-k]
+    return mean(s)
+
+# returns the sample standard deviation of the given list of at least two values
+def stdev(values):
+    m = mean(values)
+    return math.sqrt(sum((v - m)**2 for v in values) / (len(values) - 1))
+
+# returns the aggregate of the given non-empty list of values in the given mode
+def aggregate(values,mode=MEAN):
+    if mode == MEDIAN:
+        return median(values)
+    elif mode == TRIMMED_MEAN:
+        return trimmed_mean(values)
+    elif mode == LAST:
+        return values[-1]
+    else:
+        return mean(values)
+
+
+# Collects the readings of a channel delivered by change events between two samples.
+# add() is called from the event thread of the device library and interval() from the sampling thread. Both only use
+# the atomic append()/popleft() operations of a deque, thus no lock is needed and no reading is lost.
+class ChannelAccumulator(object):
+    __slots__ = ["values","stats"]
+
+    max_values = 4096 # the oldest readings are dropped if more readings are collected per interval
+
+    def __init__(self):
+        self.values = deque(maxlen=self.max_values)
+        self.stats = None # the (value,min,max,count) of the last interval holding readings
+
+    def add(self,v):
+        self.values.append(v)
+
+    # drops all readings collected
+    def clear(self):
+        self.values.clear()
+        self.stats = None
+
+    # returns the aggregate of the readings collected since the last call in the given mode or None if there were none
+    # the aggregate, min, max and count of those readings are kept in stats
+    def interval(self,mode=MEAN):
+        values = []
+        try:
+            while True:
+                values.append(self.values.popleft())
+        except IndexError:
+            pass
+        if values:
+            v = aggregate(values,mode)
+            self.stats = (v,min(values),max(values),len(values))
+            return v
+        else:
+            return None
+
+
+# Noise statistics of a channel read several times per sampling interval.
+# update() takes the readings of one interval and accounts for their standard deviation.
+class ChannelNoise(object):
+    __slots__ = ["n","last","total","max"]
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.n = 0 # the number of intervals accounted for
+        self.last = None # the standard deviation of the readings of the last interval
+        self.total = 0. # the sum of the standard deviations of all intervals
+        self.max = 0. # the largest standard deviation of all intervals
+
+    def update(self,values):
+        if len(values) > 1:
+            sd = stdev(values)
+            self.n += 1
+            self.last = sd
+            self.total += sd
+            self.max = max(self.max,sd)
+
+    # returns the standard deviation of the last interval, the mean and the max standard deviation over all intervals
+    def stats(self):
+        if self.n:
+            return self.last, self.total / self.n, self.max
+        else:
+            return None, None, None
@@ -0,0 +1,214 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# ABOUT
+# Retained artists of the roast chart of the open-source roast logging software Artisan.
+# Instead of wiping out the figure on each redraw, the axes are kept and cleared of all artists except those of the
+# retained layers. A RetainedLayer keeps the artists of a part of the chart that is expensive to build (like a long
+# background profile with its annotations) together with a signature of everything they were built from, and is
+# reused by the next redraw as long as that signature does not change.
+# The artists updated on each sample are animated instead: they are excluded from the cached background and blitted
+# on top of it, and the time taken by those chart updates is accounted for by a FrameBudget.
+# Long static lines are decimated to the points visible per pixel by a LevelOfDetail, recomputed on changes of the view.
+
+# LICENSE
+# This program or module is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 2 of the License, or
+# version 3 of the License, or (at your option) any later versison. It is
+# provided for educational purposes and is distributed in the hope that
+# it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See
+# the GNU General Public License for more details.
+
+import numpy
+
+# returns an immutable copy of the given value to be compared with later states of it
+# lists, tuples and numpy arrays become tuples (one level of nesting is copied), dicts become sorted tuples of items
+def snapshot(v):
+    if isinstance(v,dict):
+        return tuple(sorted((k,snapshot(x)) for k,x in v.items()))
+    elif isinstance(v,numpy.ndarray):
+        return tuple(v.tolist())
+    elif isinstance(v,(list,tuple)):
+        if len(v) and isinstance(v[0],(list,tuple,numpy.ndarray)):
+            return tuple(snapshot(x) for x in v)
+        else:
+            return tuple(v)
+    else:
+        return v
+
+# returns the lists of artists held by the given axes
+def artistLists(ax):
+    return [ax.lines,ax.patches,ax.texts,ax.collections,ax.artists,ax.images]
+
+# removes all artists and the legend from the given axes, except the given retained artists
+def clearAxes(ax,retained=()):
+    keep = set(id(a) for a in retained)
+    for artists in artistLists(ax):
+        for a in list(artists):
+            if id(a) not in keep:
+                a.remove()
+    if ax.legend_ is not None:
+        ax.legend_.remove()
+
+
+class RetainedLayer(object):
+
+    def __init__(self):
+        self.signature = None # the signature of the state the artists were built from
+        self.artists = [] # the artists of the layer
+        self.state = {} # attributes of the chart set while building the layer, restored on reusing it
+        self.marks = None
+
+    # returns True if the artists of the layer are still part of ax and were built for the given signature
+    def valid(self,ax,signature):
+        if self.signature is None or self.signature != signature:
+            return False
+        children = set(id(a) for a in ax.get_children())
+        return all(id(a) in children for a in self.artists)
+
+    # removes the artists of the layer from their axes and starts recording the artists added to ax
+    def begin(self,ax):
+        self.remove()
+        self.marks = [len(artists) for artists in artistLists(ax)]
+
+    # takes all artists added to ax since begin() as the artists of the layer built for the given signature
+    def end(self,ax,signature,state):
+        if self.marks is not None:
+            self.artists = []
+            for n,artists in zip(self.marks,artistLists(ax)):
+                self.artists.extend(artists[n:])
+            self.signature = signature
+            self.state = state
+            self.marks = None
+
+    # sets the attributes recorded on building the layer on the given chart
+    def restore(self,chart):
+        for k,v in self.state.items():
+            setattr(chart,k,v)
+
+    # removes the artists of the layer from their axes
+    def remove(self):
+        for a in self.artists:
+            try:
+                a.remove()
+            except Exception: # already removed
+                pass
+        self.artists = []
+        self.signature = None
+        self.state = {}
+        self.marks = None
+
+
+# Accounts for the time taken by the chart updates during sampling.
+# A chart update is either a blit of the animated artists onto the cached background or a full draw of the canvas.
+class FrameBudget(object):
+
+    def __init__(self,ratio=0.25):
+        self.ratio = ratio # the share of the sampling interval a chart update may take
+        self.clear()
+
+    # resets the statistics and sets the budget for the given sampling interval in seconds
+    def clear(self,interval=1.):
+        self.budget = interval * self.ratio # the time in seconds a chart update may take
+        self.frames = 0 # the number of chart updates
+        self.full = 0 # the number of full draws among those
+        self.over = 0 # the number of chart updates exceeding the budget
+        self.last = None # the duration of the last chart update
+        self.total = 0.
+        self.max = 0.
+
+    # accounts for a chart update of the given duration in seconds
+    # returns True if this is the first chart update exceeding the budget since the last clear()
+    def add(self,duration,full=False):
+        self.frames += 1
+        if full:
+            self.full += 1
+        self.last = duration
+        self.total += duration
+        self.max = max(self.max,duration)
+        if duration > self.budget:
+            self.over += 1
+            return self.over == 1
+        return False
+
+    # returns the mean and the max duration of the chart updates or None, None if there were none
+    def stats(self):
+        if self.frames:
+            return self.total / self.frames, self.max
+        else:
+            return None, None
+
+
+# returns the points of the given numpy arrays x and y to be drawn for the visible range [xmin,xmax] split into the given
+# number of buckets (one per pixel). Per bucket the first, the last, the minimal and the maximal point are kept in their
+# original order, as well as the first point of each gap (nan value). x has to be sorted. Returns x and y unchanged if
+# the visible range does not hold more than 4 points per bucket.
+def minmaxDecimate(x,y,xmin,xmax,buckets):
+    n = len(x)
+    i0 = max(0,numpy.searchsorted(x,xmin,'left') - 1) # we keep one point beyond each end of the visible range
+    i1 = min(n,numpy.searchsorted(x,xmax,'right') + 1)
+    if xmax <= xmin or i1 - i0 <= 4*buckets:
+        return x, y
+    xs = x[i0:i1]
+    ys = y[i0:i1]
+    b = numpy.clip(((xs - xmin) * (buckets / float(xmax - xmin))).astype(int),-1,buckets)
+    starts = numpy.flatnonzero(numpy.r_[True,b[1:] != b[:-1]])
+    ends = numpy.r_[starts[1:],len(b)] - 1
+    nans = numpy.isnan(ys)
+    mins = numpy.lexsort((numpy.where(nans,numpy.inf,ys),b))[starts]
+    maxs = numpy.lexsort((numpy.where(nans,-numpy.inf,ys),b))[ends]
+    gaps = numpy.flatnonzero(nans & ~numpy.r_[False,nans[:-1]])
+    keep = numpy.unique(numpy.concatenate((starts,ends,mins,maxs,gaps)))
+    return xs[keep], ys[keep]
+
+
+# Display-side decimation of long lines.
+# The full resolution data of the registered lines is kept here while the lines hold only the points of
+# minmaxDecimate() for the current view of their axes. update() is to be called on changes of the x-limits or the size
+# of the axes and recomputes the lines only if the view changed.
+class LevelOfDetail(object):
+
+    def __init__(self):
+        self.lines = [] # the registered (line,x,y) with x and y the full resolution data as numpy arrays
+        self.view = None # the (xmin,xmax,buckets) the lines are decimated for
+
+    # returns the visible x-range and the number of pixels along the x-axis of the given axes
+    @staticmethod
+    def viewOf(ax):
+        xmin, xmax = ax.get_xlim()
+        return (xmin,xmax,max(1,int(ax.bbox.width)))
+
+    # takes the full resolution data of the given line; lines drawing markers or steps are not decimated
+    def register(self,line,x,y):
+        if line is None or len(x) != len(y) or line.get_drawstyle() != "default" or line.get_marker() not in [None,"None","none",""," "]:
+            return
+        try:
+            xa = numpy.array(x,dtype=float)
+            ya = numpy.array(y,dtype=float) # None values become nan
+        except (TypeError,ValueError):
+            return
+        if len(xa) < 2 or numpy.isnan(xa).any() or (numpy.diff(xa) < 0).any():
+            return
+        entry = (line,xa,ya)
+        self.lines.append(entry)
+        if line.axes is not None:
+            self.decimate(entry,self.viewOf(line.axes))
+
+    def decimate(self,entry,view):
+        line,x,y = entry
+        line.set_data(*minmaxDecimate(x,y,view[0],view[1],view[2]))
+
+    # recomputes the registered lines still part of an axes for the view of the given axes, if that view changed
+    def update(self,ax):
+        self.lines = [e for e in self.lines if e[0].axes is not None and e[0] in e[0].axes.lines]
+        view = self.viewOf(ax)
+        if view != self.view:
+            self.view = view
+            for e in self.lines:
+                self.decimate(e,view)
+
+    def clear(self):
+        self.lines = []
+        self.view = None
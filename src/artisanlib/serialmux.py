@@ -0,0 +1,142 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# ABOUT
+# Serial port multiplexer of the open-source roast logging software Artisan.
+# All logical devices (the main device and the extra devices) communicating over the same physical serial port share
+# one SharedSerialPort owning the pyserial object and the lock serializing the transactions on that port. Within a
+# sampling round, the replies to read requests are cached per port, thus a request already sent by one logical device
+# (like the PV of a PID station on a shared RS485 bus) is answered from the cache if sent again by another one.
+# Sampling rounds are scoped to the sampling thread (and the acquisition workers joining its round), thus requests
+# sent from other threads (like the GUI thread) during a round are never answered from the cache.
+
+# LICENSE
+# This program or module is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 2 of the License, or
+# version 3 of the License, or (at your option) any later versison. It is
+# provided for educational purposes and is distributed in the hope that
+# it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See
+# the GNU General Public License for more details.
+
+import threading
+
+import serial
+
+from PyQt5.QtCore import QSemaphore
+
+
+class SharedSerialPort(object):
+
+    def __init__(self,name):
+        self.name = name
+        self.SP = serial.Serial()
+        self.semaphore = QSemaphore(1) # serializes the transactions of all logical devices on this port
+        self.lock = threading.Lock() # protects the reply cache
+        self.replies = {} # the replies to the read requests of the current round
+        self.round = None # the round the cached replies belong to
+        self.requests = 0 # the number of read requests of all rounds
+        self.hits = 0 # the number of read requests answered from the cache
+        self.last_transaction = 0 # the time the last transaction on this port ended (for protocols requiring a silent interval between transactions)
+
+    # returns the cached reply to the given request within the given round or None
+    def cachedReply(self,request,current_round):
+        with self.lock:
+            self.requests += 1
+            if current_round is None or self.round != current_round:
+                return None
+            reply = self.replies.get(request)
+            if reply is not None:
+                self.hits += 1
+            return reply
+
+    # caches the reply to the given request for the rest of the given round
+    def storeReply(self,request,reply,current_round):
+        if current_round is not None:
+            with self.lock:
+                if self.round != current_round:
+                    self.replies = {}
+                    self.round = current_round
+                self.replies[request] = reply
+
+    # drops all cached replies; to be called on sending a request that changes the state of a device on this port
+    def invalidate(self):
+        with self.lock:
+            self.replies = {}
+
+
+class SerialPortMultiplexer(object):
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.ports = {} # the SharedSerialPort per port name
+        self.users = {} # the number of logical devices per port name
+        self.local = threading.local() # holds the number of the current sampling round of the calling thread
+        self.rounds = 0
+
+    # returns the SharedSerialPort of the given port name, created on first use
+    def port(self,name):
+        with self.lock:
+            p = self.ports.get(name)
+            if p is None:
+                p = SharedSerialPort(name)
+                self.ports[name] = p
+            return p
+
+    # registers a logical device communicating over the given port
+    def acquire(self,name):
+        with self.lock:
+            self.users[name] = self.users.get(name,0) + 1
+
+    # unregisters a logical device from the given port; the port is closed and dropped with its last logical device
+    def release(self,name):
+        with self.lock:
+            n = self.users.get(name,0) - 1
+            if n > 0:
+                self.users[name] = n
+                return
+            self.users.pop(name,None)
+            p = self.ports.pop(name,None)
+        if p is not None:
+            try:
+                if p.SP.isOpen():
+                    p.SP.close()
+            except Exception:
+                pass
+
+    # returns the number of the current sampling round of the calling thread or None outside of sampling rounds
+    def currentRound(self):
+        return getattr(self.local,"round",None)
+
+    # starts a new sampling round in the calling thread; replies cached in previous rounds are not delivered anymore
+    def beginRound(self):
+        with self.lock:
+            self.rounds += 1
+            self.local.round = self.rounds
+
+    # lets the calling thread (an acquisition worker) take part in the given sampling round (None to leave it)
+    def joinRound(self,current_round):
+        self.local.round = current_round
+
+    # ends the current sampling round of the calling thread; replies are not cached outside of sampling rounds
+    def endRound(self):
+        self.local.round = None
+
+    # returns the cached reply to the request on the given port within the current round or None
+    def cachedReply(self,name,request):
+        return self.port(name).cachedReply(request,self.currentRound())
+
+    def storeReply(self,name,request,reply):
+        self.port(name).storeReply(request,reply,self.currentRound())
+
+    def invalidate(self,name):
+        self.port(name).invalidate()
+
+    # returns a dict mapping the port names to the number of read requests and of those answered from the cache
+    def stats(self):
+        with self.lock:
+            ports = list(self.ports.values())
+        return dict((p.name,(p.requests,p.hits)) for p in ports)
+
+multiplexer = SerialPortMultiplexer()
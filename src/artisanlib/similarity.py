@@ -0,0 +1,76 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# ABOUT
+# Curve similarity between a roast profile and (background) reference profiles for the open-source
+# roast logging software Artisan.
+
+# LICENSE
+# This program or module is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 2 of the License, or
+# version 3 of the License, or (at your option) any later versison. It is
+# provided for educational purposes and is distributed in the hope that
+# it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See
+# the GNU General Public License for more details.
+
+import math
+import numpy
+
+# returns the values of temp at the given times by linear interpolation over timearray
+# times outside of the range of timearray are mapped to -1
+def interpolate(timearray,temparray,times):
+    if len(timearray) and len(timearray) == len(temparray):
+        return numpy.interp(times,numpy.asarray(timearray,dtype=numpy.float64),numpy.asarray(temparray,dtype=numpy.float64),left=-1,right=-1)
+    else:
+        return numpy.full(len(times),-1.)
+
+# returns the foreground ET/BT arrays up to index drop, taking the smoothed data where available
+def foreground(temp,stemp,drop):
+    res = numpy.array(temp[:drop+1],dtype=numpy.float64)
+    if stemp:
+        k = min(len(stemp),drop+1)
+        res[:k] = numpy.array(stemp[:k],dtype=numpy.float64)
+    return res
+
+# computes the similarity between the foreground BT/ET and the BT/ET of each of the given background profiles
+# as the root mean square of their differences, taken backward from the foreground DROP (index drop) down to the first
+# reading with BT not above BTlimit, after aligning the DROP events of both profiles.
+# backgrounds is a list of (timeB,temp1B,temp2B,dropB) tuples.
+# returns a list with one (ET similarity,BT similarity) tuple per background; (None,None) if no similarity can be computed
+def curveSimilarities(timex,temp1,temp2,stemp1,stemp2,drop,backgrounds,BTlimit=None):
+    res = []
+    try:
+        if not BTlimit or not drop or drop >= len(timex):
+            return [(None,None)]*len(backgrounds)
+        et = foreground(temp1,stemp1,drop)
+        bt = foreground(temp2,stemp2,drop)
+        # the readings from index 1 to drop having BT above the limit; we only consider the period up to drop
+        below = numpy.nonzero(~(bt[1:] > BTlimit))[0]
+        if len(below):
+            start = below[-1] + 2
+        else:
+            start = 1
+        if start > drop:
+            return [(None,None)]*len(backgrounds)
+        tx = numpy.asarray(timex[start:drop+1],dtype=numpy.float64)
+        et = et[start:]
+        bt = bt[start:]
+        for (timeB,temp1B,temp2B,dropB) in backgrounds:
+            try:
+                if dropB and dropB < len(timeB):
+                    # calculate time delta between background and foreground DROP event
+                    dropTimeDelta = timex[drop] - timeB[dropB]
+                    times = tx - dropTimeDelta
+                    det = et - interpolate(timeB,temp1B,times)
+                    dbt = bt - interpolate(timeB,temp2B,times)
+                    res.append((math.sqrt(numpy.dot(det,det)/len(det)),math.sqrt(numpy.dot(dbt,dbt)/len(dbt))))
+                else:
+                    # no DROP event registered
+                    res.append((None,None))
+            except Exception:
+                res.append((None,None))
+        return res
+    except Exception:
+        return [(None,None)]*len(backgrounds)
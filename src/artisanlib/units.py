@@ -0,0 +1,178 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# ABOUT
+# Temperature unit conversion of the open-source roast logging software Artisan.
+# Converts whole temperature and RoR series between Celsius and Fahrenheit at once using numpy, as well as all
+# temperatures held by a profile dict. Used for the profile and background data of the GUI and by the bulk conversion
+# of profile files, which runs in worker processes for larger batches.
+
+# LICENSE
+# This program or module is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 2 of the License, or
+# version 3 of the License, or (at your option) any later versison. It is
+# provided for educational purposes and is distributed in the hope that
+# it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See
+# the GNU General Public License for more details.
+
+import os
+import codecs
+import multiprocessing
+
+import numpy
+
+from artisanlib.profileformat import readProfile, writeBinaryProfile
+
+# conversions over less profiles are computed within the GUI process
+parallel_min_profiles = 16
+
+# the temperatures of the computed profile information (see ApplicationWindow.computedProfileInformation())
+computed_temperatures = ["CHARGE_ET","CHARGE_BT","TP_ET","TP_BT","MET","DRY_ET","DRY_BT","FCs_ET","FCs_BT","FCe_ET","FCe_BT",
+    "SCs_ET","SCs_BT","SCe_ET","SCe_BT","DROP_ET","DROP_BT","COOL_ET","COOL_BT","ambient_temperature","AUCbase"]
+# the temperature differences, rates and areas of the computed profile information, which are scaled only
+computed_differences = ["det","dbt","dry_phase_ror","mid_phase_ror","finish_phase_ror","total_ror","total_ts","total_ts_ET","total_ts_BT",
+    "AUC","dry_phase_AUC","mid_phase_AUC","finish_phase_AUC"]
+
+# returns the scale and offset converting from source to target unit ("C" or "F")
+def conversion(source,target):
+    if source == "C" and target == "F":
+        return 9./5., 32.
+    elif source == "F" and target == "C":
+        return 5./9., -32.*5./9.
+    else:
+        return 1., 0.
+
+# returns the given series of temperatures converted from source to target unit as a new list
+# None (missing values) and -1 (dropouts) are kept as is
+def convertTemps(values,source,target,offset=True):
+    scale, shift = conversion(source,target)
+    if scale == 1. or len(values) == 0:
+        return list(values)
+    a = numpy.array(values,dtype=numpy.float64) # None becomes nan
+    keep = numpy.isnan(a) | (a == -1)
+    r = a * scale + (shift if offset else 0.)
+    r[keep] = a[keep]
+    res = r.tolist()
+    for i in numpy.flatnonzero(numpy.isnan(a)):
+        res[i] = None
+    return res
+
+# returns the given series of rates of rise (or temperature differences) converted from source to target unit
+def convertRoRs(values,source,target):
+    return convertTemps(values,source,target,offset=False)
+
+# returns the single temperature t converted from source to target unit
+def convertTemp(t,source,target):
+    if t is None or t == -1:
+        return t
+    scale, shift = conversion(source,target)
+    return t * scale + shift
+
+# converts the extra device series of the given lists, except those flagged as holding no temperatures
+def convertExtraTemps(series,noneTempHints,source,target):
+    return [(s if (len(noneTempHints) > e and noneTempHints[e]) else convertTemps(s,source,target)) for e,s in enumerate(series)]
+
+# converts all temperatures of the given profile dict to the target unit in place
+# returns True if the profile was converted, False if it is in the target unit already
+def convertProfile(profile,target):
+    source = str(profile.get("mode","C"))
+    if source == target:
+        return False
+    for k in ["temp1","temp2"]:
+        if k in profile:
+            profile[k] = convertTemps(profile[k],source,target)
+    for n in ["1","2"]:
+        if "extratemp" + n in profile:
+            profile["extratemp" + n] = convertExtraTemps(profile["extratemp" + n],profile.get("extraNoneTempHint" + n,[]),source,target)
+    for k in ["ambientTemp","greens_temp"]:
+        if k in profile and profile[k]:
+            profile[k] = convertTemp(profile[k],source,target)
+    if "alarmtemperature" in profile:
+        # 500 is the "unset" alarm temperature
+        profile["alarmtemperature"] = [(t if t == 500 else convertTemp(t,source,target)) for t in profile["alarmtemperature"]]
+    if "svValues" in profile:
+        profile["svValues"] = convertTemps(profile["svValues"],source,target)
+    if "phases" in profile:
+        profile["phases"] = [int(round(t)) for t in convertTemps(profile["phases"],source,target)]
+    for k in ["ymax","ymin"]:
+        if k in profile:
+            profile[k] = int(round(convertTemp(profile[k],source,target)))
+    for k in ["zmax","zmin"]:
+        if k in profile:
+            profile[k] = int(round(profile[k] * conversion(source,target)[0]))
+    computed = profile.get("computed")
+    if isinstance(computed,dict):
+        for k in computed_temperatures:
+            if k in computed and isinstance(computed[k],(int,float)):
+                computed[k] = convertTemp(computed[k],source,target)
+        for k in computed_differences:
+            if k in computed and isinstance(computed[k],(int,float)):
+                computed[k] = computed[k] * conversion(source,target)[0]
+    profile["mode"] = target
+    return True
+
+# converts the profile file source to the given unit and writes it to target
+# the target is written in the binary profile format if binary is set, in the textual .alog format otherwise
+def convertProfileFile(source,target,mode,binary=False,compression=True):
+    profile = readProfile(source)
+    convertProfile(profile,mode)
+    if binary:
+        writeBinaryProfile(target,profile,compression)
+    else:
+        with codecs.open(target,"w+",encoding="utf-8") as f:
+            f.write(repr(profile))
+
+# returns the paths of all profile files (*.alog) within the given folder and its subfolders, sorted
+def profileFiles(folder):
+    res = []
+    for root, _, files in os.walk(folder):
+        for f in files:
+            if f.lower().endswith(".alog"):
+                res.append(os.path.join(root,f))
+    return sorted(res)
+
+# the job run by the worker processes: converts one profile file
+# returns the target and None on success or the error message
+def convertJob(args):
+    source,target,mode,binary,compression = args
+    try:
+        convertProfileFile(source,target,mode,binary,compression)
+        return target, None
+    except Exception as e:
+        return target, str(e)
+
+# converts the given (source,target) profile files to the given unit
+# returns the list of (target,error) of all jobs, error being None on success
+#  progress: called with the number of jobs done so far
+#  processes: the number of worker processes (defaults to the number of CPUs)
+def convertProfileFiles(files,mode,binary=False,compression=True,progress=None,processes=None):
+    jobs = [(source,target,mode,binary,compression) for (source,target) in files]
+    res = []
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    if len(jobs) >= parallel_min_profiles and processes > 1:
+        pool = None
+        try:
+            pool = multiprocessing.Pool(processes=min(processes,len(jobs)))
+            for r in pool.imap_unordered(convertJob,jobs,chunksize=max(1,len(jobs)//(4*processes))):
+                res.append(r)
+                if progress is not None:
+                    progress(len(res))
+            pool.close()
+        except Exception:
+            # fall back to the sequential conversion of the jobs not yet done
+            pass
+        finally:
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+    if len(res) < len(jobs):
+        done = set(r[0] for r in res)
+        for job in jobs:
+            if job[1] not in done:
+                res.append(convertJob(job))
+                if progress is not None:
+                    progress(len(res))
+    return res
@@ -114,6 +114,7 @@ CONF_MENU_SERIALPORT = QApplication.translate("Menu", "Port...", None)
 CONF_MENU_SAMPLING = QApplication.translate("Menu", "Sampling Interval...", None)
 CONF_MENU_OVERSAMPLING = QApplication.translate("Menu", "Oversampling", None)
 CONF_MENU_OVERSAMPLING = QApplication.translate("Menu", "Oversampling", None)
+CONF_MENU_PARALLELSAMPLING = QApplication.translate("Menu", "Parallel Sampling", None)
 CONF_MENU_COLORS = QApplication.translate("Menu", "Colors...", None)
 CONF_MENU_CONTROLS = QApplication.translate("Menu", "Controls", None)
 CONF_MENU_READINGS = QApplication.translate("Menu", "Readings", None)
@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+
+# makes the artisanlib package in src importable for the tests
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
@@ -0,0 +1,14 @@
+# -*- coding: utf-8 -*-
+
+from artisanlib.acquisition import AcquisitionPool
+
+
+def test_back_to_back_rounds():
+    # a round posted right after the previous one finished must not find the workers still busy
+    pool = AcquisitionPool()
+    try:
+        for _ in range(200):
+            res = pool.sample([("port1",[(0,lambda: 1),(1,lambda: 2)]),("port2",[(2,lambda: 3)])],1.)
+            assert res == {0:1,1:2,2:3}
+    finally:
+        pool.stop()
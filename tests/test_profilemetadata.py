@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+
+import os
+
+from artisanlib.profilemetadata import ProfileMetadataCache, metadataEntry
+
+
+def test_cache_entries(tmpdir):
+    filename = str(tmpdir.join("roast.alog"))
+    with open(filename,"w") as f:
+        f.write(str({"title":"roast","timex":[0.,1.],"temp2":[150.,151.]}))
+    cache = ProfileMetadataCache(str(tmpdir.join("cache.json")))
+    assert cache.entry(filename) is None
+    # entries read by worker processes are added by the GUI process
+    cache.add(filename,metadataEntry(filename))
+    entry = cache.entry(filename)
+    assert entry["metadata"] == {"title":"roast"}
+    assert cache.profile(filename)["temp2"] == [150.,151.]
+    cache.save()
+    assert os.path.exists(str(tmpdir.join("cache.json")))
+    # entries are invalidated by changes of the file
+    with open(filename,"w") as f:
+        f.write(str({"title":"roast 2","timex":[0.,1.],"temp2":[150.,151.]}))
+    assert cache.entry(filename) is None
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+
+from artisanlib.profilestore import ProfileColumn, TimeIndex, columnView
+
+
+def test_append_and_replace_last():
+    timex = [0., 10., 20.]
+    cache = TimeIndex()
+    assert cache.index(timex, 8.) == 1
+    timex.append(30.)
+    assert cache.index(timex, 28.) == 3
+    timex[-1] = 40.
+    assert list(cache.array(timex)) == timex
+
+def test_insert_in_the_middle():
+    # the designer inserts points in the middle of timex and signals this by invalidate()
+    timex = [0., 10., 20., 30.]
+    cache = TimeIndex()
+    assert cache.index(timex, 16.) == 2
+    timex.insert(2, 15.)
+    cache.invalidate()
+    assert list(cache.array(timex)) == [0., 10., 15., 20., 30.]
+    assert cache.index(timex, 16.) == 2
+    assert cache.index(timex, 19.) == 3
+    assert list(cache.indices(timex, [9., 14.])) == [1, 2]
+
+def test_remove_and_move():
+    timex = [0., 10., 20., 30.]
+    cache = TimeIndex()
+    cache.array(timex)
+    timex.pop(1)
+    cache.invalidate()
+    assert cache.index(timex, 9.) == 0
+    timex[1] = 25.
+    cache.invalidate()
+    assert cache.index(timex, 24.) == 1
+    assert list(cache.array(timex)) == [0., 25., 30.]
+
+def test_replaced_list():
+    # a new list replacing a released one is recognized even if it is allocated at the same address
+    cache = TimeIndex()
+    cache.array([0., 10., 20., 30.])
+    timex = [0., 12., 22., 30.]
+    assert list(cache.array(timex)) == timex
+    assert cache.index(timex, 11.) == 1
+
+def test_column_list_operations():
+    # the recorded timex, temp1/2 and delta1/2 are columns handled by code written for lists
+    temp1 = ProfileColumn([200., 180., 170., 175., None, 190.])
+    assert temp1.index(min(temp1[1:4])) == 2
+    assert temp1.index(None) == 4
+    assert temp1.index(190., 2) == 5
+    assert [0.] + ProfileColumn([200., 180.]) == [0., 200., 180.]
+    assert temp1 + [1.] == [200., 180., 170., 175., None, 190., 1.]
+    assert columnView(temp1) is not temp1 and len(columnView(temp1)) == 6
+    assert columnView([1., 2.]) == [1., 2.]
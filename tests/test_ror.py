@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+# Parity of the streaming DecayAverage with the batch decay weighted average
+#   numpy.average(values[-min(len(values),window):],weights=numpy.arange(1,window+1)[max(0,window-len(values)):])
+# as computed by SampleThread.sample before the smoothing was made incremental.
+
+import random
+
+import numpy
+import pytest
+
+from artisanlib.ror import DecayAverage
+
+
+def batch_average(values, window):
+    weights = numpy.arange(1, window + 1)
+    return numpy.average(values[-min(len(values), window):], weights=weights[max(0, window - len(values)):])
+
+# a bean temperature curve sampled at irregular intervals
+def irregular_samples(n, seed=0):
+    rnd = random.Random(seed)
+    t = 0.
+    samples = []
+    for _ in range(n):
+        t += rnd.uniform(0.5, 4.)
+        samples.append(20. + 200. * (1. - numpy.exp(-t / 300.)) + rnd.gauss(0., 0.3))
+    return samples
+
+def assert_close(x, y):
+    assert abs(x - y) <= 1e-9 * max(1., abs(y))
+
+
+@pytest.mark.parametrize("window", [1, 2, 3, 5, 8, 13, 20])
+def test_append(window):
+    decay = DecayAverage(window)
+    values = []
+    # exceed DecayAverage.refresh to also cover the periodic recomputation of the running sums
+    for v in irregular_samples(3 * DecayAverage.refresh + 7, seed=window):
+        values.append(v)
+        assert_close(decay.update(values), batch_average(values, window))
+
+@pytest.mark.parametrize("window", [1, 4, 10])
+def test_rate_of_rise(window):
+    # smoothing of the unfiltered deltas computed from temperatures sampled at irregular times
+    rnd = random.Random(window)
+    times = numpy.cumsum([rnd.uniform(0.5, 4.) for _ in range(200)])
+    temps = irregular_samples(200, seed=window)
+    decay = DecayAverage(window)
+    deltas = []
+    for i in range(1, len(times)):
+        deltas.append(60. * (temps[i] - temps[i - 1]) / (times[i] - times[i - 1]))
+        assert_close(decay.update(deltas), batch_average(deltas, window))
+
+@pytest.mark.parametrize("window", [1, 3, 7])
+def test_replace_last(window):
+    # while not recording the last value of the list is replaced instead of appended
+    decay = DecayAverage(window)
+    samples = irregular_samples(60, seed=window)
+    values = []
+    for i, v in enumerate(samples):
+        if i % 3 == 0 and values:
+            values[-1] = v
+        else:
+            values.append(v)
+        assert_close(decay.update(values), batch_average(values, window))
+
+@pytest.mark.parametrize("window", [2, 6])
+def test_rebuild(window):
+    decay = DecayAverage(window)
+    samples = irregular_samples(80, seed=window)
+    values = samples[:30]
+    assert_close(decay.update(values), batch_average(values, window))
+    # missed samples
+    values = samples[:33]
+    assert_close(decay.update(values), batch_average(values, window))
+    # reset and restart
+    assert decay.update([]) is None
+    values = samples[40:41]
+    assert_close(decay.update(values), batch_average(values, window))
+    values = samples[40:42]
+    assert_close(decay.update(values), batch_average(values, window))
+
+def test_set_window():
+    decay = DecayAverage(3)
+    values = irregular_samples(20)
+    decay.update(values)
+    decay.setWindow(5)
+    assert decay.average() is None
+    assert_close(decay.update(values), batch_average(values, 5))